@@ -0,0 +1,446 @@
+#!/usr/bin/python
+############################################################################
+############################################################################
+"""
+##  libbuild - Library Build Program for Kicad V0.1
+##
+##  Designed by
+##         A.D.H.A.R Labs Research,Bharat(India)
+##            Abhijit Bose( info@adharlabs.in )
+##                http://adharlabs.in
+##
+## License:
+## Creative Commons Attribution-NonCommercial-ShareAlike 3.0 Unported
+## CC BY-NC-SA 3.0 http://creativecommons.org/licenses/by-nc-sa/3.0/
+## http://creativecommons.org/licenses/by-nc-sa/3.0/legalcode
+"""
+##
+## Version History:
+## version 0.1 - Initial Release
+##          -- Manifest of libgen symbols, modgen footprints and merges
+##             rebuilt only when their inputs changed, on several
+##             processes
+##
+############################################################################
+############################################################################
+#IMPORTS>
+import sys,os,getopt,logging,json,hashlib,itertools
+import concurrent.futures
+import xml.etree.ElementTree
+############################################################################
+#EXPORT>
+__all__=['Help_libbuild','ReadManifest','BuildNodes','RunNode',\
+         'MergeLibraries','BuildError']
+__author__ = "Abhijit Bose(info@adharlabs.in)"
+__author_email__="info@adharlabs.in"
+__version__ = "0.1"
+############################################################################
+#LOGGING> Messages of the Build
+#  INFO gives one line per step built, DEBUG adds the steps up to date
+log = logging.getLogger("libbuild")
+############################################################################
+#STATE> File next to the manifest with the signatures of the last build
+_state_file = ".libbuild.state"
+#Steps of a manifest
+node_kinds = ("symbols","footprints","merge")
+############################################################################
+class BuildError(Exception):
+  """Error in the manifest, carries the step name and the reason"""
+  def __init__(self, name, reason):
+    Exception.__init__(self, name, reason)
+    self.name = name
+    self.reason = reason
+  def __str__(self):
+    return "%s: %s"%(self.name,self.reason)
+############################################################################
+#TOOL FUNCTIONS>
+def Tools():
+  """The libgen and modgen modules of the sibling directories"""
+  top = os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir)
+  for name in ("libgen","modgen"):
+    path = os.path.abspath(os.path.join(top,name))
+    if path not in sys.path:
+      sys.path.append(path)
+  import libgen, modgen
+  return libgen, modgen
+############################################################################
+#MANIFEST FUNCTIONS>
+def ReadManifest(manifest):
+  """Read the steps of a manifest as a list of node dicts with the
+  name, kind, attributes, the specs and inputs as given and the
+  outputs, the paths are taken from the manifest directory"""
+  top = os.path.dirname(os.path.abspath(manifest))
+  path = lambda p: os.path.normpath(os.path.join(top,p.strip()))
+  root = xml.etree.ElementTree.parse(manifest).getroot()
+  nodes = []
+  names = set()
+  for el in root:
+    name = el.get("name") or el.get("output") or el.tag
+    if el.tag not in node_kinds:
+      raise BuildError(name,"Unknown step %s"%el.tag)
+    if not el.get("output"):
+      raise BuildError(name,"No output")
+    if name in names:
+      raise BuildError(name,"Step name used twice")
+    names.add(name)
+    node = {"name":name,"kind":el.tag,"attrs":dict(el.attrib),\
+            "output":path(el.get("output")),\
+            "specs":[path(i.text) for i in el.iter("spec") if i.text],\
+            "inputs":[path(i.text) for i in el.iter("input") if i.text],\
+            "cache":path(el.get("cache")) if el.get("cache") else None,\
+            "symlib":path(el.get("symbols")) if el.get("symbols") else None}
+    node["outputs"] = [node["output"]]
+    if node["symlib"]:
+      node["outputs"].append(node["symlib"])
+    nodes.append(node)
+  return nodes
+
+def NodeDeps(nodes):
+  """Names of the steps making the specs and inputs of each step, a
+  step also depends on the steps writing into its spec directories"""
+  makers = [(out,node["name"]) for node in nodes for out in node["outputs"]]
+  deps = {}
+  for node in nodes:
+    wanted = node["specs"]+node["inputs"]
+    deps[node["name"]] = sorted(set(maker for out, maker in makers\
+      if maker != node["name"] and\
+      [i for i in wanted if out == i or out.startswith(i+os.sep)]))
+  return deps
+
+def NodeInputs(node):
+  """Files read by a step, its spec files, the input libraries with
+  their .dcm and footprint files and the generators"""
+  libgen, modgen = Tools()
+  files = libgen.SpecFiles(node["specs"])
+  for path in node["inputs"]:
+    if os.path.isdir(path):
+      files.extend(os.path.join(path,i) for i in sorted(os.listdir(path))\
+                   if i.endswith(".kicad_mod"))
+      continue
+    files.append(path)
+    if path.endswith(".lib") and os.path.isfile(libgen.DcmFileName(path)):
+      files.append(libgen.DcmFileName(path))
+  files.append(os.path.abspath(libgen.__file__))
+  if node["kind"] != "symbols":
+    files.append(os.path.abspath(modgen.__file__))
+  return files
+
+def OutputFiles(node):
+  """Files written by a step, the footprints of a .pretty directory
+  and the .dcm of a symbol library"""
+  libgen = Tools()[0]
+  files = []
+  for path in node["outputs"]:
+    if os.path.isdir(path):
+      files.extend(os.path.join(path,i) for i in sorted(os.listdir(path))\
+                   if i.endswith(".kicad_mod"))
+    elif os.path.isfile(path):
+      files.append(path)
+      if path.endswith(".lib") and os.path.isfile(libgen.DcmFileName(path)):
+        files.append(libgen.DcmFileName(path))
+  return files
+############################################################################
+#STATE FUNCTIONS>
+def FileSignature(path, old=None):
+  """[mtime ns, size, sha1] of a file, the hash is only computed again
+  when the mtime or the size changed"""
+  st = os.stat(path)
+  if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+    return old
+  h = hashlib.sha1()
+  with open(path,"rb") as f:
+    for chunk in iter(lambda: f.read(1<<20),b""):
+      h.update(chunk)
+  return [st.st_mtime_ns,st.st_size,h.hexdigest()]
+
+def Signatures(paths, old):
+  """Signatures of the files by path, reusing the old ones"""
+  return dict((i,FileSignature(i,old.get(i))) for i in paths)
+
+def Recipe(node):
+  """Hash of what a step does apart from its files"""
+  key = json.dumps([node["kind"],node["attrs"],node["specs"],\
+                    node["inputs"]],sort_keys=True)
+  return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def SameFiles(new, old):
+  """The files have the same paths and contents"""
+  return sorted(new) == sorted(old) and\
+         all(new[i][2] == old[i][2] for i in new)
+
+def IsFresh(node, sigs, old):
+  """The step was built from the same inputs and recipe and its outputs
+  are as it left them"""
+  if not old or old["recipe"] != Recipe(node):
+    return False
+  if not SameFiles(sigs,old["inputs"]):
+    return False
+  if [i for i in node["outputs"] if not os.path.exists(i)]:
+    return False
+  try:
+    outputs = Signatures(OutputFiles(node),old["outputs"])
+  except EnvironmentError:
+    return False
+  return SameFiles(outputs,old["outputs"])
+
+def LoadState(statefile):
+  """Signatures of the last build by step name"""
+  try:
+    with open(statefile,encoding="utf-8") as f:
+      return json.load(f)
+  except (EnvironmentError,ValueError):
+    return {}
+
+def SaveState(statefile, state):
+  modgen = Tools()[1]
+  modgen.ReplaceFile(statefile,lambda f: json.dump(state,f,indent=1,\
+                                                   sort_keys=True))
+############################################################################
+#STEP FUNCTIONS>
+def Blocks(paths, block):
+  """Text of the blocks of the libraries in order, the later blocks
+  with an already used name are left out"""
+  seen = set()
+  blocks = []
+  for path in paths:
+    if not os.path.isfile(path):
+      continue
+    with open(path,"rb") as f:
+      buf = f.read()
+    for m in block.finditer(buf):
+      name = m.group("name").decode("utf-8")
+      if name in seen:
+        log.warning("Duplicate %s in %s left out"%(name,path))
+        continue
+      seen.add(name)
+      blocks.append(m.group(0).decode("utf-8"))
+  return blocks
+
+def PrettyFootprints(paths):
+  """Stream the (name, text) footprints of .pretty directories and
+  .kicad_mod files"""
+  for path in paths:
+    files = [path]
+    if os.path.isdir(path):
+      files = [os.path.join(path,i) for i in sorted(os.listdir(path))\
+               if i.endswith(".kicad_mod")]
+    for i in files:
+      with open(i,encoding="utf-8") as f:
+        yield os.path.basename(i)[:-len(".kicad_mod")], f.read()
+
+def MergeLibraries(inputs, output):
+  """Merge the libraries into one of the same kind as the output, .emp,
+  .pretty, .lib with its .dcm or .kicad_sym"""
+  libgen, modgen = Tools()
+  if output.endswith(".emp"):
+    modgen.WriteLibrary(output,itertools.chain.from_iterable(\
+                        modgen.ReadLibrary(i) for i in inputs))
+  elif output.rstrip("/\\").endswith(".pretty"):
+    modgen.WritePretty(output,PrettyFootprints(inputs))
+  elif output.endswith(".kicad_sym"):
+    blocks = Blocks(inputs,libgen.sym_block)
+    modgen.ReplaceFile(output,lambda f: f.write(libgen.template_sym_head+\
+                       "".join(blocks)+libgen.template_sym_foot))
+  elif output.endswith(".lib"):
+    blocks = Blocks(inputs,libgen.lib_block)
+    modgen.ReplaceFile(output,lambda f: f.write(libgen.template_lib_head+\
+                       "".join(blocks)+libgen.template_lib_foot))
+    dcm = Blocks([libgen.DcmFileName(i) for i in inputs],libgen.dcm_block)
+    if dcm:
+      modgen.ReplaceFile(libgen.DcmFileName(output),lambda f: f.write(\
+        libgen.template_dcm_head+"".join(dcm)+libgen.template_dcm_foot))
+  else:
+    raise BuildError(output,"Unknown library kind")
+  return 0
+
+def RunNode(node):
+  """Run the generator of one step, returns the number of the failed
+  components or modules"""
+  libgen, modgen = Tools()
+  for path in node["outputs"]:
+    if os.path.dirname(path) and not os.path.isdir(os.path.dirname(path)):
+      os.makedirs(os.path.dirname(path))
+  if node["kind"] == "symbols":
+    return len(libgen.xml2lib_batch(libgen.SpecFiles(node["specs"]),\
+                                    node["output"],1,node["cache"]))
+  if node["kind"] == "footprints":
+    tasks = []
+    parts = []
+    for spec in libgen.SpecFiles(node["specs"]):
+      tasks.extend(modgen.SpecTasks(spec,parts))
+    units = node["attrs"].get("units","mils")
+    clearance = int(round(float(node["attrs"].get("clearance","0"))*\
+                          modgen.nm_per_unit[units]))
+    return len(modgen.BuildLib(tasks,node["output"],1,node["inputs"],\
+                               clearance,parts,node["symlib"]))
+  return MergeLibraries(node["inputs"],node["output"])
+############################################################################
+#BUILD FUNCTIONS>
+def BuildNodes(nodes, state, targets=None, jobs=1, force=False, dryrun=False):
+  """Build the stale steps of the targets, by default all, after the
+  steps they depend on, using 'jobs' processes. A step is stale when
+  its recipe, the contents of its inputs or its outputs changed since
+  the state of the last build, which is updated for the built steps.
+  Returns {name: built|fresh|failed|skipped}"""
+  deps = NodeDeps(nodes)
+  byname = dict((i["name"],i) for i in nodes)
+  wanted = set()
+  stack = list(targets or byname)
+  while stack:#The Targets and all the Steps they need
+    name = stack.pop()
+    if name not in byname:
+      raise BuildError(name,"No such step")
+    if name not in wanted:
+      wanted.add(name)
+      stack.extend(deps[name])
+  pending = [i["name"] for i in nodes if i["name"] in wanted]
+  done = {}
+  running = {}
+  pool = None
+  if jobs != 1 and not dryrun:
+    pool = concurrent.futures.ProcessPoolExecutor(jobs or None)
+  def finish(name, sigs, run):
+    node = byname[name]
+    try:#Any error of the generators fails only this step
+      failed = run()
+    except Exception as e:
+      log.warning("Failed %s> %s"%(name,e))
+      failed = -1
+    if failed:
+      done[name] = "failed"
+      state.pop(name,None)
+      if failed > 0:
+        log.warning("Failed %s> %d parts failed"%(name,failed))
+      return
+    done[name] = "built"
+    state[name] = {"recipe":Recipe(node),"inputs":sigs,\
+                   "outputs":Signatures(OutputFiles(node),{})}
+  try:
+    while pending or running:
+      progress = False
+      for name in list(pending):
+        states = [done.get(i) for i in deps[name]]
+        if None in states:#Waits for the Steps it depends on
+          continue
+        pending.remove(name)
+        progress = True
+        node = byname[name]
+        if "failed" in states or "skipped" in states:
+          log.warning("Skipped %s, its inputs failed"%name)
+          done[name] = "skipped"
+          continue
+        old = state.get(name)
+        try:
+          sigs = Signatures(NodeInputs(node),old["inputs"] if old else {})
+        except EnvironmentError as e:
+          log.warning("Failed %s> %s"%(name,e))
+          done[name] = "failed"
+          continue
+        stale = dryrun and "built" in states
+        if not force and not stale and IsFresh(node,sigs,old):
+          log.debug("Up to date %s"%name)
+          done[name] = "fresh"
+          continue
+        if dryrun:
+          log.info("Stale %s"%name)
+          done[name] = "built"
+          continue
+        log.info("Building %s (%s %s)"%(name,node["kind"],node["output"]))
+        if pool == None:
+          finish(name,sigs,lambda: RunNode(node))
+        else:
+          running[pool.submit(RunNode,node)] = (name,sigs)
+      if running:
+        finished, _ = concurrent.futures.wait(running,\
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in finished:
+          name, sigs = running.pop(future)
+          finish(name,sigs,future.result)
+      elif pending and not progress:
+        raise BuildError(" ".join(pending),"Circular dependency")
+  finally:
+    if pool != None:
+      pool.shutdown()
+  return done
+############################################################################
+#OTHER FUNCTIONS>
+def Help_libbuild():
+  """Usage of the Build"""
+  print("""
+ Usage: %(prog)s [-q|-v] [-j <jobs>] [-n] [-B] [-f <build.xml>] [<step> ...]
+   Builds the libraries of the manifest, by default build.xml. Only the
+   steps with changed inputs, recipe or outputs are run again, after the
+   steps making their inputs. The manifest has one element per step:
+     <build>
+       <symbols output="out/conn.lib" cache=".cache">
+         <spec>specs/conn</spec>
+       </symbols>
+       <footprints output="out/conn.emp" clearance="8" units="mils"
+                   symbols="out/parts.lib">
+         <spec>fp/conn.xml</spec>
+         <input>old/extra.emp</input>
+       </footprints>
+       <merge output="out/all.lib">
+         <input>out/conn.lib</input>
+         <input>out/parts.lib</input>
+       </merge>
+     </build>
+   symbols    - libgen batch of the spec files, directories or patterns
+   footprints - modgen library of the spec files (modules, sweeps and
+                parts, their symbols to the symbols library) with the
+                .emp inputs merged, checked against the clearance
+   merge      - One library of the inputs, .emp .pretty .lib or .kicad_sym
+                as the output
+   Steps are named by their output unless they have a name attribute,
+   the steps given are built with all the steps they need.
+   -j   - Number of processes, 0 for all the CPUs, default 1
+   -n   - Only list the steps that would be built
+   -B   - Build all the steps
+   -q   - Only print the summary
+   -v   - Also print the steps up to date and the generator messages
+"""%{"prog":os.path.basename(sys.argv[0])})
+  sys.exit(-1)
+############################################################################
+############################################################################
+if __name__ == "__main__" :
+  try:
+    opts, args = getopt.getopt(sys.argv[1:],"f:j:nBqvh")
+    opts = dict(opts)
+    jobs = int(opts.get("-j","1"))
+  except (getopt.GetoptError,ValueError):
+    Help_libbuild()
+  if "-h" in opts:
+    Help_libbuild()
+  level = logging.INFO
+  if "-q" in opts:
+    level = logging.WARNING
+  elif "-v" in opts:
+    level = logging.DEBUG
+  logging.basicConfig(format="%(message)s",level=level,stream=sys.stdout)
+  # The Generators only give their Summaries unless -v
+  for name in ("libgen","modgen"):
+    logging.getLogger(name).setLevel(logging.INFO if "-v" in opts else\
+                                     logging.WARNING)
+  log.debug(__doc__)
+  manifest = opts.get("-f","build.xml")
+  if not os.path.isfile(manifest):
+    log.error("Error: Manifest %s does not exist"%manifest)
+    sys.exit(-1)
+  statefile = os.path.join(os.path.dirname(os.path.abspath(manifest)),\
+                           _state_file)
+  try:
+    nodes = ReadManifest(manifest)
+    state = LoadState(statefile)
+    done = BuildNodes(nodes,state,args,jobs,"-B" in opts,"-n" in opts)
+  except (BuildError,xml.etree.ElementTree.ParseError) as e:
+    log.error("Error in %s> %s"%(manifest,e))
+    sys.exit(-1)
+  if "-n" not in opts:
+    SaveState(statefile,state)
+  counts = dict((i,list(done.values()).count(i)) for i in \
+                ("built","fresh","failed","skipped"))
+  log.warning("%d steps, %d built, %d up to date, %d failed, %d skipped"%\
+              (len(done),counts["built"],counts["fresh"],counts["failed"],\
+               counts["skipped"]))
+  sys.exit(-1 if counts["failed"] or counts["skipped"] else 0)
+############################################################################
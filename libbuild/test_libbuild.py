@@ -0,0 +1,75 @@
+############################################################################
+"""Tests of the libbuild staleness checks"""
+############################################################################
+import os,logging,tempfile,unittest
+import libbuild
+############################################################################
+manifest = """<build>
+  <symbols output="out/conn.lib">
+    <spec>specs/conn.xml</spec>
+  </symbols>
+  <footprints output="out/conn.emp">
+    <spec>fp/conn.xml</spec>
+  </footprints>
+  <merge output="out/all.lib">
+    <input>out/conn.lib</input>
+  </merge>
+</build>
+"""
+files = {
+  "specs/conn.xml":"""<library>
+<component refname="J" compname="CONN4" package="DIP" PIN_N="4"></component>
+</library>
+""",
+  "fp/conn.xml":"""<library>
+<module package="CONN-Dual" modname="P8" PIN_N="8"/>
+</library>
+"""}
+############################################################################
+class StaleTest(unittest.TestCase):
+  """Only the steps with changed inputs are built again"""
+  def setUp(self):
+    logging.disable(logging.WARNING)
+    self.tmp = tempfile.TemporaryDirectory()
+    self.manifest = os.path.join(self.tmp.name,"build.xml")
+    with open(self.manifest,"w") as f:
+      f.write(manifest)
+    for name, text in files.items():
+      os.makedirs(os.path.join(self.tmp.name,os.path.dirname(name)),\
+                  exist_ok=True)
+      with open(os.path.join(self.tmp.name,name),"w") as f:
+        f.write(text)
+    self.nodes = libbuild.ReadManifest(self.manifest)
+    self.state = {}
+
+  def tearDown(self):
+    self.tmp.cleanup()
+    logging.disable(logging.NOTSET)
+
+  def build(self):
+    done = libbuild.BuildNodes(self.nodes,self.state)
+    return sorted(set(done.values())), done
+
+  def test_rebuild(self):
+    self.assertEqual(self.build()[0],["built"])
+    self.assertEqual(self.build()[0],["fresh"])
+
+  def test_touch(self):
+    self.build()
+    spec = os.path.join(self.tmp.name,"specs","conn.xml")
+    st = os.stat(spec)
+    os.utime(spec,ns=(st.st_atime_ns,st.st_mtime_ns+10**9))
+    self.assertEqual(self.build()[0],["fresh"])
+
+  def test_edit(self):
+    self.build()
+    spec = os.path.join(self.tmp.name,"specs","conn.xml")
+    with open(spec,"w") as f:
+      f.write(files["specs/conn.xml"].replace('"4"','"6"'))
+    done = self.build()[1]
+    self.assertEqual(done["out/conn.lib"],"built")
+    self.assertEqual(done["out/all.lib"],"built")
+    self.assertEqual(done["out/conn.emp"],"fresh")
+############################################################################
+if __name__ == "__main__" :
+  unittest.main()
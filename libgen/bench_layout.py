@@ -0,0 +1,37 @@
+#!/usr/bin/python
+############################################################################
+"""
+##  bench_layout - Timing of the libgen pin layouts
+##
+##  Compares the pin by pin loops with the columnar layout of the DIP and
+##  QUAD packages, the pin columns are laid out anew on every run
+"""
+############################################################################
+#IMPORTS>
+import sys,timeit
+import libgen
+############################################################################
+def Pins(count):
+  """Pin rows of a large symbol"""
+  return [["P%d"%i,"B"] for i in range(1,count+1)]
+
+def LayoutTime(layout, pins, columnar, repeat=5):
+  """Best time in ms of one layout of the pins"""
+  def run():
+    libgen.PinColumns_DIP.cache_clear()
+    libgen.PinColumns_QUAD.cache_clear()
+    layout(pins,{"compname":"BENCH"})
+  libgen._columnar_layout = columnar
+  number = max(1,20000//len(pins))
+  return min(timeit.repeat(run,number=number,repeat=repeat))/number*1000
+
+if __name__ == "__main__" :
+  counts = [int(i) for i in sys.argv[1:]] or [1024,4096,16384]
+  print("package   pins   loops ms  columns ms")
+  for name, layout in (("DIP",libgen.GetTemplate_DIP),\
+                       ("QUAD",libgen.GetTemplate_QUAD)):
+    for count in counts:
+      pins = Pins(count)
+      print("%-7s %6d %10.2f %11.2f"%(name,count,\
+            LayoutTime(layout,pins,0),LayoutTime(layout,pins,1)))
+############################################################################
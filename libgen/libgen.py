@@ -37,59 +37,120 @@
 ############################################################################
 ############################################################################
 #IMPORTS>
-import xml.dom.minidom,sys,os,re
+import xml.etree.ElementTree,sys,os,re,getopt,glob
+import concurrent.futures,functools,hashlib,json,logging,io,itertools
+import mmap,tempfile,shutil
 from datetime import datetime
 ############################################################################
 #EXPORT>
-__all__=['Help_xml2lib','xml2lib']
+__all__=['Help_xml2lib','xml2lib','xml2lib_batch','UpsertLib','LibGenError']
 __author__ = "Abhijit Bose(info@adharlabs.in)"
 __author_email__="info@adharlabs.in"
 __version__ = "0.1"
 ############################################################################
-#DEBUG> Print Additional Debug Messages
-#  if needed make _debug_message = 1
-_debug_message = 0
+#LOGGING> Messages of the Generator
+#  INFO gives one line per component, DEBUG adds the generated text
+log = logging.getLogger("libgen")
+############################################################################
+#CACHE> Size limit in bytes of the rendered component cache
+_cache_size = 64*1024*1024
+#  Number of symbol layouts kept in memory for the components that differ
+#  only in their names and fields, least recently used first out. Each
+#  process keeps its own, so with -j every worker lays out its layouts
+#  once. The size is fixed when the module is loaded, edit it here (0 to
+#  lay out every component anew), changing it at runtime has no effect
+_layout_cache = 1024
+############################################################################
+#LAYOUT> Place the DIP and QUAD pins as whole coordinate columns
+#  in plain Python, without NumPy as the row formatting dominates,
+#  bench_layout.py times both. If needed make _columnar_layout = 0 for
+#  the pin by pin loops
+_columnar_layout = 1
 ############################################################################
 #FORMAT>Lib
-template_lib = """EESchema-LIBRARY Version 2.3  Date: 6/1/2012-05:30AM IST
+template_lib_head = """EESchema-LIBRARY Version 2.3  Date: 6/1/2012-05:30AM IST
 #encoding utf-8
-#
+"""
+template_lib_def = """#
 # %(compname)s
 #
-DEF %(compname)s %(refname)s 0 40 Y Y 1 F N
+DEF %(compname)s %(refname)s 0 40 Y Y %(unitcount)s %(unitlock)s N
 F0 "%(refname)s" 0 %(refname_y)s 50 H V C C N N
 F1 "%(compname)s" 0 %(compname_y)s 50 H V C C N N
-DRAW
+%(fields)sDRAW
 %(box)s
-%(pins)s
-ENDDRAW
+"""
+#  Footprint of the component when it has one, hidden below the name
+template_lib_footprint = """F2 "%(footprint)s" 0 %(footprint_y)d 50 H I C C N N
+"""
+#  Pins of the component go here one per line
+template_lib_enddef = """ENDDRAW
 ENDDEF
-#
+"""
+template_lib_foot = """#
 # End Library
 """
-template_dcm = """EESchema-DOCLIB  Version 2.0  Date: 6/1/2012-05:30AM IST
-#
+template_dcm_head = """EESchema-DOCLIB  Version 2.0  Date: 6/1/2012-05:30AM IST
+"""
+template_dcm_comp = """#
 $CMP %(compname)s
 %(dk)s
 $ENDCMP
-#
+"""
+template_dcm_foot = """#
 # End Doc Library
 """
 ############################################################################
+#FORMAT>KiCad Symbol Library (s-expression), one symbol per component
+#  with the description and keywords as its properties
+template_sym_head = """(kicad_symbol_lib (version 20211014) (generator libgen)
+"""
+template_sym_foot = """)
+"""
+# Electrical Types, Pin Orientations and Box Fills of the Lib format
+sym_etypes = {"I":"input","O":"output","B":"bidirectional",
+              "T":"tri_state","P":"passive","U":"unspecified",
+              "W":"power_in","w":"power_out","C":"open_collector",
+              "E":"open_emitter","N":"no_connect"}
+sym_orients = {"R":"0","U":"90","L":"180","D":"270"}
+sym_fills = {"N":"none","F":"outline","f":"background"}
+############################################################################
+#ERRORS>
+class LibGenError(Exception):
+  """Error in the spec of a component, carries the component name
+  and the reason"""
+  def __init__(self, compname, reason):
+    Exception.__init__(self, compname, reason)
+    self.compname = compname
+    self.reason = reason
+  def __str__(self):
+    return "%s: %s"%(self.compname,self.reason)
+############################################################################
 #FORMAT FUNCTIONS>
-def PinDescriptions(comp):
-  "Read in the pin descriptions as a list"
-  el = comp.getElementsByTagName("component")[0]
-  xbits=[i.data for i in el.childNodes if i.nodeType==el.TEXT_NODE]
-  
-  # Split into lines
-  bits = "".join(xbits).split("\n")
-  #Remove white space
-  bits = [ i.strip() for i in bits ]
-  #Remove empty strings
-  bits = [ i for i in bits if i!="" ]
-  #Get the Pin names & Modes
-  bits = [ i.split(',') for i in bits]
+def IterComponents(srcxmlfile):
+  """Stream the component elements of a spec file one at a time,
+  each one is freed once the caller is done with it"""
+  root = None
+  for event, el in xml.etree.ElementTree.iterparse(srcxmlfile,\
+                                                   ("start","end")):
+    if event == "start":
+      if root is None:#Remember the Document Element
+        root = el
+    elif el.tag == "component":
+      yield el
+      # Free the Component and drop it from the Document
+      el.clear()
+      if el is not root:
+        root.clear()
+
+def PinDescriptions(el):
+  "Read in the pin descriptions of a component element as a list"
+  # Text of the Element is its own Text and the Tails of its Children
+  xbits = [el.text or ""] + [i.tail or "" for i in el]
+  # Split into lines, Remove white space and empty strings
+  # Get the Pin names & Modes
+  bits = [ i.split(',') for i in \
+           (j.strip() for j in "".join(xbits).split("\n")) if i!="" ]
   return bits
 
 def PinGen(numb):
@@ -100,24 +161,63 @@ def PinGen(numb):
   #print bits
   return bits
 
-def MetaData(comp):
+def MetaData(el):
   "Extract the component description parameters (common to all pins)"
-  el = comp.getElementsByTagName("component")[0]
   d = {}
-  for name, value in list(el.attributes.items()) :
+  for name, value in list(el.attrib.items()) :
     d[name] = value
   return d
 ############################################################################
+#Pin Placement FUNCTIONS>
+def PinNumber(pin, count):
+  """Number of a pin, its position unless the pin row carries one"""
+  return pin[2] if pin[2:] else count
+
+def PinRows(pins, xs, ys, sides):
+  """Format all the pin rows of a package from its coordinate columns,
+  sides holds the length, orientation and unit part of each row"""
+  return ["X %s %s %s %s%s%s"%(p[0],p[2] if p[2:] else n,x,y,s,p[1]) \
+          for p,n,x,y,s in zip(pins,itertools.count(1),xs,ys,sides)]
+
+@functools.lru_cache(maxsize=_layout_cache)
+def PinColumns_DIP(pl, width, plen, unit=1):
+  """Coordinate columns of the DIP pins, down the left side and
+  up the right side"""
+  n = pl//2
+  top = (n+1)*50
+  col = range(100,n*100+1,100)
+  xs = [-width//2-plen]*n + [width//2+plen]*n
+  ys = [top-i for i in col] + [i-top for i in col]
+  sides = [" %d R 50 50 %d 1 "%(plen,unit)]*n + \
+          [" %d L 50 50 %d 1 "%(plen,unit)]*n
+  return xs, ys, sides
+
+@functools.lru_cache(maxsize=_layout_cache)
+def PinColumns_QUAD(pl, wdiff, plen, unit=1):
+  """Coordinate columns of the QUAD pins, counter clockwise from
+  the top of the left side"""
+  n = pl//4
+  half = wdiff+n*50
+  col = range(wdiff+50,n*100+wdiff-49,100)
+  xs = [-half-plen]*n + [i-half for i in col] + \
+       [half+plen]*n + [half-i for i in col]
+  ys = [half-i for i in col] + [-half-plen]*n + \
+       [i-half for i in col] + [half+plen]*n
+  sides = [" %d R 50 50 %d 1 "%(plen,unit)]*n + \
+          [" %d U 50 50 %d 1 "%(plen,unit)]*n + \
+          [" %d L 50 50 %d 1 "%(plen,unit)]*n + \
+          [" %d D 50 50 %d 1 "%(plen,unit)]*n
+  return xs, ys, sides
+############################################################################
 #Component Forming FUNCTIONS>
 def GetTemplate_DIP(pins, d) :
   #{ Begin of DIP
     """ Generator Function for the DIP Package"""
-    print(">Working for DIP or PDIP Package")
+    log.debug(">Working for DIP or PDIP Package")
     # Count the Number of pins
     pl = len(pins)
     if (pl%2)!=0:
-      print("Package has odd number of pins")
-      sys.exit(-1)
+      raise LibGenError(d.get("compname"),"Package has odd number of pins")
     # Split the Pin array in Two parts
     left_p = pins[:int(pl/2)]
     right_p = pins[int(pl/2):]
@@ -133,10 +233,16 @@ def GetTemplate_DIP(pins, d) :
     # Locate the Reference Designators accordinly
     d["refname_y"] = str(0)
     d["compname_y"] = str(-100)    
+    # Unit of the Symbol, 0 when it has only the One Unit
+    unit = d.get("unit",0)
     # Make the Box Parameter
-    d["box"] = "S %d %d %d %d 0 1 0 N"%(left,top,right,bottom)
+    d["box"] = "S %d %d %d %d %d 1 0 N"%(left,top,right,bottom,unit)
     # Pin Length
     plen = 200
+    if _columnar_layout:#All Pins in one go
+      d["pinlines"] = PinRows(pins, \
+                              *PinColumns_DIP(pl, int(width), plen, unit or 1))
+      return d
     # Pin Counter
     count = 1
     # Result Array
@@ -146,8 +252,8 @@ def GetTemplate_DIP(pins, d) :
       ypos = top - (count*100)
       xpos = left - plen
       txt.append(\
-        "X %s %d %d %d %d R 50 50 1 1 %s"%\
-        (pin[0],count,xpos,ypos,plen,pin[1])\
+        "X %s %s %d %d %d R 50 50 %d 1 %s"%\
+        (pin[0],PinNumber(pin,count),xpos,ypos,plen,unit or 1,pin[1])\
         )
       count += 1
     # Construct the Pins Array for Right Side
@@ -155,19 +261,19 @@ def GetTemplate_DIP(pins, d) :
       ypos = bottom + ((count-len(left_p))*100)
       xpos = right + plen
       txt.append(\
-        "X %s %d %d %d %d L 50 50 1 1 %s"%\
-        (pin[0],count,xpos,ypos,plen,pin[1])\
+        "X %s %s %d %d %d L 50 50 %d 1 %s"%\
+        (pin[0],PinNumber(pin,count),xpos,ypos,plen,unit or 1,pin[1])\
         )
       count += 1
     # Consolidate the Pins Array 
-    d["pins"] = "\n".join(txt)    
+    d["pinlines"] = txt
     return d
   #} End of DIP
   
 def GetTemplate_SIP(pins, d) :
   #{ Begin SIP
     """ Generator Function for the SIP Package"""
-    print(">Working for SIP Package")
+    log.debug(">Working for SIP Package")
     # Count the Number of pins
     pl = len(pins)
     # Height dependant on Number of Pins Spaced at 100mil
@@ -182,8 +288,10 @@ def GetTemplate_SIP(pins, d) :
     # Locate the Reference Designators accordinly
     d["refname_y"] = str(top+50)
     d["compname_y"] = str(bottom-50)
+    # Unit of the Symbol, 0 when it has only the One Unit
+    unit = d.get("unit",0)
     # Make the Box Parameter
-    d["box"] = "S %d %d %d %d 0 1 0 N"%(left,top,right,bottom)
+    d["box"] = "S %d %d %d %d %d 1 0 N"%(left,top,right,bottom,unit)
     # Pin Length for SIP
     plen = 200
     # Pin Counter
@@ -195,24 +303,23 @@ def GetTemplate_SIP(pins, d) :
       ypos = top - (count*100)
       xpos = right + plen
       txt.append(\
-        "X %s %d %d %d %d L 50 50 1 1 %s"%\
-        (pin[0],count,xpos,ypos,plen,pin[1])\
+        "X %s %s %d %d %d L 50 50 %d 1 %s"%\
+        (pin[0],PinNumber(pin,count),xpos,ypos,plen,unit or 1,pin[1])\
         )
       count += 1
     # Consolidate the Pins Array  
-    d["pins"] = "\n".join(txt)
+    d["pinlines"] = txt
     return d
   #} End of SIP
   
 def GetTemplate_CONN(pins, d) :
   #{ Begin CONN
     """ Generator Function for the CONN Package"""
-    print(">Working for CONN Package")
+    log.debug(">Working for CONN Package")
     # Count the Number of pins
     pl = len(pins)
     if (pl%2)!=0:
-      print("Package has odd number of pins")
-      sys.exit(-1)
+      raise LibGenError(d.get("compname"),"Package has odd number of pins")
     # Height dependant on Number of Pins Spaced at 100mil
     height = (pl/2+1)*100
     # Width for the body according to Pin String
@@ -225,8 +332,10 @@ def GetTemplate_CONN(pins, d) :
     # Locate the Reference Designators accordinly
     d["refname_y"] = str(top+50)
     d["compname_y"] = str(bottom-50)
+    # Unit of the Symbol, 0 when it has only the One Unit
+    unit = d.get("unit",0)
     # Make the Box Parameter
-    d["box"] = "S %d %d %d %d 0 1 0 N"%(left,top,right,bottom)
+    d["box"] = "S %d %d %d %d %d 1 0 N"%(left,top,right,bottom,unit)
     # Pin Length for SIP
     plen = 200
     # Pin Counter
@@ -241,32 +350,32 @@ def GetTemplate_CONN(pins, d) :
         ypos = top - (align*100)
         xpos = left - plen
         txt.append(\
-          "X %s %d %d %d %d R 50 50 1 1 %s"%\
-        (pin[0],count,xpos,ypos,plen,pin[1])\
+          "X %s %s %d %d %d R 50 50 %d 1 %s"%\
+        (pin[0],PinNumber(pin,count),xpos,ypos,plen,unit or 1,pin[1])\
           )
       elif(count%2)==0:#EVEN Pin Right
         ypos = top - (align*100)
         xpos = right + plen
         txt.append(\
-          "X %s %d %d %d %d L 50 50 1 1 %s"%\
-        (pin[0],count,xpos,ypos,plen,pin[1])\
+          "X %s %s %d %d %d L 50 50 %d 1 %s"%\
+        (pin[0],PinNumber(pin,count),xpos,ypos,plen,unit or 1,pin[1])\
           )
         align += 1 #After every even pin the line changes
       count += 1
     # Consolidate the Pins Array  
-    d["pins"] = "\n".join(txt)
+    d["pinlines"] = txt
     return d
   #} End of CONN
   
 def GetTemplate_QUAD(pins, d) :
   #{ Begin QUAD
     """ Generator Function for the QUAD Package"""
-    print(">Working for QUAD Package")
+    log.debug(">Working for QUAD Package")
     # Count the Number of pins
     pl = len(pins)
     if (pl%4)!=0:
-      print("Package does not have pins in multiples of 4")
-      sys.exit(-1)    
+      raise LibGenError(d.get("compname"),\
+                        "Package does not have pins in multiples of 4")
     # Width for the body according to Pin String
     wdiff = max([len(i[0]) for i in pins] )*50
     width = (wdiff*2)+100*pl/4
@@ -285,10 +394,16 @@ def GetTemplate_QUAD(pins, d) :
     bottom_p = pins[int(pl/4):int(pl/2)]
     right_p = pins[int(pl/2):int(3*pl/4)]
     top_p =pins[int(3*pl/4):]
+    # Unit of the Symbol, 0 when it has only the One Unit
+    unit = d.get("unit",0)
     # Make the Box Parameter
-    d["box"] = "S %d %d %d %d 0 1 0 N"%(left,top,right,bottom)
+    d["box"] = "S %d %d %d %d %d 1 0 N"%(left,top,right,bottom,unit)
     # Pin Length for SIP
     plen = 200
+    if _columnar_layout:#All Pins in one go
+      d["pinlines"] = PinRows(pins, \
+                              *PinColumns_QUAD(pl, wdiff, plen, unit or 1))
+      return d
     # Pin Counter
     count = 1   
     # Result Array
@@ -299,8 +414,8 @@ def GetTemplate_QUAD(pins, d) :
       ypos = top - (align*100) - wdiff + 50
       xpos = left - plen
       txt.append(\
-          "X %s %d %d %d %d R 50 50 1 1 %s"%\
-        (pin[0],count,xpos,ypos,plen,pin[1])\
+          "X %s %s %d %d %d R 50 50 %d 1 %s"%\
+        (pin[0],PinNumber(pin,count),xpos,ypos,plen,unit or 1,pin[1])\
           )
       align +=1
       count +=1
@@ -310,8 +425,8 @@ def GetTemplate_QUAD(pins, d) :
       ypos = bottom - plen
       xpos = left + (align*100) + wdiff - 50
       txt.append(\
-          "X %s %d %d %d %d U 50 50 1 1 %s"%\
-        (pin[0],count,xpos,ypos,plen,pin[1])\
+          "X %s %s %d %d %d U 50 50 %d 1 %s"%\
+        (pin[0],PinNumber(pin,count),xpos,ypos,plen,unit or 1,pin[1])\
           )
       align +=1
       count +=1
@@ -321,8 +436,8 @@ def GetTemplate_QUAD(pins, d) :
       ypos = bottom + (align*100) + wdiff - 50
       xpos = right + plen 
       txt.append(\
-          "X %s %d %d %d %d L 50 50 1 1 %s"%\
-        (pin[0],count,xpos,ypos,plen,pin[1])\
+          "X %s %s %d %d %d L 50 50 %d 1 %s"%\
+        (pin[0],PinNumber(pin,count),xpos,ypos,plen,unit or 1,pin[1])\
           )
       align +=1
       count +=1
@@ -332,29 +447,98 @@ def GetTemplate_QUAD(pins, d) :
       ypos = top + plen
       xpos = right - (align*100) - wdiff + 50
       txt.append(\
-          "X %s %d %d %d %d D 50 50 1 1 %s"%\
-        (pin[0],count,xpos,ypos,plen,pin[1])\
+          "X %s %s %d %d %d D 50 50 %d 1 %s"%\
+        (pin[0],PinNumber(pin,count),xpos,ypos,plen,unit or 1,pin[1])\
           )
       align +=1
       count +=1
     # Consolidate the Pins Array  
-    d["pins"] = "\n".join(txt)
+    d["pinlines"] = txt
     return d
   #} End of QUAD
   
+#Layout Function for each of the supported Packages
+layouts = {"DIP":GetTemplate_DIP, "PDIP":GetTemplate_DIP,
+           "SIP":GetTemplate_SIP, "CONN":GetTemplate_CONN,
+           "QUAD":GetTemplate_QUAD}
+
+def SplitUnits(pins, unitpins=None):
+  """Split the pins into the Units of the symbol, by the group in the
+  third column of the pin rows and into at most unitpins pins each.
+  Returns the list of the units, the pin rows of a split symbol
+  are [name, etype, number]"""
+  if unitpins == None and not any(pin[2:] for pin in pins):
+    return [pins]
+  groups = {}
+  for count, pin in enumerate(pins,1):
+    group = pin[2] if pin[2:] else ""
+    groups.setdefault(group,[]).append([pin[0],pin[1],count])
+  units = []
+  for group in groups.values():
+    step = unitpins or len(group)
+    units.extend(group[i:i+step] for i in range(0,len(group),step))
+  return units
+
 def GetTemplateDict(pins, d) :
   """Get the Kicad format lib file"""
-  if not (d["package"] in ["DIP","PDIP","SIP","CONN","QUAD"]):
-    print("Unsupported package")
-    sys.exit(-1)
-  if (d["package"] == "DIP") or (d["package"] == "PDIP"):
-    d = GetTemplate_DIP(pins, d)
-  elif (d["package"] == "SIP"):
-    d = GetTemplate_SIP(pins, d)
-  elif (d["package"] == "CONN"):
-    d = GetTemplate_CONN(pins, d)
-  elif (d["package"] == "QUAD"):
-    d = GetTemplate_QUAD(pins, d)
+  for name in ("compname","refname"):
+    if not d.get(name):
+      raise LibGenError(d.get("compname"),"No %s given"%name)
+  if not (d.get("package") in layouts):
+    raise LibGenError(d.get("compname"),\
+                      "Unsupported package %s"%d.get("package"))
+  # Check for the Splitting into Units
+  unitpins = d.get("unitpins")
+  if unitpins != None:
+    if not unitpins.isdigit() or int(unitpins) == 0:
+      raise LibGenError(d.get("compname"),"Invalid unitpins %s"%unitpins)
+    unitpins = int(unitpins)
+  # Every Pin needs a Name and a known Electrical Type
+  if not pins:
+    raise LibGenError(d.get("compname"),"No pins")
+  for count, pin in enumerate(pins,1):
+    if len(pin) < 2 or not pin[0] or pin[1] not in sym_etypes:
+      raise LibGenError(d.get("compname"),\
+                        "Invalid pin %d '%s'"%(count,",".join(pin)))
+  try:
+    layout = SymbolLayout(d["package"], tuple(tuple(i) for i in pins),\
+                          unitpins)
+  except LibGenError as e:
+    raise LibGenError(d.get("compname"),e.reason)
+  d.update(layout)
+  d["pinlines"] = list(layout["pinlines"])
+  return d
+
+@functools.lru_cache(maxsize=_layout_cache)
+def SymbolLayout(package, pins, unitpins=None):
+  """Box, pins and field positions of a symbol from the package and the
+  tuple of pin rows, kept in this process for the components with the
+  same layout"""
+  d = {"package":package}
+  units = SplitUnits(pins, unitpins)
+  d["unitcount"] = 1
+  d["unitlock"] = "F"
+  if len(units) == 1:
+    d = layouts[package](units[0], d)
+    d["pinlines"] = tuple(d["pinlines"])
+    return d
+  # Each unit gets its own Box and Pins
+  boxes = []
+  pinlines = []
+  largest = max(len(i) for i in units)
+  for unit, upins in enumerate(units,1):
+    ud = layouts[package](upins, dict(d, unit=unit))
+    boxes.append(ud["box"])
+    pinlines.extend(ud["pinlines"])
+    if len(upins) == largest:#Fields placed as per the Largest Unit
+      d["refname_y"] = ud["refname_y"]
+      d["compname_y"] = ud["compname_y"]
+      largest = None
+  d["box"] = "\n".join(boxes)
+  d["pinlines"] = tuple(pinlines)
+  # Units are not interchangeable
+  d["unitcount"] = len(units)
+  d["unitlock"] = "L"
   return d
 
 def GetDcmDict(d):
@@ -378,7 +562,9 @@ def GetDcmDict(d):
 ############################################################################
 #OTHER FUNCTIONS>
 def Help_xml2lib():
-  print("""Usage: %s <spec file> [<lib file>]
+  print("""Usage: %(prog)s [-q|-v] <spec file> [<lib file>]
+       %(prog)s [-q|-v] [-j <jobs>] [-c <cache dir>] -o <lib file> <spec> [<spec> ...]
+       %(prog)s [-q|-v] -u <lib file> <spec> [<spec> ...]
   
 Where <spec file> is a file containing the PIN descriptions
 and <lib file> is the name of the generated component description.
@@ -389,6 +575,26 @@ also with the same name.
 <spec file> is an XML format file, containing the pin descriptions and
 optional meta data.  It contains a single XML element 'component'.
 
+With -o every 'component' element of every <spec> is written into
+the single <lib file> (and its .DCM). For several components in one
+<spec file> wrap them in an enclosing element, e.g. <library>.
+A <spec> can also be a directory (all .xml files below it) or a glob
+pattern. With -j the spec files are processed on <jobs> processes
+(0 for one per CPU), the order of the library stays the same.
+With -c the rendered components are kept in <cache dir> and reused
+for the components whose spec has not changed.
+
+With -u the components of every <spec> replace the components of the
+same name in the existing <lib file> (and its .DCM), or are added to it.
+The rest of the library is copied as it is.
+
+A <lib file> ending in .kicad_sym is written as a KiCad s-expression
+symbol library, with the description and keywords in the symbols and
+no .DCM, which KiCad loads without converting it.
+
+By default one line is printed per component, -q prints only the errors
+and the summary, -v also prints the generated library text.
+
 example:
 <component refname="Ref_des" compname="Comp_Name" package="PDIP"
 description="DESC" keywords="KEYW1 KEYW2 KEYW3">
@@ -407,6 +613,8 @@ Kicad library rules.
   special character including space.]
 [.i.e. Keywords needs to be sperated by Space and can only
   contain Alpha numeric characters along with underscore]
+An optional footprint="<Footprint Name>" is kept in the footprint field
+of the symbol.
 
 ETYPE is the electrical type of the Pin:
 I: INPUT 
@@ -427,6 +635,15 @@ Example.
 <component refname="J" compname="MOLEX_8" package="SIP" PIN_N="8">
 </component>
 
+Large parts can be split into several units of the symbol. Either give
+unitpins="<Pins per Unit>" or add a group as third column of the pin
+rows (PIN1DESCRIPTION,ETYPE,GROUP), each group becomes its own unit.
+Both can be combined. The pins of a unit must fit the package, e.g. a
+multiple of 4 for QUAD. Example.
+<component refname="U" compname="FPGA" package="QUAD" unitpins="256">
+...
+</component>
+
 Schematics Symbol Packages:-
 
 DIP -
@@ -486,19 +703,15 @@ QUAD -
             |   |   ..   |   |
             |   |   ..   |   |
         
-"""%os.path.split(sys.argv[0])[1])
+"""%{"prog":os.path.split(sys.argv[0])[1]})
   sys.exit(-1)
 ############################################################################
 #Processing FUNCTION>
-def xml2lib(srcxmlfile,destlibfile):
-  #{ Begin Lib Gen
-  """Fuction to convert the Xml Format to Kicad lib file format"""
-  # Read in the XML file
-  xmlcomp = xml.dom.minidom.parse( srcxmlfile )
+def Component2Dict(el):
+  """Build the Translation Dictionary for one component element"""
   # Read Meta Data
-  meta = MetaData(xmlcomp)  
-  if _debug_message==1:
-      print(meta)
+  meta = MetaData(el)
+  log.debug(meta)
   #Check for Existance of a Generic Parameter
   try:
     meta["PIN_N"]
@@ -506,60 +719,488 @@ def xml2lib(srcxmlfile,destlibfile):
     meta["PIN_N"] = None
   # Populate the Pins
   if meta["PIN_N"] != None: #if not Pins are Described
-    pins = PinGen(int(meta["PIN_N"]))    
+    if not meta["PIN_N"].isdigit():
+      raise LibGenError(meta.get("compname"),\
+                        "Invalid PIN_N %s"%meta["PIN_N"])
+    pins = PinGen(int(meta["PIN_N"]))
   else:
-    pins = PinDescriptions(xmlcomp)
-  if _debug_message==1:
-      print(pins)
+    pins = PinDescriptions(el)
+  log.debug(pins)
+  d = Pins2Dict(pins, meta)
+  log.debug(d)
+  return d
+
+def Pins2Dict(pins, meta):
+  """Build the Translation Dictionary of a component from its pin rows
+  and attributes, for the callers that have the pins parsed already"""
   # Create the Translation Dictionary
   d = GetTemplateDict(pins, meta)
-  if _debug_message==1:
-    print(d)
+  d["fields"] = ""
+  if d.get("footprint"):
+    d["fields"] = template_lib_footprint%{"footprint":d["footprint"],\
+                  "footprint_y":float(d["compname_y"])-100}
   # Agument the Dictionary with DCM Parameters as well
-  d = GetDcmDict(d)
-  # Apply the Formatting on Lib Template
-  out = template_lib%d
-  print(out)
-  # Apply Optional Dcm Template
-  outdcm =""
+  return GetDcmDict(d)
+
+def WriteComponent(f,d):
+  """Write the DEF block of a component to the text sink f"""
+  f.write(template_lib_def%d)
+  f.writelines(i+"\n" for i in d["pinlines"])
+  f.write(template_lib_enddef)
+
+def WriteDcmComponent(f,d):
+  """Write the $CMP block of a component to the text sink f"""
   if d["dk"] != "":
-    outdcm = template_dcm%d
-    print(outdcm)
+    f.write(template_dcm_comp%d)
+
+def FormatComponent(d):
+  """Get the lib and dcm text of a component as strings"""
+  lib = io.StringIO()
+  WriteComponent(lib,d)
+  dcm = io.StringIO()
+  WriteDcmComponent(dcm,d)
+  return lib.getvalue(),dcm.getvalue()
+
+def MilToMm(v):
+  """Format a dimension in mils as mm for the s-expression formats"""
+  mm = "%.4f"%(float(v)*0.0254)
+  mm = mm.rstrip("0").rstrip(".")
+  return "0" if mm in ("","-0") else mm
+
+def Quoted(text):
+  """Quote a string for the s-expression formats"""
+  return '"%s"'%(text or "").replace("\\","\\\\").replace('"','\\"')
+
+def FormatSymbol(d):
+  """Get the KiCad symbol text of a component from the same box and
+  pin lines as the lib format"""
+  font = "(effects (font (size 1.27 1.27)))"
+  hidden = "(effects (font (size 1.27 1.27)) hide)"
+  name = Quoted(d["compname"])
+  out = ['  (symbol %s (pin_names (offset 1.016)) (in_bom yes) (on_board yes)'\
+         %name]
+  props = [("Reference",d["refname"],d["refname_y"],font),
+           ("Value",d["compname"],d["compname_y"],font),
+           ("Footprint",d.get("footprint",""),0,hidden),("Datasheet","",0,hidden)]
+  if d.get("keywords"):
+    props.append(("ki_keywords",d["keywords"],0,hidden))
+  if d.get("description"):
+    props.append(("ki_description",d["description"],0,hidden))
+  for i, (key, value, y, effects) in enumerate(props):
+    out.append('    (property "%s" %s (id %d) (at 0 %s 0)\n      %s)'%\
+               (key,Quoted(value),i,MilToMm(y),effects))
+  # Graphics and Pins go to the sub symbol of their unit
+  units = {}
+  for line in d["box"].split("\n"):
+    f = line.split()
+    units.setdefault(int(f[5]),[]).append(\
+      '      (rectangle (start %s %s) (end %s %s)\n'\
+      '        (stroke (width 0) (type default) (color 0 0 0 0))\n'\
+      '        (fill (type %s)))'%(MilToMm(f[1]),MilToMm(f[2]),\
+                                   MilToMm(f[3]),MilToMm(f[4]),\
+                                   sym_fills.get(f[-1],"none")))
+  for line in d["pinlines"]:
+    f = line.split()
+    units.setdefault(int(f[9]),[]).append(\
+      '      (pin %s line (at %s %s %s) (length %s)\n'\
+      '        (name %s %s)\n        (number %s %s))'%\
+      (sym_etypes.get(f[11],"unspecified"),MilToMm(f[3]),MilToMm(f[4]),\
+       sym_orients[f[6]],MilToMm(f[5]),Quoted(f[1]),font,Quoted(f[2]),font))
+  for unit in sorted(units):
+    out.append('    (symbol %s'%Quoted("%s_%d_1"%(d["compname"],unit)))
+    out.extend(units[unit])
+    out.append('    )')
+  out.append('  )\n')
+  return "\n".join(out)
+
+def LibFormat(destlibfile):
+  """Format of the library file from its name, 'kicad_sym' for the
+  s-expression symbol library and 'lib' otherwise"""
+  return "kicad_sym" if destlibfile.endswith(".kicad_sym") else "lib"
+
+def DcmFileName(destlibfile):
+  """Name of the DCM file going along with the lib file"""
+  return os.path.splitext(destlibfile)[0]+".dcm"
+
+def xml2lib(srcxmlfile,destlibfile):
+  #{ Begin Lib Gen
+  """Fuction to convert the Xml Format to Kicad lib file format"""
+  # Read in the first Component of the XML file
+  el = next(IterComponents(srcxmlfile),None)
+  if el == None:
+    raise LibGenError(None,"No component in %s"%srcxmlfile)
+  d = Component2Dict(el)
+  if log.isEnabledFor(logging.DEBUG):
+    for i in FormatComponent(d):
+      log.debug(i)
+  log.info("Component %s from %s"%(d["compname"],srcxmlfile))
+  if LibFormat(destlibfile) == "kicad_sym":#Description goes in the Symbol
+    with open(destlibfile,"w") as f:
+      f.write(template_sym_head)
+      f.write(FormatSymbol(d))
+      f.write(template_sym_foot)
+    log.info("File %s written"%destlibfile)
+    return
   # Write The File
   with open(destlibfile,"w") as f:
-        f.write(out)
-  print("File %s written"%destlibfile)
+    f.write(template_lib_head)
+    WriteComponent(f,d)
+    f.write(template_lib_foot)
+  log.info("File %s written"%destlibfile)
   # If Description exist the write the DCM
-  if outdcm != "":
-    dcmfl = re.match("(.*)\..*",destlibfile).group(1)+".dcm"
+  if d["dk"] != "":
+    dcmfl = DcmFileName(destlibfile)
     with open(dcmfl,"w") as f:
-        f.write(outdcm)
-    print("File %s written"%dcmfl) 
+      f.write(template_dcm_head)
+      WriteDcmComponent(f,d)
+      f.write(template_dcm_foot)
+    log.info("File %s written"%dcmfl)
   #} End of Lib Gen
+
+def SpecFiles(paths):
+  """Expand the Directories and Glob patterns into a sorted list of
+  spec files"""
+  files = []
+  for path in paths:
+    if os.path.isdir(path):#All the XML files under the Directory
+      for top, dirs, names in os.walk(path):
+        files.extend(os.path.join(top,i) for i in names \
+                     if i.lower().endswith(".xml"))
+    elif os.path.isfile(path):
+      files.append(path)
+    else:#Pattern for the Spec files
+      files.extend(glob.glob(path))
+  return sorted(set(files))
+
+@functools.lru_cache(maxsize=None)
+def SourceHash():
+  """Hash of the generator source, the layouts and templates that
+  render the cached components"""
+  with open(os.path.abspath(__file__),"rb") as f:
+    return hashlib.sha1(f.read()).hexdigest()
+
+def CacheKey(el,fmt="lib"):
+  """Hash of the component spec without the text after it, its layout
+  function, the output format and the generator version and source,
+  used to look up the rendered component in the cache"""
+  h = hashlib.sha1(__version__.encode())
+  h.update(b"\0" + SourceHash().encode())
+  h.update(b"\0" + fmt.encode())
+  layout = layouts.get(el.get("package"))
+  h.update(b"\0" + (layout.__name__ if layout else "").encode())
+  tail, el.tail = el.tail, None#Whitespace up to the next Component
+  try:
+    h.update(b"\0" + xml.etree.ElementTree.tostring(el))
+  finally:
+    el.tail = tail
+  return h.hexdigest()
+
+def CacheLoad(cachedir,key):
+  """Get the rendered (compname, lib, dcm) from the cache or None"""
+  fl = os.path.join(cachedir,key[:2],key)
+  try:
+    with open(fl) as f:
+      comp = tuple(json.load(f))
+  except (IOError,ValueError):
+    return None
+  os.utime(fl)#Mark as recently used for the Eviction
+  return comp
+
+def CacheStore(cachedir,key,comp):
+  """Save the rendered (compname, lib, dcm) in the cache"""
+  fl = os.path.join(cachedir,key[:2],key)
+  os.makedirs(os.path.dirname(fl),exist_ok=True)
+  # Write a Temporary first so other processes never see half a file
+  tmp = "%s.%d.tmp"%(fl,os.getpid())
+  with open(tmp,"w") as f:
+    json.dump(comp,f)
+  os.replace(tmp,fl)
+
+def CachePrune(cachedir,cachesize):
+  """Evict the least recently used entries until the cache fits in
+  cachesize bytes"""
+  entries = []
+  for top, dirs, names in os.walk(cachedir):
+    for name in names:
+      st = os.stat(os.path.join(top,name))
+      entries.append((st.st_mtime,st.st_size,os.path.join(top,name)))
+  total = sum(i[1] for i in entries)
+  for mtime, size, fl in sorted(entries):
+    if total <= cachesize:
+      break
+    os.remove(fl)
+    total -= size
+
+def IterRendered(srcxmlfile,cachedir=None,fmt="lib"):
+  """Render the components of a spec file one by one into their lib
+  and dcm parts, yields (compname, lib, dcm, error) for each of them.
+  With fmt 'kicad_sym' lib is the symbol text and dcm is empty.
+  With a cachedir the unchanged components are taken from the cache"""
+  try:
+    for el in IterComponents(srcxmlfile):
+      if cachedir != None:
+        key = CacheKey(el,fmt)
+        comp = CacheLoad(cachedir,key)
+        if comp != None:
+          yield comp + (None,)
+          continue
+      try:
+        d = Component2Dict(el)
+      except LibGenError as e:#Leave out only this Component
+        yield (e.compname,"","",str(e))
+        continue
+      # Apply the Formatting on Lib and Dcm Templates
+      if fmt == "kicad_sym":
+        comp = (d["compname"],FormatSymbol(d),"")
+      else:
+        comp = (d["compname"],) + FormatComponent(d)
+      if cachedir != None:
+        CacheStore(cachedir,key,comp)
+      yield comp + (None,)
+  except (xml.etree.ElementTree.ParseError,EnvironmentError) as e:
+    yield (None,"","",str(e))
+
+def RenderSpec(srcxmlfile,cachedir=None,fmt="lib"):
+  """Render all the components of a spec file, returns (srcxmlfile,
+  [(compname, lib, dcm, error)...]) for use on a Process Pool"""
+  return (srcxmlfile,list(IterRendered(srcxmlfile,cachedir,fmt)))
+
+def xml2lib_batch(srcxmlfiles,destlibfile,jobs=1,cachedir=None,\
+                  cachesize=_cache_size):
+  #{ Begin Batch Lib Gen
+  """Fuction to convert every component in a set of Xml files into
+  a single Kicad lib file and its DCM file, using 'jobs' processes.
+  A .kicad_sym destlibfile is written as a KiCad symbol library.
+  With a cachedir the rendered components are reused across runs.
+  The later components with an already used name are left out.
+  Returns the list of (srcxmlfile, error) for the failed components"""
+  failed = []
+  count = 0
+  seen = set()
+  fmt = LibFormat(destlibfile)
+  if fmt == "kicad_sym":
+    head, foot = template_sym_head, template_sym_foot
+  else:
+    head, foot = template_lib_head, template_lib_foot
+  pool = None
+  if jobs == 1:#Render the Components while they are written
+    results = ((i,IterRendered(i,cachedir,fmt)) for i in srcxmlfiles)
+  else:#Fan out on a Process Pool, map keeps the Order of the Files
+    workers = jobs or os.cpu_count() or 1
+    pool = concurrent.futures.ProcessPoolExecutor(workers)
+    results = pool.map(functools.partial(RenderSpec,cachedir=cachedir,\
+                                         fmt=fmt),\
+                       srcxmlfiles,\
+                       chunksize=max(1,len(srcxmlfiles)//(workers*4)))
+  fdcm = None
+  try:#The Pool and the DCM are closed even when the writing fails
+    with open(destlibfile,"w") as f:
+      f.write(head)
+      for srcxmlfile, comps in results:
+        for compname, lib, dcm, error in comps:
+          if error != None:#Failed Components are left out
+            log.info("Failed %s> %s"%(srcxmlfile,error))
+            failed.append((srcxmlfile,error))
+            continue
+          if compname in seen:#The first Component of a Name is kept
+            log.warning("Duplicate component %s in %s left out"%\
+                        (compname,srcxmlfile))
+            continue
+          seen.add(compname)
+          f.write(lib)
+          if dcm != "":
+            if fdcm == None:#DCM only once there is a Description
+              dcmfl = DcmFileName(destlibfile)
+              fdcm = open(dcmfl,"w")
+              fdcm.write(template_dcm_head)
+            fdcm.write(dcm)
+          log.info("Component %s from %s"%(compname,srcxmlfile))
+          count += 1
+      f.write(foot)
+    log.info("File %s written"%destlibfile)
+    # If Description exist the write the DCM
+    if fdcm != None:
+      fdcm.write(template_dcm_foot)
+      log.info("File %s written"%dcmfl)
+  finally:
+    if fdcm != None:
+      fdcm.close()
+    if pool != None:
+      pool.shutdown(cancel_futures=True)
+  if cachedir != None:
+    CachePrune(cachedir,cachesize)
+  # Summary of the Build
+  log.warning("%d components from %d spec files, %d failed"%\
+              (count,len(srcxmlfiles),len(failed)))
+  for srcxmlfile, error in failed:
+    log.warning("  %s> %s"%(srcxmlfile,error))
+  return failed
+  #} End of Batch Lib Gen
+  
+############################################################################
+#Library Update FUNCTIONS>
+#Blocks of a Library by their name and its Footer, a block starts at the
+#comment ahead of it if there is one. A top level symbol ends at the
+#closing parenthesis of its own indent, spaces or tabs
+lib_block = re.compile(\
+  rb"^(?:#\r?\n# [^\n]*\n#\r?\n)?DEF ~?(?P<name>\S+) .*?^ENDDEF[^\n]*\n",\
+  re.M|re.S)
+lib_foot = re.compile(rb"^#\r?\n# End Library",re.M)
+dcm_block = re.compile(\
+  rb"^(?:#\r?\n)?\$CMP (?P<name>\S+)\r?\n.*?^\$ENDCMP[^\n]*\n",re.M|re.S)
+dcm_foot = re.compile(rb"^#\r?\n# End Doc Library",re.M)
+sym_block = re.compile(\
+  rb'^(?P<indent>[ \t]+)\(symbol "(?P<name>(?:[^"\\]|\\.)*)"'\
+  rb'.*?^(?P=indent)\)[ \t]*\r?\n',re.M|re.S)
+sym_foot = re.compile(rb"^\)",re.M)
+
+def BlockIndex(buf,block,foot):
+  """Scan the library once for the offsets of its blocks, returns
+  ([(name, start, end)...], offset of the footer)"""
+  index = [(m.group("name").decode(),m.start(),m.end()) \
+           for m in block.finditer(buf)]
+  m = None
+  for m in foot.finditer(buf,index[-1][2] if index else 0):
+    pass
+  return index, (m.start() if m else len(buf))
+
+def UpsertFile(destfile,head,foot,block,footre,comps):
+  """Replace or insert the blocks {name: text} in the library file,
+  the rest of the file is copied as it is and the new file replaces
+  the old one only once it is complete"""
+  comps = dict(comps)
+  fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(destfile)))
+  try:
+    with os.fdopen(fd,"wb") as out:
+      if os.path.isfile(destfile) and os.path.getsize(destfile) > 0:
+        with open(destfile,"rb") as f, \
+             mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ) as buf:
+          index, end = BlockIndex(buf,block,footre)
+          view = memoryview(buf)
+          pos = 0
+          for name, start, stop in index:
+            if name in comps:#Replace the Block
+              out.write(view[pos:start])
+              out.write(comps.pop(name).encode("utf-8"))
+              pos = stop
+          out.write(view[pos:end])
+          # New Blocks go ahead of the Footer
+          for text in comps.values():
+            out.write(text.encode("utf-8"))
+          out.write(view[end:])
+          view.release()
+      else:#New Library
+        out.write(head.encode("utf-8"))
+        for text in comps.values():
+          out.write(text.encode("utf-8"))
+        out.write(foot.encode("utf-8"))
+    # Keep the Permissions of the old file or as for a new file
+    if os.path.isfile(destfile):
+      shutil.copymode(destfile,tmp)
+    else:
+      mask = os.umask(0)
+      os.umask(mask)
+      os.chmod(tmp,0o666 & ~mask)
+    os.replace(tmp,destfile)
+  except:
+    os.remove(tmp)
+    raise
+
+def UpsertLib(srcxmlfiles,destlibfile):
+  #{ Begin Lib Update
+  """Fuction to replace or add the components of a set of Xml files
+  in an existing Kicad lib file and its DCM file.
+  Returns the list of (srcxmlfile, error) for the failed components"""
+  failed = []
+  libs = {}
+  dcms = {}
+  fmt = LibFormat(destlibfile)
+  for srcxmlfile in srcxmlfiles:
+    for compname, lib, dcm, error in IterRendered(srcxmlfile,None,fmt):
+      if error != None:#Failed Components are left out
+        log.info("Failed %s> %s"%(srcxmlfile,error))
+        failed.append((srcxmlfile,error))
+        continue
+      libs[compname] = lib
+      dcms[compname] = dcm
+      log.info("Component %s from %s"%(compname,srcxmlfile))
+  if fmt == "kicad_sym":#Symbols carry their own Description
+    UpsertFile(destlibfile,template_sym_head,template_sym_foot,\
+               sym_block,sym_foot,libs)
+  else:
+    UpsertFile(destlibfile,template_lib_head,template_lib_foot,\
+               lib_block,lib_foot,libs)
+  log.info("File %s updated"%destlibfile)
+  # Components without Description lose their old DCM entry
+  if fmt == "lib":
+    dcmfl = DcmFileName(destlibfile)
+    if os.path.isfile(dcmfl) or any(dcms.values()):
+      UpsertFile(dcmfl,template_dcm_head,template_dcm_foot,\
+                 dcm_block,dcm_foot,dcms)
+      log.info("File %s updated"%dcmfl)
+  log.warning("%d components updated, %d failed"%(len(libs),len(failed)))
+  for srcxmlfile, error in failed:
+    log.warning("  %s> %s"%(srcxmlfile,error))
+  return failed
+  #} End of Lib Update
   
 ############################################################################
 #MAIN FUNCTION>
 if __name__ == "__main__" :
-  if not sys.argv[1:] :#Atleast one Argument Supplied
+  try:
+    opts, args = getopt.getopt(sys.argv[1:],"o:u:j:c:qv")
+    opts = dict(opts)
+    jobs = int(opts.get("-j","1"))
+  except (getopt.GetoptError,ValueError):
+    Help_xml2lib()
+  if not args :#Atleast one Argument Supplied
     Help_xml2lib()
-  if not os.path.isfile(sys.argv[1]) :#Check if the Source exists
+  # Only Errors with -q and all the Generated text with -v
+  level = logging.INFO
+  if "-q" in opts:
+    level = logging.WARNING
+  elif "-v" in opts:
+    level = logging.DEBUG
+  logging.basicConfig(format="%(message)s",level=level,stream=sys.stdout)
+  # Print the Introduction
+  log.debug(__doc__)
+  if "-u" in opts :#Update the Components in an existing Library
+    srcfls = SpecFiles(args)
+    if not srcfls :#Check if the Sources exist
+      Help_xml2lib()
+    destfl = opts["-u"]
+    log.info("Source Files> %d spec files"%len(srcfls))
+    log.info("Updated File> "+destfl)
+    failed = UpsertLib(srcfls,destfl)
+    sys.exit(-1 if failed else 0)
+  if "-o" in opts :#Batch of spec files into a Single Library
+    srcfls = SpecFiles(args)
+    if not srcfls :#Check if the Sources exist
+      Help_xml2lib()
+    destfl = opts["-o"]
+    log.info("Source Files> %d spec files"%len(srcfls))
+    log.info("Destination File> "+destfl)
+    # Process the files
+    failed = xml2lib_batch(srcfls,destfl,jobs,opts.get("-c"))
+    sys.exit(-1 if failed else 0)
+  if not os.path.isfile(args[0]) :#Check if the Source exists
     Help_xml2lib()
   #File Names
-  srcfl = sys.argv[1]
+  srcfl = args[0]
   destfl = ""
-  if sys.argv[2:] :#if Two Arguments were provided
-    destfl = sys.argv[2]
+  if args[1:] :#if Two Arguments were provided
+    destfl = args[1]
   else:#if only One Argument
-    fl = re.match("(.*)\..*",srcfl)
+    fl = re.match(r"(.*)\..*",srcfl)
     if fl:#Create the Name of the Lib
       destfl = str(fl.group(1))+".lib"
     else:
       destfl = srcfl + ".lib"      
-  # Print the Introduction
-  print(__doc__)
-  print("Source File> "+srcfl)
-  print("Destination File> "+destfl)
-  print()
+  log.info("Source File> "+srcfl)
+  log.info("Destination File> "+destfl)
   # Process the files
-  xml2lib(srcfl,destfl)
-  
+  try:
+    xml2lib(srcfl,destfl)
+  except LibGenError as e:
+    log.error("Error in %s> %s"%(srcfl,e))
+    sys.exit(-1)
@@ -0,0 +1,134 @@
+############################################################################
+"""Tests of the libgen batch and update modes"""
+############################################################################
+import os,re,sys,tempfile,unittest
+import libgen
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),\
+                               "..","pincheck"))
+import pincheck
+############################################################################
+good_spec = """<component refname="U" compname="GOOD" package="DIP">
+A,I
+B,O
+</component>
+"""
+#Specs each with one Component that fails
+bad_specs = {
+  "nopins":"""<component refname="U" compname="NOPINS" package="DIP">
+</component>
+""",
+  "noetype":"""<component refname="U" compname="NOETYPE" package="DIP">
+A
+B,O
+</component>
+""",
+  "badetype":"""<component refname="U" compname="BADETYPE" package="DIP">
+A,X
+B,O
+</component>
+""",
+  "nocompname":"""<component refname="U" package="DIP">
+A,I
+B,O
+</component>
+""",
+  "norefname":"""<component compname="NOREF" package="DIP">
+A,I
+B,O
+</component>
+"""}
+############################################################################
+class BadSpecTest(unittest.TestCase):
+  """One bad component fails only itself, the batch goes on"""
+  def setUp(self):
+    self.tmp = tempfile.TemporaryDirectory()
+    self.specs = []
+    for name, text in [("good",good_spec)]+sorted(bad_specs.items()):
+      fl = os.path.join(self.tmp.name,name+".xml")
+      with open(fl,"w") as f:
+        f.write(text)
+      self.specs.append(fl)
+
+  def tearDown(self):
+    self.tmp.cleanup()
+
+  def checkLib(self, destlib, failed):
+    self.assertEqual(len(failed),len(bad_specs))
+    for srcxmlfile, error in failed:
+      self.assertNotIn("good",srcxmlfile)
+    with open(destlib) as f:
+      lib = f.read()
+    self.assertEqual(lib.count("\nDEF "),1)
+    self.assertIn("DEF GOOD U",lib)
+
+  def test_batch(self):
+    destlib = os.path.join(self.tmp.name,"out.lib")
+    self.checkLib(destlib,libgen.xml2lib_batch(self.specs,destlib))
+
+  def test_update(self):
+    destlib = os.path.join(self.tmp.name,"out.lib")
+    self.checkLib(destlib,libgen.UpsertLib(self.specs,destlib))
+############################################################################
+class DuplicateTest(unittest.TestCase):
+  """A component name is written once to the batch library"""
+  def test_batch(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      specs = []
+      for name in ("a","b"):
+        specs.append(os.path.join(tmp,name+".xml"))
+        with open(specs[-1],"w") as f:
+          f.write(good_spec.replace("package=","description=\"%s\" "\
+                                    "package="%name))
+      destlib = os.path.join(tmp,"out.lib")
+      self.assertEqual(libgen.xml2lib_batch(specs,destlib),[])
+      with open(destlib) as f:
+        self.assertEqual(f.read().count("\nDEF GOOD "),1)
+      with open(libgen.DcmFileName(destlib)) as f:
+        dcm = f.read()
+      self.assertEqual(dcm.count("$CMP GOOD"),1)
+      self.assertIn("D a",dcm)
+############################################################################
+class KicadSymTest(unittest.TestCase):
+  """The batch writes a .kicad_sym library of the same pins"""
+  def test_batch(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      spec = os.path.join(tmp,"good.xml")
+      with open(spec,"w") as f:
+        f.write(good_spec)
+      destlib = os.path.join(tmp,"out.kicad_sym")
+      self.assertEqual(libgen.xml2lib_batch([spec],destlib),[])
+      with open(destlib) as f:
+        lib = f.read()
+      self.assertTrue(lib.startswith("(kicad_symbol_lib "))
+      self.assertEqual(lib.count("("),lib.count(")"))
+      self.assertEqual(lib.count('(symbol "GOOD" '),1)
+      self.assertFalse(os.path.exists(libgen.DcmFileName(destlib)))
+      self.assertEqual(pincheck.SymbolPins(destlib),{"GOOD":{"1","2"}})
+############################################################################
+class TabIndentTest(unittest.TestCase):
+  """Symbols of a tab indented .kicad_sym are replaced and indexed"""
+  def test_update(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      specs = []
+      for name, text in (("good",good_spec),\
+                         ("other",good_spec.replace("GOOD","OTHER"))):
+        specs.append(os.path.join(tmp,name+".xml"))
+        with open(specs[-1],"w") as f:
+          f.write(text)
+      destlib = os.path.join(tmp,"out.kicad_sym")
+      self.assertEqual(libgen.xml2lib_batch(specs[:1],destlib),[])
+      with open(destlib) as f:
+        lib = f.read()
+      with open(destlib,"w") as f:
+        f.write(re.sub("(?m)^(  )+",lambda m: "\t"*(len(m.group())//2),lib))
+      self.assertEqual(libgen.UpsertLib(specs,destlib),[])
+      with open(destlib) as f:
+        lib = f.read()
+      self.assertEqual(lib.count('(symbol "GOOD" '),1)
+      self.assertEqual(lib.count("(")-lib.count(")"),0)
+      pins = pincheck.SymbolPins(destlib)
+      self.assertEqual(sorted(pins),["GOOD","OTHER"])
+      self.assertEqual(pins["GOOD"],{"1","2"})
+############################################################################
+if __name__ == "__main__" :
+  unittest.main()
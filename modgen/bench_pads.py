@@ -0,0 +1,44 @@
+#!/usr/bin/python
+############################################################################
+"""
+##  bench_pads - Timing of the modgen pad generation
+##
+##  Times MakePads of every package for growing pad counts, the pad
+##  layouts are made anew on every run. The time per pad stays the same
+##  as the pads grow when the generation is linear
+"""
+############################################################################
+#IMPORTS>
+import sys,math,timeit
+import modgen
+############################################################################
+def PackageParams(package, count):
+  """Module parameters of a package with about count pads"""
+  params = {"package":package,"PIN_N":"%d"%count}
+  if package == "QUAD":
+    params["PIN_N_HORIZ"] = "%d"%(count//4)
+  elif package == "BGA":
+    side = int(math.sqrt(count))
+    params = {"package":package,"rows":"%d"%side,"cols":"%d"%side}
+  return params
+
+def PadTime(package, count, repeat=5):
+  """Best time in ms of the pads of one module and its pad count"""
+  meta = modgen.ModuleMeta(PackageParams(package,count))
+  pins = modgen.PinGen(int(meta["PIN_N"]))
+  def run():
+    modgen.PadLayout.cache_clear()
+    modgen.PadText.cache_clear()
+    modgen.MakePads(pins,meta)
+  number = max(1,20000//len(pins))
+  return min(timeit.repeat(run,number=number,repeat=repeat))/number*1000,\
+         len(pins)
+
+if __name__ == "__main__" :
+  counts = [int(i) for i in sys.argv[1:]] or [100,1000,10000]
+  print("package      pads      ms   us/pad")
+  for package in sorted(modgen.package_defaults):
+    for count in counts:
+      ms, pads = PadTime(package,count)
+      print("%-10s %6d %8.2f %8.2f"%(package,pads,ms,ms*1000/pads))
+############################################################################
@@ -44,17 +44,19 @@
 ##          
 ## TODO:
 ## - Automatic Name Generation
-## - Add Lib Gen Capability
 ##
 ############################################################################
 ############################################################################
 #IMPORTS>
 ############################################################################
-import xml.dom.minidom,re,sys,os,tkinter.ttk,tkinter.messagebox
-from tkinter import *
+import re,sys,os,math,logging,getopt,itertools,functools,concurrent.futures
+import tempfile,shutil,array
+import xml.etree.ElementTree
 ############################################################################
 #EXPORT>
 ############################################################################
+__all__=['Help_modgen','GenerateModule','ModuleMeta','CheckMeta',\
+         'MakeModule','ModuleFileName','ModGenError']
 __author__ = "Abhijit Bose(info@adharlabs.in)"
 __author_email__="info@adharlabs.in"
 __version__ = "0.4"
@@ -64,14 +66,36 @@ __version__ = "0.4"
 ############################################################################
 _debug_message = 1
 ############################################################################
+#LOGGING> Messages of the Generator
+#  INFO gives one line per module, DEBUG adds the parameters and the
+#  generated text
+############################################################################
+log = logging.getLogger("modgen")
+############################################################################
+#CACHE> Number of pad layouts kept for the modules that differ only in
+#  their names, least recently used first out. Each process keeps its
+#  own, so with -j every worker lays out its layouts once. The size is
+#  fixed when the module is loaded, edit it here (0 to lay out every
+#  module anew), changing it at runtime has no effect
+############################################################################
+_layout_cache = 256
+############################################################################
+#UNITS> The dimensions are handled as integer nanometres and written
+#  to the module in 0.1 mils
+############################################################################
+nm_per_mil = 25400
+nm_per_dmil = 2540
+nm_per_unit = {"mils":nm_per_mil,"mm":1000000}
+############################################################################
 #FORMAT>Lib
 ############################################################################
-template_pcb = """PCBNEW-LibModule-V1  07-02-2012 08:54:12
+template_pcb_head = """PCBNEW-LibModule-V1  07-02-2012 08:54:12
 # encoding utf-8
 $INDEX
-%(modname)s
+%(index)s
 $EndINDEX
-#
+"""
+template_pcb_module = """#
 # %(modname)s PACK[%(package)s] 
 #
 $MODULE %(modname)s
@@ -82,15 +106,25 @@ Kw %(keywords)s
 Sc 00000000
 AR %(modname)s
 Op 0 0 0
-T0 0 %(modref_y)s 600 600 0 120 N V 21 "%(refname)s"
-T1 0 -500 50 50 0 10 N I 21 "VAL**"
+T0 %(modref_x)s %(modref_y)s 600 600 0 120 %(textmirror)s V %(silklayer)s "%(refname)s"
+T1 0 -500 50 50 0 10 %(textmirror)s I %(silklayer)s "VAL**"
 %(drawing)s
 %(pads)s
 $EndMODULE  %(modname)s
-$EndLIBRARY
+"""
+template_pcb_foot = """$EndLIBRARY
 #
 # End Module
 """
+# A Library with a Single Module
+template_pcb = template_pcb_head%{"index":"%(modname)s"}+\
+               template_pcb_module+template_pcb_foot
+#Templates for Automatic Nameing
+template_desc_pcb ="""%(name)s %(pin)sPin%(rowx1)s%(fix)s %(pitch)s Pitch \
+%(pad)s Pad %(drill)s %(shape)s %(type)s"""
+template_keyw_pcb ="""%(name)s%(pin)s_%(fix)s %(name)s%(pin)s_%(fix)s_\
+%(pitch)s %(name)s%(pin)s%(rowx1)s_%(fix)s_%(pitch)s_%(pad)s\
+_%(drill)s%(shape)s%(type)s"""
 template_pad="""
 $PAD
 Sh %(shape)s
@@ -100,22 +134,61 @@ Ne 0 ""
 Po %(pinx)s %(piny)s
 $EndPAD"""
 
+############################################################################
+#FORMAT>KiCad
+############################################################################
+template_kicad_mod = """(footprint %(modname)s (version 20211014) (generator modgen)
+  (layer "%(side)s.Cu")
+  (descr %(description)s)
+  (tags %(keywords)s)
+  (attr %(attr)s)
+  (fp_text reference %(refname)s (at %(modref_x)s %(modref_y)s) \
+(layer "%(side)s.SilkS")
+    (effects (font (size 1.524 1.524) (thickness 0.3048))%(justify)s)
+  )
+  (fp_text value "VAL**" (at 0 -1.27) (layer "%(side)s.SilkS") hide
+    (effects (font (size 0.127 0.127) (thickness 0.0254))%(justify)s)
+  )
+%(drawing)s%(pads)s)
+"""
+template_kicad_line = """  (fp_line (start %s %s) (end %s %s) (layer "%%(side)s.SilkS") \
+(width 0.3048))
+"""
+template_kicad_circle = """  (fp_circle (center %s %s) (end %s %s) (layer "%%(side)s.SilkS") \
+(width 0.3048))
+"""
+template_kicad_pad = """  (pad %(name)s %(padtype)s %(shape)s (at %(pinx)s %(piny)s) \
+(size %(sizex)s %(sizey)s)%(drill)s (layers %(layers)s))
+"""
+kicad_pad_shapes = {"C":"circle","R":"rect","O":"oval"}
+
 ############################################################################
 #FORMAT FUNCTIONS>
 ############################################################################
-def PinDescriptions(comp):
-  "Read in the pin descriptions as a list"
-  el = xmlcomp.getElementsByTagName("module")[0]
-  xbits=[i.data for i in el.childNodes if i.nodeType==el.TEXT_NODE]
-  
-  # Split into lines
-  bits = "".join(xbits).split("\n")
-  #Remove white space
-  bits = [ i.strip() for i in bits ]
-  #Remove empty strings
-  bits = [ i for i in bits if i!="" ]
-  #Get the Pin names & Modes
-  bits = [ i.split(',') for i in bits]
+def IterModules(specfile):
+  """Stream the module, sweep and part elements of a spec file one at
+  a time, each one is freed once the caller is done with it"""
+  root = None
+  for event, el in xml.etree.ElementTree.iterparse(specfile,\
+                                                   ("start","end")):
+    if event == "start":
+      if root is None:#Remember the Document Element
+        root = el
+    elif el.tag in ("module","sweep","part"):
+      yield el
+      # Free the Module and drop it from the Document
+      el.clear()
+      if el is not root:
+        root.clear()
+############################################################################
+def PinDescriptions(el):
+  "Read in the pin descriptions of a module element as a list"
+  # Text of the Element is its own Text and the Tails of its Children
+  xbits = [el.text or ""] + [i.tail or "" for i in el]
+  # Split into lines, Remove white space and empty strings
+  # Get the Pin names & Modes
+  bits = [ i.split(',') for i in \
+           (j.strip() for j in "".join(xbits).split("\n")) if i!="" ]
   return bits
 ############################################################################
 def PinGen(numb):
@@ -126,254 +199,1227 @@ def PinGen(numb):
   #print bits
   return bits
 ############################################################################
-def MetaData(comp):
-  "Extract the component description parameters (common to all pins)"
-  el = comp.getElementsByTagName("module")[0]
-  d = {}
-  for name, value in list(el.attributes.items()) :
-    d[name] = value
-  return d
-############################################################################
-def MakePads_SIP(pins,meta):
-  """To Make the Pads and draw outline for SIP Connector"""
-  pin_str = ""
+def MetaData(el):
+  "Extract the module parameters of a module element"
+  return dict(el.attrib)
+############################################################################
+class ModParams(object):
+  """Module parameters parsed once from the meta dict, dimensions are
+  integer nanometres and the counts integers"""
+  __slots__ = ("package","pins","pitch","padx","pady","drill","rowx","rowy",
+               "nh","nv","rows","cols","depop","padshape","padtype",
+               "layermask","firstpadsquare","locking")
+  def __init__(self, meta):
+    scale = nm_per_unit[meta.get("units","mils")]
+    def dim(name):
+      if meta.get(name) == None:
+        return None
+      try:
+        return int(round(float(meta[name])*scale))
+      except ValueError:
+        raise ModGenError(meta.get("modname"),"Invalid %s Value"%name)
+    def count(name):
+      if meta.get(name) == None:
+        return None
+      try:
+        return int(meta[name])
+      except ValueError:
+        raise ModGenError(meta.get("modname"),"Invalid %s Value"%name)
+    self.package = meta["package"]
+    self.pins = count("PIN_N")
+    self.pitch = dim("pitch")
+    self.padx = dim("padx")
+    self.pady = dim("pady")
+    self.drill = dim("paddrill")
+    self.rowx = dim("rowx")
+    self.rowy = dim("rowy")
+    self.nh = count("PIN_N_HORIZ")
+    self.nv = None
+    if self.nh != None:
+      self.nv = int((self.pins-(self.nh*2))/2)
+    self.rows = count("rows")
+    self.cols = count("cols")
+    self.depop = meta.get("depop")
+    self.padshape = meta["padshape"]
+    self.padtype = meta["padtype"]
+    self.layermask = meta["padlayermask"]
+    self.firstpadsquare = meta["firstpadsquare"]!=None
+    #Locking pads are offset by the given mils in any units
+    self.locking = (count("locking") or 0)*nm_per_unit["mils"]
+  def key(self):
+    return tuple(getattr(self,i) for i in self.__slots__)
+  def __eq__(self, other):
+    return isinstance(other,ModParams) and self.key()==other.key()
+  def __hash__(self):
+    return hash(self.key())
+############################################################################
+def FormatPads(pads,p,layermask=None):
+  """Format the pads as $PAD text, each pad is a tuple
+  (name, shape, size x, size y, x, y) with the dimensions in nm.
+  The parameters common to all the pads are formatted only once"""
+  fmt = template_pad%{"shape":'"%s" %s %d %d 0 0 0',\
+                      "drill":"%d 0 0"%(p.drill/nm_per_dmil),\
+                      "padtype":p.padtype,\
+                      "layermask":layermask or p.layermask,\
+                      "pinx":"%d","piny":"%d"}
+  return "".join([fmt%(n,s,sx/nm_per_dmil,sy/nm_per_dmil,x/nm_per_dmil,\
+                       y/nm_per_dmil) for n,s,sx,sy,x,y in pads])
+############################################################################
+def DrawLine(kind,x1,y1,x2,y2,layer="21"):
+  """Format a silk screen line (DS) or circle (DC) given in nm"""
+  return "%s %d %d %d %d 120 %s"%(kind,x1/nm_per_dmil,y1/nm_per_dmil,\
+                                  x2/nm_per_dmil,y2/nm_per_dmil,layer)
+############################################################################
+def MakePads_SIP(pins,p):
+  """To Make the Pads and draw outline for SIP Connector,
+  returns the pads, the drawing lines and the reference position"""
+  pads = []
   x = 0
-  y = 0
-  pin = {}
-  pitch = float(meta["pitch"]) * 10
-  locking = 0
-  for p in pins:
-    if(meta["locking"]!=None):
-      if(locking==0):
-        locking=1
-        pin["piny"]="%d"%(y+(int(meta["locking"])*10))
-      else:
-        locking=0
-        pin["piny"]="%d"%(y-(int(meta["locking"])*10))
-    else:
-      pin["piny"]="%d"%(y)
-    pin["pinx"]="%d"%(x)
-    x = x + pitch
-    pin["padtype"]=meta["padtype"]
-    pin["layermask"]=meta["padlayermask"]
-    pin["drill"]="%d 0 0"%(int(float(meta["paddrill"])*10))
-    if(x==pitch and meta["firstpadsquare"]!= None):
-      pin["shape"]="\"%s\" %s %d %d 0 0 0"%(p[0],"R",\
-          float(meta["padx"])*10,float(meta["pady"])*10)
-    else:
-      pin["shape"]="\"%s\" %s %d %d 0 0 0"%(p[0],meta["padshape"],\
-          float(meta["padx"])*10,float(meta["pady"])*10)
-    pin_str += template_pad%pin #Add the Pad
+  lock = p.locking #Pads alternate up and down
+  for n in pins:
+    pads.append((n,p.padshape,p.padx,p.pady,x,lock))
+    lock = -lock
+    x = x + p.pitch
+  if len(pads) and p.firstpadsquare:
+    pads[0] = (pads[0][0],"R")+pads[0][2:]
   # Make Drawing  
-  buf = (max(float(meta["padx"]),float(meta["pady"]))+50)*10
-  X = x - pitch + buf
-  mx = buf/-2
-  if(meta["locking"]!=None):#Add some margin for Locking
-    buf = buf + (int(meta["locking"])*20.0)
+  buf = max(p.padx,p.pady)+50*nm_per_mil
+  X = x - p.pitch + buf
+  mx = -buf//2
+  buf = buf + 2*p.locking #Add some margin for Locking
   Y = buf #Increase Y Only  
-  my = buf/-2  
-  drawing  = "DS %d %d %d %d 120 21"%(mx,my,mx+X,my)
-  drawing += "\nDS %d %d %d %d 120 21"%(mx,my,mx,my+Y)
-  drawing += "\nDS %d %d %d %d 120 21"%(mx,my+Y,mx+X,my+Y)
-  drawing += "\nDS %d %d %d %d 120 21"%(mx+X,my,mx+X,my+Y)
-  meta["drawing"]=drawing
-  meta["modref_y"]="-1000"
-  return pin_str
-############################################################################
-def MakePads_DIP(pins,meta):
-  """To Make the Pads and draw outline for DIP Package"""
-  pin_str = ""
-  x = 0
-  y = 0
-  pin = {}
-  pitch = float(meta["pitch"]) * 10
-  #Set First Half of the Pins
-  for i in range(0,int(len(pins)/2)):
-    pin["piny"]="%d"%(y)
-    pin["pinx"]="%d"%(x)
-    y = y + pitch
-    pin["padtype"]=meta["padtype"]
-    pin["layermask"]=meta["padlayermask"]
-    pin["drill"]="%d 0 0"%(int(float(meta["paddrill"])*10))
-    if(x==pitch and meta["firstpadsquare"]!= None):
-      pin["shape"]="\"%s\" %s %d %d 0 0 0"%(pins[i],"R",\
-          float(meta["padx"])*10,float(meta["pady"])*10)
-    else:
-      pin["shape"]="\"%s\" %s %d %d 0 0 0"%(pins[i],meta["padshape"],\
-          float(meta["padx"])*10,float(meta["pady"])*10)
-    pin_str += template_pad%pin #Add the Pad
-  #Increment the Next Row
-  x = float(meta["rowx"])*10
-  y = y - pitch
-  #Set Second Half of the Pins
-  for i in range(int(len(pins)/2),len(pins)):
-    pin["piny"]="%d"%(y)
-    pin["pinx"]="%d"%(x)
-    y = y - pitch
-    pin["padtype"]=meta["padtype"]
-    pin["layermask"]=meta["padlayermask"]
-    pin["drill"]="%d 0 0"%(int(float(meta["paddrill"])*10))
-    pin["shape"]="\"%s\" %s %d %d 0 0 0"%(pins[i],meta["padshape"],\
-          float(meta["padx"])*10,float(meta["pady"])*10)
-    pin_str += template_pad%pin #Add the Pad
+  my = -buf//2
+  drawing = [("DS",mx,my,mx+X,my),
+             ("DS",mx,my,mx,my+Y),
+             ("DS",mx,my+Y,mx+X,my+Y),
+             ("DS",mx+X,my,mx+X,my+Y)]
+  return pads,drawing,-1000*nm_per_dmil
+############################################################################
+def MakePads_DIP(pins,p):
+  """To Make the Pads and draw outline for DIP Package,
+  returns the pads, the drawing lines and the reference position"""
+  half = len(pins)//2
+  #First Half of the Pins down the first Row, then up the Next Row
+  pads = [(pins[i],p.padshape,p.padx,p.pady,0,i*p.pitch)\
+          for i in range(0,half)]
+  pads.extend([(pins[i],p.padshape,p.padx,p.pady,p.rowx,\
+                (2*half-1-i)*p.pitch) for i in range(half,len(pins))])
   # Make Drawing  
-  bufx = (float(meta["padx"])+100+float(meta["rowx"]))*10
-  bufy = ((float(meta["pitch"])*(len(pins)-2)/2.0)\
-          +100+float(meta["pady"]))*10
-  X = bufx
-  mx = ((float(meta["padx"])/-2.0)-50)*10
-  Y = bufy
-  my = ((float(meta["pady"])/-2.0)-50)*10
-  drawing  = "DS %d %d %d %d 120 21"%(mx,my,mx+X,my)
-  drawing += "\nDS %d %d %d %d 120 21"%(mx,my,mx,Y+my)
-  drawing += "\nDS %d %d %d %d 120 21"%(mx,Y+my,mx+X,Y+my)
-  drawing += "\nDS %d %d %d %d 120 21"%(mx+X,my,mx+X,Y+my)
-  drawing += "\nDC %d %d %d %d 120 21"%(mx-500,0,mx-200,0)
-  meta["drawing"]=drawing
-  meta["modref_y"]="-1500"
-  return pin_str
-############################################################################
-def MakePads_CONN_Dual(pins,meta):
-  """ To Make the Pads and draw outline for Dual row Connector """
-  pin_str = ""
-  x = 0
-  y = 0
-  pin = {}
-  pitch = float(meta["pitch"]) * 10
-  for i in range(0,len(pins)):
-    pin["piny"]="%d"%(y)
-    pin["pinx"]="%d"%(x)
-    if (i&1)==0:#Next Even Pin
-      x = float(meta["rowx"])*10      
-    else:#Next Odd Pin
-      x = 0
-      y = y + pitch
-    pin["padtype"]=meta["padtype"]
-    pin["layermask"]=meta["padlayermask"]
-    pin["drill"]="%d 0 0"%(int(float(meta["paddrill"])*10))
-    if(i == 0 and meta["firstpadsquare"]!= None):
-      pin["shape"]="\"%s\" %s %d %d 0 0 0"%(pins[i],"R",\
-          float(meta["padx"])*10,float(meta["pady"])*10)
-    else:
-      pin["shape"]="\"%s\" %s %d %d 0 0 0"%(pins[i],meta["padshape"],\
-          float(meta["padx"])*10,float(meta["pady"])*10)
-    pin_str += template_pad%pin #Add the Pad
+  X = p.padx+100*nm_per_mil+p.rowx
+  Y = p.pitch*(len(pins)-2)//2+100*nm_per_mil+p.pady
+  mx = -p.padx//2-50*nm_per_mil
+  my = -p.pady//2-50*nm_per_mil
+  drawing = [("DS",mx,my,mx+X,my),
+             ("DS",mx,my,mx,Y+my),
+             ("DS",mx,Y+my,mx+X,Y+my),
+             ("DS",mx+X,my,mx+X,Y+my),
+             ("DC",mx-500*nm_per_dmil,0,mx-200*nm_per_dmil,0)]
+  return pads,drawing,-1500*nm_per_dmil
+############################################################################
+def MakePads_CONN_Dual(pins,p):
+  """ To Make the Pads and draw outline for Dual row Connector,
+  returns the pads, the drawing lines and the reference position"""
+  #Odd Pins on the Second Row
+  pads = [(pins[i],p.padshape,p.padx,p.pady,p.rowx if i&1 else 0,\
+           (i>>1)*p.pitch) for i in range(0,len(pins))]
+  if len(pads) and p.firstpadsquare:
+    pads[0] = (pads[0][0],"R")+pads[0][2:]
   # Make Drawing  
-  bufx = (float(meta["padx"])+100+float(meta["rowx"]))*10
-  bufy = ((float(meta["pitch"])*(len(pins)-2)/2.0)\
-          +100+float(meta["pady"]))*10
-  X = bufx
-  mx = ((float(meta["padx"])/-2.0)-50)*10
-  Y = bufy
-  my = ((float(meta["pady"])/-2.0)-50)*10
-  drawing  = "DS %d %d %d %d 120 21"%(mx,my,mx+X,my)
-  drawing += "\nDS %d %d %d %d 120 21"%(mx,my,mx,Y+my)
-  drawing += "\nDS %d %d %d %d 120 21"%(mx,Y+my,mx+X,Y+my)
-  drawing += "\nDS %d %d %d %d 120 21"%(mx+X,my,mx+X,Y+my)
-  drawing += "\nDC %d %d %d %d 120 21"%(mx-500,0,mx-200,0)
-  meta["drawing"]=drawing
-  meta["modref_y"]="-1500"
-  return pin_str
-############################################################################
-def MakePads_QUAD(pins,meta):
-  """To Make the Pads and draw outline for Quad Package"""
-  pin_str = ""  
-  pitch = float(meta["pitch"]) * 10  
-  pin = {}  
-  #Make the Left side
-  x = (float(meta["rowx"])/-2.0)*10 
-  y = (pitch*(int(meta["PIN_N_HORIZ"]))/-2.0)+(pitch/2.0)
-  b = 0
-  n = int(meta["PIN_N_HORIZ"])
-  for i in range(b,n):
-    pin["piny"]="%d"%(y)
-    pin["pinx"]="%d"%(x)
-    y = y + pitch
-    pin["padtype"]=meta["padtype"]
-    pin["layermask"]=meta["padlayermask"]
-    pin["drill"]="%d 0 0"%(int(float(meta["paddrill"])*10))
-    if(i == 0 and meta["firstpadsquare"]!= None):
-      pin["shape"]="\"%s\" %s %d %d 0 0 0"%(pins[i],"R",\
-          float(meta["padx"])*10,float(meta["pady"])*10)
-    else:
-      pin["shape"]="\"%s\" %s %d %d 0 0 0"%(pins[i],meta["padshape"],\
-          float(meta["padx"])*10,float(meta["pady"])*10)
-    pin_str += template_pad%pin #Add the Pad
-  #Make the Bottom side
-  x = ((pitch*(int(meta["PIN_N_VERT"])))/-2.0)+(pitch/2.0)
-  y = (float(meta["rowy"])/2.0)*10
-  b = int(meta["PIN_N_HORIZ"])
-  n = int(meta["PIN_N_HORIZ"])+int(meta["PIN_N_VERT"])
-  for i in range(b,n):
-    pin["piny"]="%d"%(y)
-    pin["pinx"]="%d"%(x)
-    x = x + pitch
-    pin["padtype"]=meta["padtype"]
-    pin["layermask"]=meta["padlayermask"]
-    pin["drill"]="%d 0 0"%(int(float(meta["paddrill"])*10))
-    pin["shape"]="\"%s\" %s %d %d 0 0 0"%(pins[i],meta["padshape"],\
-        float(meta["pady"])*10,float(meta["padx"])*10)
-    pin_str += template_pad%pin #Add the Pad
-  #Make the Right side
-  x = (float(meta["rowx"])/2.0)*10 
-  y = (pitch*(int(meta["PIN_N_HORIZ"]))/2.0)-(pitch/2.0)
-  b = int(meta["PIN_N_HORIZ"])+int(meta["PIN_N_VERT"])
-  n = (int(meta["PIN_N_HORIZ"])*2)+int(meta["PIN_N_VERT"])
-  for i in range(b,n):
-    pin["piny"]="%d"%(y)
-    pin["pinx"]="%d"%(x)
-    y = y - pitch
-    pin["padtype"]=meta["padtype"]
-    pin["layermask"]=meta["padlayermask"]
-    pin["drill"]="%d 0 0"%(int(float(meta["paddrill"])*10))
-    pin["shape"]="\"%s\" %s %d %d 0 0 0"%(pins[i],meta["padshape"],\
-          float(meta["padx"])*10,float(meta["pady"])*10)
-    pin_str += template_pad%pin #Add the Pad
-  #Make the Top side
-  x = (pitch*(int(meta["PIN_N_VERT"]))/2.0)-(pitch/2.0)
-  y = (float(meta["rowy"])/-2.0)*10
-  b = (int(meta["PIN_N_HORIZ"])*2)+int(meta["PIN_N_VERT"])
-  n = int(meta["PIN_N"])
-  for i in range(b,n):
-    pin["piny"]="%d"%(y)
-    pin["pinx"]="%d"%(x)
-    x = x - pitch
-    pin["padtype"]=meta["padtype"]
-    pin["layermask"]=meta["padlayermask"]
-    pin["drill"]="%d 0 0"%(int(float(meta["paddrill"])*10))
-    pin["shape"]="\"%s\" %s %d %d 0 0 0"%(pins[i],meta["padshape"],\
-        float(meta["pady"])*10,float(meta["padx"])*10)
-    pin_str += template_pad%pin #Add the Pad
+  X = p.padx+100*nm_per_mil+p.rowx
+  Y = p.pitch*(len(pins)-2)//2+100*nm_per_mil+p.pady
+  mx = -p.padx//2-50*nm_per_mil
+  my = -p.pady//2-50*nm_per_mil
+  drawing = [("DS",mx,my,mx+X,my),
+             ("DS",mx,my,mx,Y+my),
+             ("DS",mx,Y+my,mx+X,Y+my),
+             ("DS",mx+X,my,mx+X,Y+my),
+             ("DC",mx-500*nm_per_dmil,0,mx-200*nm_per_dmil,0)]
+  return pads,drawing,-1500*nm_per_dmil
+############################################################################
+def MakePads_QUAD(pins,p):
+  """To Make the Pads and draw outline for Quad Package,
+  returns the pads, the drawing lines and the reference position"""
+  pitch = p.pitch
+  nh = p.nh
+  nv = p.nv
+  #Positions of the Pins along the Sides from the Center
+  h = [(2*i-nh+1)*pitch//2 for i in range(0,nh)]
+  v = [(2*i-nv+1)*pitch//2 for i in range(0,nv)]
+  #Left side down, Bottom side right, Right side up and Top side left
+  pads = [(pins[i],p.padshape,p.padx,p.pady,-p.rowx//2,h[i])\
+          for i in range(0,nh)]
+  pads.extend([(pins[nh+i],p.padshape,p.pady,p.padx,v[i],p.rowy//2)\
+               for i in range(0,nv)])
+  pads.extend([(pins[nh+nv+i],p.padshape,p.padx,p.pady,p.rowx//2,-h[i])\
+               for i in range(0,nh)])
+  pads.extend([(pins[2*nh+nv+i],p.padshape,p.pady,p.padx,\
+                (nv-1-2*i)*pitch//2,-p.rowy//2)\
+               for i in range(0,p.pins-(2*nh+nv))])
+  if nh and p.firstpadsquare:
+    pads[0] = (pads[0][0],"R")+pads[0][2:]
   # Make Drawing
-  mx = ((float(meta["rowx"])/-2.0)-(float(meta["padx"])/2.0)-50)*10
-  my = ((float(meta["rowy"])/-2.0)-(float(meta["padx"])/2.0)-50)*10
+  mx = -p.rowx//2-p.padx//2-50*nm_per_mil
+  my = -p.rowy//2-p.padx//2-50*nm_per_mil
   X = -mx  
   Y = -my
-  meta["modref_y"] = "%d"%(my - 500)
-  drawing  = "DS %d %d %d %d 120 21"%(mx+500,my,X,my)
-  drawing += "\nDS %d %d %d %d 120 21"%(mx,my+500,mx,Y)
-  drawing += "\nDS %d %d %d %d 120 21"%(mx,Y,X,Y)
-  drawing += "\nDS %d %d %d %d 120 21"%(X,my,X,Y)
-  drawing += "\nDS %d %d %d %d 120 21"%(mx,my+500,mx+500,my)
-  my = (pitch*(int(meta["PIN_N_HORIZ"]))/-2.0)+(pitch/2.0)
-  drawing += "\nDC %d %d %d %d 120 21"%(mx-800,my,mx-600,my+200)
-  meta["drawing"]=drawing
-  return pin_str
+  cut = 500*nm_per_dmil
+  drawing = [("DS",mx+cut,my,X,my),
+             ("DS",mx,my+cut,mx,Y),
+             ("DS",mx,Y,X,Y),
+             ("DS",X,my,X,Y),
+             ("DS",mx,my+cut,mx+cut,my)]
+  y = (pitch*(1-nh))//2
+  drawing.append(("DC",mx-800*nm_per_dmil,y,\
+                          mx-600*nm_per_dmil,y+200*nm_per_dmil))
+  return pads,drawing,my-500*nm_per_dmil
+############################################################################
+#JEDEC Row Letters of Grid Arrays, I O Q S X Z are not used
+bga_letters = "ABCDEFGHJKLMNPRTUVWY"
+############################################################################
+def BallRows(rows):
+  """JEDEC names of the grid array rows: A..Y then AA..AY, BA.. """
+  names = list(bga_letters)
+  for a in bga_letters:
+    if len(names) >= rows:
+      break
+    names.extend([a+b for b in bga_letters])
+  return names[:rows]
+############################################################################
+def DepopSet(depop,rows,cols,modname=None):
+  """Set of the (row, col) positions left without a ball. depop has
+  center:<n> for a n x n void in the center, perimeter:<n> to keep only
+  the n outer rings and ball names like A1 for single balls, errors are
+  raised for the module modname"""
+  removed = set()
+  rownames = None
+  for d in re.split("[\\s,]+",(depop or "").strip()):
+    if d == "":
+      continue
+    rule, _, n = d.partition(":")
+    if rule in ("center","perimeter"):
+      try:
+        n = int(n)
+      except ValueError:
+        raise ModGenError(modname,"Invalid Depopulation '%s'"%d)
+      if rule == "center":#n x n block in the Middle
+        r0 = (rows-n)//2
+        c0 = (cols-n)//2
+        removed.update((r,c) for r in range(max(r0,0),min(r0+n,rows))\
+                             for c in range(max(c0,0),min(c0+n,cols)))
+      else:#Everything inside the n Outer Rings
+        removed.update((r,c) for r in range(n,rows-n)\
+                             for c in range(n,cols-n))
+      continue
+    if rownames == None:
+      rownames = dict((name,i) for i,name in enumerate(BallRows(rows)))
+    m = re.match("^([A-Z]+)([0-9]+)$",d.upper())
+    if m == None or m.group(1) not in rownames or\
+       not 0<int(m.group(2))<=cols:
+      raise ModGenError(modname,"Invalid Ball Name '%s'"%d)
+    removed.add((rownames[m.group(1)],int(m.group(2))-1))
+  return removed
+############################################################################
+def MakePads_BGA(pins,p):
+  """To Make the Balls and draw outline for Grid Array Package, the
+  ball names are JEDEC row letters and column numbers.
+  Returns the pads, the drawing lines and the reference position"""
+  rows = p.rows
+  cols = p.cols
+  pitch = p.pitch
+  ball = p.padx
+  shape = p.padshape
+  #Coordinates of the Columns and Rows around the Center
+  xs = [(2*c-cols+1)*pitch//2 for c in range(cols)]
+  ys = [(2*r-rows+1)*pitch//2 for r in range(rows)]
+  colnames = ["%d"%(c+1) for c in range(cols)]
+  removed = DepopSet(p.depop,rows,cols)
+  pads = []
+  for r, name in enumerate(BallRows(rows)):
+    y = ys[r]
+    if removed:
+      pads.extend([(name+colnames[c],shape,ball,ball,xs[c],y)\
+                   for c in range(cols) if (r,c) not in removed])
+    else:
+      pads.extend([(name+colnames[c],shape,ball,ball,xs[c],y)\
+                   for c in range(cols)])
+  # Make Drawing with the Corner of A1 cut
+  mx = -(cols*pitch//2)-ball//2
+  my = -(rows*pitch//2)-ball//2
+  X = -mx
+  Y = -my
+  cut = pitch
+  drawing = [("DS",mx+cut,my,X,my),
+             ("DS",mx,my+cut,mx,Y),
+             ("DS",mx,Y,X,Y),
+             ("DS",X,my,X,Y),
+             ("DS",mx,my+cut,mx+cut,my)]
+  return pads,drawing,my-500*nm_per_dmil
 ############################################################################  
+#Layer mask of the SMD pads when the module is flipped to the bottom
+bottom_layermask = {"00888000":"00440001"}
+#Silk Screen layer of the front and the bottom side
+silk_layers = {False:"21",True:"20"}
+############################################################################
+class PadTable(object):
+  """Pads of a module held as columns, the names, shapes, sizes and
+  positions in nm, with the drawing lines and the reference position
+  that move along. The transforms work on whole columns and return a
+  new table, so the tables kept by PadLayout are never changed"""
+  __slots__ = ("names","shapes","sx","sy","xs","ys","lines","ref",
+               "layermask","bottom")
+  def __init__(self, pads=(), lines=(), ref=(0,0), layermask=None,\
+               bottom=False):
+    self.names = [i[0] for i in pads]
+    self.shapes = [i[1] for i in pads]
+    self.sx = array.array("q",[i[2] for i in pads])
+    self.sy = array.array("q",[i[3] for i in pads])
+    self.xs = array.array("q",[i[4] for i in pads])
+    self.ys = array.array("q",[i[5] for i in pads])
+    self.lines = tuple(lines)
+    self.ref = ref
+    self.layermask = layermask
+    self.bottom = bottom
+  def __len__(self):
+    return len(self.names)
+  def rows(self):
+    """The pads as (name, shape, size x, size y, x, y) tuples"""
+    return tuple(zip(self.names,self.shapes,self.sx,self.sy,\
+                     self.xs,self.ys))
+  def transform(self, a, b, c, d, tx=0, ty=0):
+    """New table with every point moved to (a*x+b*y+tx, c*x+d*y+ty),
+    the sizes are swapped by the quarter turns (b != 0)"""
+    t = PadTable(layermask=self.layermask,bottom=self.bottom)
+    t.names = self.names
+    t.shapes = self.shapes
+    t.sx, t.sy = (self.sy, self.sx) if b else (self.sx, self.sy)
+    t.xs = array.array("q",[a*x+b*y+tx for x,y in zip(self.xs,self.ys)])
+    t.ys = array.array("q",[c*x+d*y+ty for x,y in zip(self.xs,self.ys)])
+    t.lines = tuple((k,a*x1+b*y1+tx,c*x1+d*y1+ty,a*x2+b*y2+tx,c*x2+d*y2+ty)\
+                    for k,x1,y1,x2,y2 in self.lines)
+    x, y = self.ref
+    t.ref = (a*x+b*y+tx,c*x+d*y+ty)
+    return t
+  def rotate(self, angle):
+    """Turn counter clockwise as seen on the board by 0, 90, 180 or
+    270 degrees, the y axis points down"""
+    turns = {0:(1,0,0,1),90:(0,1,-1,0),180:(-1,0,0,-1),270:(0,-1,1,0)}
+    return self.transform(*turns[angle%360])
+  def mirror(self):
+    """Flip to the bottom side, mirrored left to right"""
+    t = self.transform(-1,0,0,1)
+    t.bottom = not self.bottom
+    for top, bottom in bottom_layermask.items():
+      if t.layermask in (top,bottom):
+        t.layermask = bottom if t.layermask==top else top
+    return t
+  def offset(self, dx, dy):
+    return self.transform(1,0,0,1,dx,dy)
+  def reorigin(self, origin):
+    """Move the origin to the center of the pads or to the first pad"""
+    if not len(self) or origin in (None,"","none"):
+      return self
+    if origin == "pin1":
+      return self.offset(-self.xs[0],-self.ys[0])
+    #Center of the Bounding box of the Pads
+    x0 = min(x-w//2 for x,w in zip(self.xs,self.sx))
+    x1 = max(x+w-w//2 for x,w in zip(self.xs,self.sx))
+    y0 = min(y-h//2 for y,h in zip(self.ys,self.sy))
+    y1 = max(y+h-h//2 for y,h in zip(self.ys,self.sy))
+    return self.offset(-((x0+x1)//2),-((y0+y1)//2))
+############################################################################
+@functools.lru_cache(maxsize=_layout_cache)
+def PadLayout(pins,p):
+  """PadTable of the tuple of pins and the ModParams, kept for the
+  modules with the same layout"""
+  pads,drawing,refy = pad_makers[p.package](pins,p)
+  return PadTable(pads,drawing,(0,refy),p.layermask)
+############################################################################
+@functools.lru_cache(maxsize=_layout_cache)
+def PadText(pins,p):
+  """$PAD text and drawing of the PadLayout"""
+  return TableText(PadLayout(pins,p),p)
+############################################################################
+def TableText(table,p):
+  """$PAD text and drawing of a PadTable"""
+  layer = silk_layers[table.bottom]
+  return FormatPads(table.rows(),p,table.layermask),\
+         "\n".join([DrawLine(*i,layer=layer) for i in table.lines])
+############################################################################
+#Parameters that place the pads of the module
+placement_params = ["mirror","rotate","origin"]
+############################################################################
+def Placement(table,meta):
+  """Flip, turn and move the origin of the PadTable as the mirror(0|1),
+  rotate(0|90|180|270) and origin(none|center|pin1) parameters say"""
+  if meta.get("mirror") not in (None,"0"):
+    table = table.mirror()
+  if meta.get("rotate") not in (None,"0"):
+    table = table.rotate(int(meta["rotate"]))
+  return table.reorigin(meta.get("origin"))
+############################################################################
+def PlacementSuffix(meta):
+  """Name suffix of the placement variants, _R<angle>, _B for the
+  bottom side and the origin"""
+  suffix = ""
+  if meta.get("rotate") not in (None,"0"):
+    suffix += "_R"+meta["rotate"]
+  if meta.get("mirror") not in (None,"0"):
+    suffix += "_B"
+  if meta.get("origin") not in (None,"","none"):
+    suffix += "_"+meta["origin"].upper()
+  return suffix
+############################################################################
+def PadGeometry(pins,meta):
+  """Lay out the Pins into the PadTable of the meta as placed, the
+  names and fields of the module are not part of the layout.
+  Returns the pins tuple, ModParams and whether the layout is placed"""
+  if meta["package"] not in pad_makers:
+    raise ModGenError(meta.get("modname"),\
+                      "Un Supported Package %s"%meta["package"])
+  p = ModParams(meta)
+  pins = tuple(pins)
+  table = PadLayout(pins,p)
+  placed = [k for k in placement_params if meta.get(k)!=None]
+  if placed:
+    table = Placement(table,meta)
+  meta["padtable"]=table
+  meta["padlist"]=table.rows()
+  meta["drawlist"]=table.lines
+  meta["modref_nm"]=table.ref
+  meta["modref_x"]="%d"%(table.ref[0]/nm_per_dmil)
+  meta["modref_y"]="%d"%(table.ref[1]/nm_per_dmil)
+  #Silk and Texts go to the bottom side with the pads, mirrored
+  meta["silklayer"]=silk_layers[table.bottom]
+  meta["textmirror"]="M" if table.bottom else "N"
+  return pins,p,placed
+############################################################################
 def MakePads(pins,meta):
   """Convert the Pins into a string of Pad data and add Drawing"""
-  if meta["package"]=='SIP':
-    return MakePads_SIP(pins,meta)
-  elif meta["package"]=='DIP':
-    return MakePads_DIP(pins,meta)
-  elif meta["package"]=='CONN-Dual':
-    return MakePads_CONN_Dual(pins,meta)
-  elif meta["package"]=='QUAD':
-    return MakePads_QUAD(pins,meta)
-  print("Error: Un Supported Package")
-  exit(0)
-############################################################################
-#GUI FUNCTIONS>
+  pins,p,placed = PadGeometry(pins,meta)
+  if placed:
+    pads,meta["drawing"] = TableText(meta["padtable"],p)
+  else:
+    pads,meta["drawing"] = PadText(pins,p)
+  return pads
+############################################################################
+def NmToMm(n):
+  """Format a length in nm as mm without the trailing zeros"""
+  q, r = divmod(abs(n),1000000)
+  return ("%s%d.%06d"%("-" if n<0 else "",q,r)).rstrip("0").rstrip(".")
+############################################################################
+def Quoted(text):
+  """Quote a string for the s-expression formats"""
+  return '"%s"'%text.replace("\\","\\\\").replace('"','\\"')
+############################################################################
+def FormatKicadMod(meta,pins):
+  """Generate the KiCad s-expression footprint from the complete
+  module parameters, from the same pads and drawing as the $MODULE"""
+  p = PadGeometry(pins,meta)[1]
+  mm = NmToMm
+  side = "B" if meta["padtable"].bottom else "F"
+  drawing = [(template_kicad_circle if k=="DC" else template_kicad_line)%\
+             (mm(x1),mm(y1),mm(x2),mm(y2)) for k,x1,y1,x2,y2 in \
+             meta["drawlist"]]
+  if p.padtype == "SMD":
+    padtype, drill = "smd", ""
+    layers = '"%(side)s.Cu" "%(side)s.Paste" "%(side)s.Mask"'%{"side":side}
+  else:
+    padtype, drill, layers = "thru_hole", " (drill %s)"%mm(p.drill),\
+                             '"*.Cu" "*.Mask"'
+  fmt = template_kicad_pad%{"name":"%s","padtype":padtype,"shape":"%s",\
+                            "pinx":"%s","piny":"%s","sizex":"%s",\
+                            "sizey":"%s","drill":drill,"layers":layers}
+  pads = [fmt%(Quoted(n),kicad_pad_shapes.get(s,"rect"),mm(x),mm(y),\
+               mm(sx),mm(sy)) for n,s,sx,sy,x,y in meta["padlist"]]
+  return template_kicad_mod%{"modname":Quoted(meta["modname"]),\
+    "description":Quoted(meta["description"]),\
+    "keywords":Quoted(meta["keywords"]),\
+    "attr":"smd" if p.padtype=="SMD" else "through_hole",\
+    "refname":Quoted(meta["refname"]),"modref_x":mm(meta["modref_nm"][0]),\
+    "modref_y":mm(meta["modref_nm"][1]),"side":side,\
+    "justify":" (justify mirror)" if side=="B" else "",\
+    "drawing":"".join(drawing)%{"side":side},"pads":"".join(pads)}
+############################################################################
+pad_makers = {'SIP':MakePads_SIP,'DIP':MakePads_DIP,
+              'CONN-Dual':MakePads_CONN_Dual,'QUAD':MakePads_QUAD,
+              'BGA':MakePads_BGA}
+############################################################################
+#DRC FUNCTIONS>
+############################################################################
+def PadGap(a,b):
+  """Copper to copper distance in nm of two pads, negative when they
+  overlap. Round pads are circles, the others their rectangles"""
+  dx = abs(a[4]-b[4])
+  dy = abs(a[5]-b[5])
+  if a[1]=="C" and b[1]=="C":
+    return math.hypot(dx,dy)-(a[2]+b[2])/2
+  gx = dx-(a[2]+b[2])/2
+  gy = dy-(a[3]+b[3])/2
+  if gx>0 and gy>0:
+    return math.hypot(gx,gy)
+  return max(gx,gy)
+############################################################################
+def PadClearance(pads,clearance=0):
+  """Pairs of pads closer than clearance nm or touching, as a list of
+  (pad name, pad name, gap nm). The pads are hashed into a uniform grid
+  of cells as large as the biggest pad plus the clearance so only the
+  pads of the neighbouring cells are compared. Pads of the same name
+  are connected and not checked against each other"""
+  found = []
+  if not pads:
+    return found
+  cell = max(max(p[2],p[3]) for p in pads)+clearance+1
+  grid = {}
+  for p in pads:
+    cx = p[4]//cell
+    cy = p[5]//cell
+    for i in (cx-1,cx,cx+1):
+      for j in (cy-1,cy,cy+1):
+        for q in grid.get((i,j),()):
+          if q[0]==p[0] and p[0]!="":
+            continue
+          gap = PadGap(q,p)
+          if gap<=0 or gap<clearance:
+            found.append((q[0],p[0],gap))
+    grid.setdefault((cx,cy),[]).append(p)
+  return found
+############################################################################
+def ClearanceText(found,clearance=0):
+  """Describe the closest of the PadClearance pairs"""
+  a,b,gap = min(found,key=lambda i:i[2])
+  if gap <= 0:
+    text = "Pads %s and %s overlap"%(a,b)
+  else:
+    text = "Pads %s and %s are %.2f mils apart, below %.2f mils"%\
+           (a,b,gap/nm_per_mil,clearance/nm_per_mil)
+  if len(found) > 1:
+    text += " (%d pad pairs)"%len(found)
+  return text
+############################################################################
+def CheckPads(meta,clearance=0):
+  """Check the generated pads of the module for overlaps and the
+  clearance in nm"""
+  found = PadClearance(meta["padlist"],clearance)
+  if found:
+    raise ModGenError(meta["modname"],ClearanceText(found,clearance))
+############################################################################
+#Pads of the library files, pad rows of .emp modules and .kicad_mod pads
+emp_pad = re.compile(r'^Sh "((?:[^"\\]|\\.)*)" (\S) (-?\d+) (-?\d+) \S+ \S+ '\
+                     r'(-?\d+)\s*$',re.M)
+emp_pos = re.compile(r'^Po (-?\d+) (-?\d+)',re.M)
+kicad_pad = re.compile(r'\(pad ("(?:[^"\\]|\\.)*"|\S+) \S+ (\S+) '\
+                       r'\(at (\S+) (\S+?)(?: (\S+?))?\) \(size (\S+) (\S+?)\)')
+kicad_shapes = {"circle":"C","oval":"O"}
+############################################################################
+def EmpPads(text):
+  """Pads of a $MODULE text as (name, shape, size x, size y, x, y)
+  tuples in nm, the sizes of pads turned by 90 degrees swapped"""
+  pads = []
+  for block in text.split("$PAD")[1:]:
+    sh = emp_pad.search(block)
+    po = emp_pos.search(block)
+    if sh == None or po == None:
+      continue
+    sx,sy = int(sh.group(3))*nm_per_dmil,int(sh.group(4))*nm_per_dmil
+    if int(sh.group(5))%1800 == 900:
+      sx,sy = sy,sx
+    pads.append((sh.group(1),sh.group(2),sx,sy,\
+                 int(po.group(1))*nm_per_dmil,int(po.group(2))*nm_per_dmil))
+  return pads
+############################################################################
+def KicadModPads(text):
+  """Pads of a .kicad_mod footprint as (name, shape, size x, size y,
+  x, y) tuples in nm"""
+  nm = lambda v: int(round(float(v)*1000000))
+  pads = []
+  for m in kicad_pad.finditer(text):
+    name = m.group(1)
+    if name.startswith('"'):
+      name = re.sub(r'\\(.)',r'\1',name[1:-1])
+    sx,sy = nm(m.group(6)),nm(m.group(7))
+    if m.group(5) and float(m.group(5))%180 == 90:
+      sx,sy = sy,sx
+    pads.append((name,kicad_shapes.get(m.group(2),"R"),sx,sy,\
+                 nm(m.group(3)),nm(m.group(4))))
+  return pads
+############################################################################
+def LibraryPads(path):
+  """Stream the (modname, pads) of an .emp library, a .kicad_mod file
+  or the footprints of a .pretty directory"""
+  if os.path.isdir(path):
+    for name in sorted(os.listdir(path)):
+      if name.endswith(".kicad_mod"):
+        for i in LibraryPads(os.path.join(path,name)):
+          yield i
+  elif path.endswith(".kicad_mod"):
+    with open(path,encoding="utf-8") as f:
+      yield os.path.basename(path)[:-len(".kicad_mod")],KicadModPads(f.read())
+  else:
+    for name, text in ReadLibrary(path):
+      yield name, EmpPads(text)
+############################################################################
+def CheckLibraries(paths,clearance=0):
+  """Check the pads of every module of the libraries for overlaps and
+  the clearance in nm, as a batch gate. Returns the list of the failed
+  modules errors"""
+  count = 0
+  failed = []
+  for path in paths:
+    for name, pads in LibraryPads(path):
+      count += 1
+      found = PadClearance(pads,clearance)
+      if found:
+        error = ModGenError(name,ClearanceText(found,clearance))
+        log.info("Failed %s"%error)
+        failed.append(error)
+  log.warning("%d modules checked, %d failed"%(count,len(failed)))
+  for error in failed:
+    log.warning("  %s"%error)
+  return failed
+############################################################################
+#HEADLESS FUNCTIONS>
+############################################################################
+class ModGenError(Exception):
+  """Error in the parameters of a module, carries the module name
+  and the reason"""
+  def __init__(self, modname, reason):
+    Exception.__init__(self, modname, reason)
+    self.modname = modname
+    self.reason = reason
+  def __str__(self):
+    return "%s: %s"%(self.modname,self.reason)
+############################################################################
+#Default Parameters of each Package in mils as set in the GUI
+package_defaults = {
+  'SIP':{"modname":'CONN',"refname":'J',"PIN_N":'8',"pitch":'100',
+         "padx":'70',"pady":'70',"paddrill":'35',"padshape":'C',
+         "firstpadsquare":1,"locking":None,"padtype":'STD'},
+  'DIP':{"modname":'DIP',"refname":'U',"PIN_N":'8',"pitch":'100',
+         "padx":'150',"pady":'60',"paddrill":'39.37',"rowx":'300',
+         "padshape":'O',"firstpadsquare":None,"locking":None,
+         "padtype":'STD'},
+  'CONN-Dual':{"modname":'CONN2X',"refname":'J',"PIN_N":'16',
+         "pitch":'100',"padx":'70',"pady":'70',"paddrill":'35',
+         "rowx":'100',"padshape":'C',"firstpadsquare":None,
+         "locking":None,"padtype":'STD'},
+  'QUAD':{"modname":'QUAD',"refname":'U',"PIN_N":'32',"PIN_N_HORIZ":'4',
+         "pitch":'19.74',"padx":'60',"pady":'12',"paddrill":'0',
+         "rowx":'600',"rowy":'600',"padshape":'R',"firstpadsquare":None,
+         "locking":None,"padtype":'SMD'},
+  'BGA':{"modname":'BGA',"refname":'U',"rows":'10',"cols":'10',
+         "depop":'',"pitch":'39.37',"padx":'17.72',"pady":'17.72',
+         "paddrill":'0',"padshape":'C',"firstpadsquare":None,
+         "locking":None,"padtype":'SMD'},
+  }
+#Parameters that are Dimensions and follow the Units
+dimensions = ["pitch","padx","pady","paddrill","rowx","rowy"]
+#Parameters that are Text and are not split into Sweep values
+text_params = ["modname","refname","description","keywords","depop"]
+############################################################################
+def ModuleMeta(params,units="mils"):
+  """Complete the module parameters with the package defaults and
+  the derived values, the dimensions stay in the given units"""
+  if params.get("package") not in package_defaults:
+    raise ModGenError(params.get("modname"),\
+                      "Un Supported Package %s"%params.get("package"))
+  meta = dict(package_defaults[params["package"]])
+  if units == "mm":#The Defaults are in mils
+    for k in dimensions:
+      if k in meta and k not in params:
+        meta[k] = miltomm(meta[k])
+  meta.update(params)
+  meta["units"] = units
+  #Flags from the Command line or Spec files
+  if meta["firstpadsquare"] in ("0","1"):
+    meta["firstpadsquare"] = 1 if meta["firstpadsquare"]=="1" else None
+  if meta["locking"] in ("0","1"):
+    meta["locking"] = "5" if meta["locking"]=="1" else None
+  #Check The Description and Keywords
+  if not meta.get("description"):
+    meta["description"] = meta["modname"]
+  if not meta.get("keywords"):
+    meta["keywords"] = meta["modname"]
+  if meta["padtype"] == 'STD':
+    meta["padlayermask"]='00E0FFFF' #normally for STD
+  else:
+    meta["padlayermask"]='00888000' #notmally for SMD
+  if meta["package"] not in ['DIP','CONN-Dual','QUAD']:
+    meta["rowx"] = None
+  if meta["package"] =='BGA':#Round Balls, one per Grid position
+    if "pady" not in params:
+      meta["pady"] = meta["padx"]
+    try:
+      rows = int(meta["rows"])
+      cols = int(meta["cols"])
+    except ValueError:
+      raise ModGenError(meta["modname"],"Invalid Number of Rows or Columns")
+    removed = DepopSet(meta["depop"],rows,cols,meta["modname"])
+    meta["PIN_N"] = "%d"%(rows*cols-len(removed))
+  if meta["package"] !='QUAD':
+    meta["rowy"] = None
+    meta["PIN_N_HORIZ"] = None
+  return meta
+############################################################################
+def CheckMeta(meta):
+  """Validate the module parameters like the GUI does, raises
+  ModGenError for the first invalid one"""
+  def check(ok,reason):
+    if not ok:
+      raise ModGenError(meta["modname"],reason)
+  p = ModParams(meta)
+  for name in ["pitch","padx","pady","drill"]:
+    check(getattr(p,name)!=None,"Invalid %s Value"%name)
+  check(0<p.pitch<400*nm_per_mil,"Invalid Pitch Value")
+  check(p.padx>0,"Invalid Pad X Value")
+  check(p.pady>0,"Invalid Pad Y Value")
+  check(10*nm_per_mil<p.drill<=250*nm_per_mil or p.padtype!='STD',\
+        "Invalid Pad Drill Value")
+  check(p.pins!=None and p.pins>1,"Invalid Number of Pins")
+  check(p.pins%2==0 or p.package not in ['DIP','CONN-Dual'],\
+        "Invalid Number of Pins")
+  if p.package in ['DIP','CONN-Dual']:
+    check(p.rowx!=None and p.rowx>0,"Invalid Row X Spacing")
+  if p.package == 'QUAD':
+    check(p.rowx!=None and p.rowx>0,"Invalid Row X Spacing")
+    check(p.rowy!=None and p.rowy>0,"Invalid Row Y Spacing")
+    check(p.nh!=None and p.nh>0,"Invalid Number of Pins Horizontally")
+    check(p.nv>=0,"Invalid Number of Pins")
+  if p.package == 'BGA':
+    check(p.rows!=None and p.rows>0,"Invalid Number of Rows")
+    check(p.cols!=None and p.cols>0,"Invalid Number of Columns")
+  check(p.padx!=p.pady or p.padshape!='O',\
+        "Incorrect Pad Dimensions for Oblong pads")
+  check(p.padx==p.pady or p.padshape!='C',\
+        "Incorrect Pad Dimensions for Circular pads")
+  check(meta.get("rotate") in (None,"0","90","180","270"),\
+        "Invalid Rotation, 0 90 180 or 270")
+  check(meta.get("mirror") in (None,"0","1"),"Invalid Mirror Value")
+  check(meta.get("origin") in (None,"","none","center","pin1"),\
+        "Invalid Origin, none center or pin1")
+  return p
+############################################################################
+def FormatModule(meta,pins=None,fmt="emp"):
+  """Generate the $MODULE text, or the footprint for the kicad_mod fmt,
+  from the complete module parameters, the pads are named by pins or
+  else numbered"""
+  if pins == None:
+    pins = PinGen(int(meta["PIN_N"]))
+  if fmt == "kicad_mod":
+    text = FormatKicadMod(meta,pins)
+    log.info("Footprint %s generated"%meta["modname"])
+    return text
+  meta["pads"]=MakePads(pins,meta)
+  log.info("Module %s generated"%meta["modname"])
+  return template_pcb_module%meta
+############################################################################
+def MakeModule(meta):
+  """Generate the module text in the .emp format from the complete
+  module parameters"""
+  return template_pcb_head%{"index":meta["modname"]}+FormatModule(meta)+\
+         template_pcb_foot
+############################################################################
+def GenerateModule(params,units="mils"):
+  """Generate the module text in the .emp format from the parameters
+  without any GUI, the missing ones are taken from the package defaults"""
+  meta = ModuleMeta(params,units)
+  CheckMeta(meta)
+  text = MakeModule(meta)
+  CheckPads(meta)
+  return text
+############################################################################
+def ModuleFileName(meta):
+  """Name of the .emp file for the module"""
+  name = meta["modname"]
+  if(meta["locking"]!=None) and meta["package"] == 'SIP':
+    name = name+"_LOCK"
+  return name+".emp"
+############################################################################
+def AutoName(meta,units="mils"):
+  """Automatic Name, Description, Reference and Keywords of the module
+  from its parameters given in units, as a dict of the changed
+  parameters, empty if the module name has no naming rule"""
+  name = meta["modname"].upper()
+  # Check for Berg Connector Single Row
+  f = re.match("^(.)*(CONN)",name)
+  g = re.match("^(.)*((?:DIP)|(?:SOIC)|(?:SSOP)|(?:TSSOP)|(?:MSOP))",name)
+  h = re.match("^(.)*(CONN2X)",name)
+  #Get the Parameters and Format them
+  fmt = "%2.2f" if units=="mm" else "%d"
+  pich = fmt%(float(meta["pitch"]))
+  x = fmt%(float(meta["padx"]))
+  y = fmt%(float(meta["pady"]))
+  dril = fmt%(float(meta["paddrill"]))
+  rox = fmt%(float(meta["rowx"])) if meta.get("rowx")!=None else ""
+  desc = {}
+  keys = {}
+  #Common Generation Stub
+  desc["pin"] = keys["pin"] = "%s"%meta["PIN_N"]
+  if meta["padtype"]=="STD":
+    desc["fix"]="Through Hole"
+    keys["fix"]="TH"
+  else:
+    desc["fix"]="SMD"
+    keys["fix"]="SMD"
+  desc["pitch"] = keys["pitch"] = pich
+  if x != y:
+    desc["pad"] = keys["pad"] = x+"X"+y
+  else:
+    desc["pad"] = keys["pad"] = x
+  if meta["padshape"] =='O':
+    desc["shape"] = "Oblong"
+    keys["shape"] = "O"
+  elif meta["padshape"] =='R':
+    desc["shape"] = "Rectangular"
+    keys["shape"] = "R"
+  else:
+    desc["shape"] = "Circular"
+    keys["shape"] = "C"
+  if meta["padtype"]=="STD":
+    desc["drill"] = dril+ " Drill"
+    keys["drill"] = dril + "_"
+  else:
+    desc["drill"] = ""
+    keys["drill"] = ""
+  #Validate As per packages
+  if f!=None and meta["package"]=="SIP":
+    ref = "J"
+    desc["name"] = keys["name"] = f.group(2)
+    desc["rowx1"] = " "
+    keys["rowx1"] = ""
+    if meta["locking"]:
+      desc["type"] = "Locking"
+      keys["type"] = "L"
+    else:
+      desc["type"] = "Normal"
+      keys["type"] = "N"
+  elif g!=None and meta["package"]=='DIP':
+    ref = "U"
+    desc["name"] = keys["name"] = g.group(2)
+    desc["rowx1"] = " " + rox + " Spacing "
+    keys["rowx1"] = "_" + rox
+    desc["type"] = keys["type"] = ""
+  elif h!=None and meta["package"]=='CONN-Dual':
+    ref = "J"
+    desc["name"] = keys["name"] = h.group(2)[:4]
+    desc["pin"] = keys["pin"] = "%d"%(int(meta["PIN_N"])/2)
+    desc["rowx1"] = " Dual Row " + rox + " Spacing "
+    keys["rowx1"] = "_" + rox
+    desc["type"] = keys["type"] = ""
+  else:
+    return {}
+  key = template_keyw_pcb % keys
+  return {"refname":ref,"description":template_desc_pcb % desc,\
+          "keywords":key,"modname":key.split(" ")[2]}
+############################################################################
+def SweepValues(value,name="",modname=None):
+  """List of values of a sweep parameter, separated by spaces or commas,
+  with a:b[:step] for an inclusive range of integers. Errors are raised
+  for the parameter name of the module modname"""
+  values = []
+  for v in re.split("[\\s,]+",value.strip()):
+    if ":" in v:
+      try:
+        r = [int(i) for i in v.split(":")]
+        if len(r) > 3 or r[2:] == [0]:
+          raise ValueError(v)
+      except ValueError:
+        raise ModGenError(modname,"Invalid %s Range %s"%(name,v))
+      values.extend("%d"%i for i in range(r[0],r[1]+1,r[2] if len(r)>2 else 1))
+    elif v != "":
+      values.append(v)
+  return values
+############################################################################
+def ExpandSweep(params):
+  """All the combinations of the sweep parameter values as a list of
+  module parameters"""
+  keys = sorted(params)
+  modname = params.get("modname",params.get("package"))
+  values = [[params[k]] if k in text_params else\
+            SweepValues(params[k],k,modname) for k in keys]
+  return [dict(zip(keys,i)) for i in itertools.product(*values)]
+############################################################################
+def RenderModule(params,units="mils",swept=None,pins=None,fmt="emp",\
+                 clearance=0):
+  """Generate the $MODULE text, or the footprint for the kicad_mod
+  fmt, of one module of a library. Sweep variants (swept not None) are
+  named by AutoName or else by the values of the swept parameters, with
+  the placement of the pads added. The pads are named by pins if given
+  and checked against the clearance in nm.
+  Returns (modname, text, error) with the text None on error"""
+  try:
+    if pins != None:
+      params = dict(params)
+      if params.setdefault("PIN_N","%d"%len(pins)) != "%d"%len(pins):
+        raise ModGenError(params.get("modname"),\
+                          "PIN_N is not the number of pin names")
+    meta = ModuleMeta(params,units)
+    if swept != None:
+      names = AutoName(meta,units)#Names are in the Units of the Sweep
+      rest = [k for k in swept if k not in placement_params]
+      if not names and rest:
+        names = {"modname":"_".join([meta["modname"]]+\
+                                    [params[k] for k in rest])}
+      meta.update(names)
+      if [k for k in swept if k in placement_params]:
+        meta["modname"] += PlacementSuffix(meta)
+    CheckMeta(meta)
+    text = FormatModule(meta,pins,fmt)
+    CheckPads(meta,clearance)
+    return meta["modname"],text,None
+  except ModGenError as e:
+    return e.modname,None,e
+  except (ValueError,KeyError) as e:
+    return params.get("modname"),None,\
+           ModGenError(params.get("modname"),"Invalid Parameter %s"%e)
+############################################################################
+def SweepTasks(params,units="mils"):
+  """The modules of a sweep as (params, units, swept, pins) tasks"""
+  modname = params.get("modname",params.get("package"))
+  swept = tuple(k for k in sorted(params) if k not in text_params and\
+                len(SweepValues(params[k],k,modname))>1)
+  return [(p,units,swept,None) for p in ExpandSweep(params)]
+############################################################################
+def SpecTasks(specfile,parts=None):
+  """The modules of the <module>, <sweep> and <part> elements of a spec
+  file as (params, units, swept, pins) tasks, the file is read one
+  element at a time. The symbols of the parts go to the parts list"""
+  tasks = []
+  for el in IterModules(specfile):
+    params = MetaData(el)
+    if el.tag == "part":
+      task, part = PartSpec(params,PinDescriptions(el))
+      tasks.append(task)
+      if parts != None:
+        parts.append(part)
+      continue
+    units = params.pop("units","mils")
+    if el.tag == "sweep":
+      tasks.extend(SweepTasks(params,units))
+    else:
+      pins = [i[0].strip() for i in PinDescriptions(el)]
+      tasks.append((params,units,None,pins or None))
+  return tasks
+############################################################################
+#PART FUNCTIONS> Symbol and Footprint of a part from one spec
+############################################################################
+#Symbol package of the parts for each footprint package
+part_symbols = {"SIP":"SIP","DIP":"DIP","CONN-Dual":"CONN","QUAD":"QUAD"}
+############################################################################
+def LibGen():
+  """The libgen module of the sibling directory, only imported when the
+  symbols of parts are generated"""
+  path = os.path.join(os.path.dirname(os.path.abspath(__file__)),\
+                      os.pardir,"libgen")
+  if path not in sys.path:
+    sys.path.append(path)
+  import libgen
+  return libgen
+############################################################################
+def PartSpec(params,rows):
+  """Split a <part> into the footprint task and the symbol. The pin
+  rows (name, etype[, group]) are shared, the pads are numbered like the
+  pins of the symbol and the symbol gets the footprint. Symbol only
+  attributes are compname, symbol (the libgen package) and unitpins.
+  Returns the (params, units, swept, pins) task and the
+  (modname, symbol attributes, pin rows, footprint package) part"""
+  params = dict(params)
+  units = params.pop("units","mils")
+  compname = params.pop("compname",None) or params.get("modname")
+  params.setdefault("modname",compname)
+  package = params.get("package")
+  sym = {"compname":compname,"footprint":params["modname"],\
+         "package":params.pop("symbol",part_symbols.get(package))}
+  refname = params.get("refname") or\
+            package_defaults.get(package,{}).get("refname")
+  if refname:
+    sym["refname"] = refname
+  for k in ("description","keywords","PIN_N"):
+    if k in params:
+      sym[k] = params[k]
+  if "unitpins" in params:
+    sym["unitpins"] = params.pop("unitpins")
+  pins = PinGen(len(rows)) if rows else None
+  return (params,units,None,pins),(params["modname"],sym,rows,package)
+############################################################################
+def RenderSymbols(parts,fmt="lib"):
+  """Render the symbols of the parts with libgen as (modname, lib, dcm)
+  in the lib or kicad_sym fmt. Returns the symbols and the list of the
+  failed parts errors"""
+  libgen = LibGen()
+  symbols = []
+  failed = []
+  for modname, sym, rows, package in parts:
+    try:
+      if package == "BGA":
+        raise ModGenError(modname,"Grid array parts are not supported,"\
+                                  " the balls are named")
+      if sym["package"] not in libgen.layouts:
+        raise ModGenError(modname,"No symbol package, give symbol=%s"%\
+                                  "|".join(sorted(libgen.layouts)))
+      if not rows:
+        if not sym.get("PIN_N","").isdigit():
+          raise ModGenError(modname,"A part needs pin rows or PIN_N")
+        rows = libgen.PinGen(int(sym["PIN_N"]))
+      d = libgen.Pins2Dict(rows,dict(sym))
+    except libgen.LibGenError as e:
+      failed.append(ModGenError(modname,"Symbol %s"%e.reason))
+      continue
+    except ModGenError as e:
+      failed.append(e)
+      continue
+    if fmt == "kicad_sym":
+      symbols.append((modname,libgen.FormatSymbol(d),""))
+    else:
+      symbols.append((modname,)+libgen.FormatComponent(d))
+  return symbols,failed
+############################################################################
+def WriteSymbols(symlib,symbols):
+  """Write the (modname, lib, dcm) symbols of the parts into the symlib
+  library and its .dcm, or a .kicad_sym symbol library"""
+  libgen = LibGen()
+  if libgen.LibFormat(symlib) == "kicad_sym":
+    head, foot = libgen.template_sym_head, libgen.template_sym_foot
+  else:
+    head, foot = libgen.template_lib_head, libgen.template_lib_foot
+  def write(f):
+    f.write(head)
+    f.writelines(i[1] for i in symbols)
+    f.write(foot)
+  ReplaceFile(symlib,write)
+  dcm = [i[2] for i in symbols if i[2] != ""]
+  if dcm:
+    def writedcm(f):
+      f.write(libgen.template_dcm_head)
+      f.writelines(dcm)
+      f.write(libgen.template_dcm_foot)
+    ReplaceFile(libgen.DcmFileName(symlib),writedcm)
+  log.info("Library %s written with %d symbols"%(symlib,len(symbols)))
+############################################################################
+def SymbolLibName(destfile):
+  """Symbol library going along with a footprint library"""
+  base = os.path.splitext(destfile.rstrip("/\\"))[0]
+  return base+(".kicad_sym" if LibFormat(destfile)=="kicad_mod" else ".lib")
+############################################################################
+def WriteLibrary(destfile,modules):
+  """Stream the (modname, text) modules into one .emp library with the
+  combined $INDEX, the later modules with an already used name are left
+  out. The modules are spooled to a temporary file until the index is
+  known and the library replaces destfile only once it is complete"""
+  names = []
+  seen = set()
+  with tempfile.TemporaryFile("w+",encoding="utf-8") as spool:
+    for name, text in modules:
+      if name in seen:
+        log.warning("Duplicate module %s left out"%name)
+        continue
+      seen.add(name)
+      names.append(name)
+      spool.write(text)
+    spool.seek(0)
+    def write(f):
+      f.write(template_pcb_head%{"index":"\n".join(names)})
+      shutil.copyfileobj(spool,f)
+      f.write(template_pcb_foot)
+    ReplaceFile(destfile,write)
+  log.info("Library %s written with %d modules"%(destfile,len(names)))
+  return len(names)
+############################################################################
+def ReplaceFile(destfile,write):
+  """Write a file through write(f) to a temporary file that replaces
+  destfile only once it is complete"""
+  fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(destfile)))
+  try:
+    with os.fdopen(fd,"w",encoding="utf-8") as f:
+      write(f)
+    # Keep the Permissions of the old file or as for a new file
+    if os.path.isfile(destfile):
+      shutil.copymode(destfile,tmp)
+    else:
+      mask = os.umask(0)
+      os.umask(mask)
+      os.chmod(tmp,0o666 & ~mask)
+    os.replace(tmp,destfile)
+  except:
+    os.remove(tmp)
+    raise
+############################################################################
+def WritePretty(destdir,modules):
+  """Write the (modname, text) footprints into the destdir .pretty
+  directory one .kicad_mod file each, the later footprints with an
+  already used name are left out"""
+  if not os.path.isdir(destdir):
+    os.makedirs(destdir)
+  seen = set()
+  for name, text in modules:
+    if name in seen:
+      log.warning("Duplicate module %s left out"%name)
+      continue
+    seen.add(name)
+    ReplaceFile(os.path.join(destdir,name+".kicad_mod"),\
+                lambda f: f.write(text))
+  log.info("Library %s written with %d footprints"%(destdir,len(seen)))
+  return len(seen)
+############################################################################
+def LibFormat(destfile):
+  """Output format of a library, kicad_mod for a .pretty directory"""
+  return "kicad_mod" if destfile.rstrip("/\\").endswith(".pretty") else "emp"
+############################################################################
+def ReadLibrary(srcfile):
+  """Stream the (modname, text) modules of an .emp library, the text
+  runs from the comment ahead of $MODULE up to $EndMODULE"""
+  with open(srcfile,encoding="utf-8") as f:
+    for line in f:#Skip the Header and $INDEX
+      if line.startswith("$EndINDEX"):
+        break
+    block = []
+    name = None
+    for line in f:
+      if line.startswith("$EndLIBRARY"):
+        break
+      block.append(line)
+      if line.startswith("$MODULE"):
+        name = line.split(None,1)[1].strip()
+      elif line.startswith("$EndMODULE"):
+        yield name, "".join(block)
+        block = []
+        name = None
+############################################################################
+def BuildLib(tasks,destfile,jobs=1,libfiles=(),clearance=0,parts=(),\
+             symlib=None):
+  """Generate the modules of the (params, units, swept, pins) tasks into
+  one .emp library, or a .pretty directory of footprints, using 'jobs'
+  processes, followed by the modules of the .emp libfiles. The pads
+  of the generated modules are checked against the clearance in nm.
+  The symbols of the parts go to symlib, a part is left out of both
+  libraries when its symbol or footprint fails.
+  Returns the list of the failed modules errors"""
+  fmt = LibFormat(destfile)
+  count = len(tasks)
+  failed = []
+  if parts:#Symbols first so the Footprints of failed ones are left out
+    symlib = symlib or SymbolLibName(destfile)
+    symbols,failed = RenderSymbols(parts,LibGen().LibFormat(symlib))
+    for error in failed:
+      log.info("Failed %s"%error)
+    bad = set(e.modname for e in failed)
+    tasks = [i for i in tasks if i[0].get("modname") not in bad]
+  render = functools.partial(RenderModule,fmt=fmt,clearance=clearance)
+  if jobs == 1 or not tasks:
+    results = (render(*i) for i in tasks)
+  else:#map keeps the Order of the Modules
+    pool = concurrent.futures.ProcessPoolExecutor(jobs or None)
+    results = pool.map(render,*zip(*tasks),\
+                       chunksize=max(1,len(tasks)//((jobs or 8)*4)))
+  def modules():#Stream the Modules straight to the Library
+    for name, text, error in results:
+      if error != None:
+        log.info("Failed %s"%error)
+        failed.append(error)
+      else:
+        yield name, text
+    for libfile in libfiles:
+      for name, text in ReadLibrary(libfile):
+        yield name, text
+  if fmt == "kicad_mod":
+    WritePretty(destfile,modules())
+  else:
+    WriteLibrary(destfile,modules())
+  if jobs != 1 and tasks:
+    pool.shutdown()
+  if parts:
+    bad = set(e.modname for e in failed)
+    WriteSymbols(symlib,[i for i in symbols if i[0] not in bad])
+  log.warning("%d modules, %d failed"%(count,len(failed)))
+  for error in failed:
+    log.warning("  %s"%error)
+  return failed
+############################################################################
+def Help_modgen():
+  """Usage of the Command line Generation"""
+  print("""
+ Usage: %(prog)s [-v]
+   Starts the Module Generator GUI
+
+ Usage: %(prog)s [-v] [-u mils|mm] [-o <file.emp>|<file.kicad_mod>|-] \\
+           package=<package> [<parameter>=<value> ...]
+   Generates the Module without the GUI, the parameters not given are
+   taken from the package defaults and the module is written to
+   <modname>.emp or the file given with -o ( - for the standard output).
+   A .kicad_mod file gets the KiCad s-expression footprint.
+
+   package  - %(packages)s
+   parameters - modname refname PIN_N PIN_N_HORIZ pitch padx pady paddrill
+                rowx rowy padshape(C|O|R) padtype(STD|SMD)
+                firstpadsquare(0|1) locking(0|1) description keywords
+   placement - rotate(0|90|180|270) counter clockwise, mirror(0|1) to
+               flip to the bottom side, origin(none|center|pin1)
+   BGA      - rows cols pitch padx(ball diameter) and
+              depop(center:<n> perimeter:<n> <ball> ...) for the
+              positions without balls, eg. depop="center:4 A1"
+   -u   - Units of the dimensions, default mils
+   -v   - Print the module parameters and the generated text
+
+ Usage: %(prog)s [-q|-v] [-j <jobs>] [-u mils|mm] -o <lib.emp> \\
+           package=<package> [<parameter>=<values> ...]
+   Generates a family of Modules into one library, one for every
+   combination of the parameter values. The values are separated by
+   commas and a:b[:step] gives a range,
+   eg. PIN_N=2:40 pitch=100,79 locking=0,1
+   The modules are named with the Automatic Name rules.
+
+ Usage: %(prog)s [-q|-v] [-j <jobs>] -o <lib.emp> <spec.xml|lib.emp> ...
+   Generates the Modules of the spec files into one library. A spec file
+   has <module> elements with the parameters as attributes, the pin
+   names one per line as text (numbered when not given) and an optional
+   units attribute. <sweep> elements are families as above with the
+   values separated by spaces:
+     <library>
+       <module package="SIP" modname="JTAG" units="mm" pitch="2.54">
+         VCC
+         TDI
+         TDO
+       </module>
+       <sweep package="DIP" modname="DIP" PIN_N="4:64:2" rowx="300 600"/>
+     </library>
+   The modules of the .emp libraries given are added after them, so
+   single module files can be merged into one library.
+   <part> elements give the symbol and the footprint of a part at once,
+   with the libgen pin rows (name,etype[,group]) as text, the compname,
+   symbol (libgen package) and unitpins for the symbol and the module
+   parameters for the footprint:
+       <part compname="MCU" refname="U" package="QUAD" PIN_N_HORIZ="2"
+             rowx="400" rowy="400" description="Micro">
+         VDD,W
+         PA0,B
+         ...
+       </part>
+   The pads are numbered like the pins and the symbols are written to the
+   -l <lib.lib|lib.kicad_sym> library, by default named as the -o one.
+   With -o <lib.pretty> the modules are written as KiCad footprints,
+   one .kicad_mod file each in the <lib.pretty> directory.
+   -j   - Number of processes, 0 for all the CPUs, default 1
+   -q   - Only print the summary
+
+ Usage: %(prog)s [-q|-v] [-u mils|mm] -d <clearance> <lib.emp|lib.pretty|\\
+           file.kicad_mod> ...
+   Checks the pads of every module of the libraries for overlaps and the
+   clearance, exits with an error when any module fails. -d also sets
+   the clearance the generated modules are checked against, they are
+   always checked for overlapping pads.
+"""%{"prog":os.path.basename(sys.argv[0]),\
+     "packages":" ".join(sorted(package_defaults))})
+############################################################################
+def ParseParams(args):
+  """Convert the command line <parameter>=<value> list to parameters"""
+  params = {}
+  for arg in args:
+    if "=" not in arg:
+      raise ModGenError(arg,"Expected <parameter>=<value>")
+    k,v = arg.split("=",1)
+    params[k] = v
+  return params
+############################################################################
+#CONVERSION FUNCTIONS>
 ############################################################################
 def mmtomil(mm):
   ''' Function to convert the mm into mils even when its a string
@@ -410,998 +1456,114 @@ def miltomm(mil):
     mm = "%f"%mm
   er = "ok"
   return mm
-############################################################################
-def Validate():
-  """To Validate the GUI Inputs"""
-  global er
-  er = 1
-  # Check Pitch
-  try:
-    k = float(pitch.get())*1.0
-    er = "ok"
-    if (k<=0 or k>=400) and units.get()=="mils":
-      tkinter.messagebox.showerror("Error","Invalid Pitch Value")        
-      er = "pitch"
-      pitch.set("100")
-      return 1
-    elif (k<=0 or k>=10) and units.get()=="mm":
-      tkinter.messagebox.showerror("Error","Invalid Pitch Value")        
-      er = "pitch"
-      pitch.set("2.54")
-      return 1
-  except:    
-    tkinter.messagebox.showerror("Error","Invalid Pitch Value")        
-    er = "pitch"
-    if units.get()=="mm":
-      pitch.set("2.54")
-    else:
-      pitch.set("100")
-    return 1
-  # Check Padx
-  try:
-    k = float(padx.get())*1.0
-    er = "ok"
-    if (k<=0):
-      tkinter.messagebox.showerror("Error","Invalid Pad X Value")        
-      er = "padx"
-      if units.get()=="mils":
-        padx.set("70")
-      else:
-        padx.set("1.778")
-      return 1
-  except:    
-    tkinter.messagebox.showerror("Error","Invalid Pad X Value")        
-    er = "padx"
-    if units.get()=="mils":
-      padx.set("70")
-    else:
-      padx.set("1.778")
-    return 1
-  # Check Pady
-  try:
-    k = float(pady.get())*1.0
-    er = "ok"
-    if(k<=0):
-      tkinter.messagebox.showerror("Error","Invalid Pad Y Value")        
-      er = "pady"
-      if units.get()=="mils":
-        pady.set("70")
-      else:
-        pady.set("1.778")
-      return 1
-  except:    
-    tkinter.messagebox.showerror("Error","Invalid Pad Y Value")        
-    er = "pady"
-    if units.get()=="mils":
-      pady.set("70")
-    else:
-      pady.set("1.778")
-    return 1
-  # Check Pad Drill
-  try:
-    k = float(paddrill.get())*1.0
-    er = "ok"
-    if(k<=10 or k>250) and padtype.get()=='STD'and units.get()=="mils":
-      tkinter.messagebox.showerror("Error","Invalid Pad Drill Value")        
-      er = "paddrill"
-      paddrill.set("35")
-      return 1
-    elif(k<=0.254 or k>6.1) and padtype.get()=='STD'and units.get()=="mm":
-      tkinter.messagebox.showerror("Error","Invalid Pad Drill Value")        
-      er = "paddrill"
-      paddrill.set(".889")
-      return 1
-    #elif padtype.get()=='SMD':#Allow Even Drils if needed
-    #  paddrill.set("0")
-  except:    
-    tkinter.messagebox.showerror("Error","Invalid Pad Drill Value")        
-    er = "paddrill"
-    if units.get() == "mils":
-      paddrill.set("35")
-    else:
-      paddrill.set(".889")
-    return 1
-  # Check Pin N
-  try:
-    k = int(PIN_N.get())*1
-    er = "ok"
-    if(k<=1):
-      tkinter.messagebox.showerror("Error","Invalid Number of Pins")        
-      er = "PIN_N"
-      PIN_N.set("8")
-      return 1
-    if (k%2)!=0 and (package.get() in ['DIP','CONN-Dual']):
-      tkinter.messagebox.showerror("Error","Invalid Number of Pins")        
-      er = "PIN_N"
-      PIN_N.set("8")
-      return 1
-  except:    
-    tkinter.messagebox.showerror("Error","Invalid Number of Pins")        
-    er = "PIN_N"
-    PIN_N.set("8")
-    return 1
-  # Check Row X
-  try:
-    k = float(rowx.get())*1
-    er = "ok"
-    if (k<=0) and (package.get() in ['DIP','CONN-Dual']):
-      tkinter.messagebox.showerror("Error","Invalid Row X Spacing")        
-      er = "RowX"
-      if units.get() == "mils":
-        rowx.set("10")
-      else:
-        rowx.set("0.254")
-      return 1
-  except:    
-    tkinter.messagebox.showerror("Error","Invalid Row X Spacing")        
-    er = "RowX"
-    return 1
-  # Check Row Y
+if __name__ == "__main__" :
+  #{
+  # All the Parameters and Generated text with -v
   try:
-    k = float(rowy.get())*1
-    er = "ok"
-    if (k<=0) and (package.get() in ['QUAD']):
-      tkinter.messagebox.showerror("Error","Invalid Row Y Spacing")        
-      er = "RowY"
-      if units.get() == "mils":
-        rowy.set("10")
-      else:
-        rowy.set("0.254")
-      return 1
-  except:    
-    tkinter.messagebox.showerror("Error","Invalid Row Y Spacing")        
-    er = "RowY"
-    return 1
-  # Check PIN_N_HORIZ
+    opts,args = getopt.getopt(sys.argv[1:],"o:u:s:j:d:l:qvh")
+  except getopt.GetoptError as e:
+    print(" Error: %s"%e)
+    Help_modgen()
+    exit(-1)
+  opts = dict(opts)
+  if "-v" in opts:
+    level = logging.DEBUG
+  elif "-q" in opts:
+    level = logging.WARNING
+  else:
+    level = logging.INFO
+  # Keep the standard output clean when the module is written there
+  logging.basicConfig(format="%(message)s",\
+                      stream=sys.stderr if opts.get("-o")=="-" else sys.stdout,\
+                      level=level)
+  if "-h" in opts:
+    Help_modgen()
+    exit(0)
+  #Spec files and <parameter>=<value> arguments
+  lib_exts = (".emp",".kicad_mod",".pretty")
+  specs = [i for i in args if "=" not in i and\
+           not i.rstrip("/").endswith(lib_exts)]
+  libfiles = [i for i in args if "=" not in i and\
+              i.rstrip("/").endswith(lib_exts)]
+  if "-s" in opts:
+    specs.insert(0,opts["-s"])
   try:
-    k = int(PIN_N_HORIZ.get())*1
-    er = "ok"
-    if (k<=0) and (package.get() in ['QUAD']):
-      tkinter.messagebox.showerror("Error","Invalid Number of Pins Horizontally")        
-      er = "PIN_N_HORIZ"
-      PIN_N_HORIZ.set("%d"%(int(PIN_N.get())/4))
-      return 1
-  except:    
-    tkinter.messagebox.showerror("Error","Invalid Number of Pins Horizontally")        
-    er = "PIN_N_HORIZ"
-    return 1
-  #Check The Description
-  if(len(description.get())==0):
-    description.set(modname.get())
-  #Check The Keywords
-  if(len(keywords.get())==0):
-    keywords.set(modname.get())  
-  #Check the Oblong Selection PadY>Padx
-  if(float(padx.get())==float(pady.get())) and padshape.get()=='O':
-    tkinter.messagebox.showerror("Error","Incorrect Pad Dimensions for Oblong pads")
-    er = "Oblong Pad Shape"
-    return 1
-  #Check the Circle Selection PadY=Padx
-  if(float(padx.get())!=float(pady.get())) and padshape.get()=='C':
-    tkinter.messagebox.showerror("Error",\
-      "Incorrect Pad Dimensions for Circular pads")
-    er = "Circular Pad Shape"
-    return 1
-  #At the End Return
-  return 1
-############################################################################
-def autouintadjust():
-  ''' Automatically adjust the units as per selection '''
+    params = ParseParams([i for i in args if "=" in i])
+  except ModGenError as e:
+    log.error(" Error In %s"%e)
+    exit(-1)
+  units = opts.get("-u","mils")
+  output = opts.get("-o","-")
+  try:#Minimum Pad clearance in the Units
+    clearance = int(round(float(opts.get("-d","0"))*nm_per_unit[units]))
+  except (ValueError,KeyError):
+    print(" Error: Invalid clearance %s %s"%(opts.get("-d"),units))
+    exit(-1)
+  for spec in specs+libfiles:
+    if not os.path.exists(spec):
+      print(" Error: File %s does not exist"%spec)
+      exit(-1)
+  if "-d" in opts and "-o" not in opts and not len(specs+list(params)):
+    #Check the Pads of the Libraries
+    if not len(libfiles):
+      print(" Error: No library to check")
+      Help_modgen()
+      exit(-1)
+    failed = CheckLibraries(libfiles,clearance)
+    exit(-1 if len(failed) else 0)
   try:
-    if units.get() == "mm":#Preivious was Mils    
-      pitch.set(miltomm(pitch.get()))
-      padx.set(miltomm(padx.get()))
-      pady.set(miltomm(pady.get()))
-      paddrill.set(miltomm(paddrill.get()))
-      rowx.set(miltomm(rowx.get()))
-      rowy.set(miltomm(rowy.get()))
-    if units.get() == "mils":#Preivious was mm
-      pitch.set(mmtomil(pitch.get()))
-      padx.set(mmtomil(padx.get()))
-      pady.set(mmtomil(pady.get()))
-      paddrill.set(mmtomil(paddrill.get()))
-      rowx.set(mmtomil(rowx.get()))
-      rowy.set(mmtomil(rowy.get()))
-  except:
-    print('Error in Unit Conversion')
-    tkinter.messagebox.showerror("Error","Error in Unit Conversion")
-############################################################################
-def packed():
-  """To Pack the GUI inputs to the XML form"""
-  #Convert to Mils as all processing is in mils
-  if units.get() == "mm":
-    units.set("mils")
-    autouintadjust()
-  #Run Validation Check
-  Validate()  
-  if er != "ok":    
-    print("Error In " + er)
-    return 0
-  print("Module Name: " + modname.get())
-  meta["modname"] = modname.get()
-  print("Reference Designator: " + refdes.get())
-  meta["refname"] = refdes.get()
-  print("Package: " + package.get())
-  meta["package"] = package.get()
-  print("Pitch: " + pitch.get())
-  meta["pitch"] = pitch.get()
-  print("Pad x Dimension: " + padx.get())
-  meta["padx"] = padx.get()
-  print("Pad y Dimension: " + pady.get())
-  meta["pady"] = pady.get()
-  print("Pad Drill Diameter: " + paddrill.get())
-  meta["paddrill"] = paddrill.get()
-  print("Pad Shape: "+ padshape.get())
-  meta["padshape"] = padshape.get()
-  print("First Pad Square: " + ("True" if firstpinsquare.get() else "False"))
-  meta["firstpadsquare"] = 1 if firstpinsquare.get() else None
-  print("Self Locking Pattern: " + ("True" if locking.get() else "False"))
-  meta["locking"] = "5" if locking.get() else None
-  print("Pad Type: " + padtype.get())
-  meta["padtype"] = padtype.get()
-  if padtype.get() == 'STD':
-    meta["padlayermask"]='00E0FFFF' #normally for STD 
-  else:
-    meta["padlayermask"]='00888000' #notmally for SMD
-  print("Number of Pins: " + PIN_N.get())
-  meta["PIN_N"] = PIN_N.get()
-  pins = PinGen(int(meta["PIN_N"]))
-  print("Description for Module: " + description.get())
-  meta["description"] = description.get()
-  print("Keywords for Module: " + keywords.get())
-  meta["keywords"] = keywords.get()
-  if meta["package"] in ['DIP','CONN-Dual','QUAD']:
-    print("Pin Row Spacing X:" + rowx.get())
-    meta["rowx"] = rowx.get()
-  else:
-    meta["rowx"] = None
-  if meta["package"] =='QUAD':
-    print("Pin Row Spacing Y:" + rowy.get())
-    meta["rowy"] = rowy.get()
-    print("Number of Pins Horizontally: " + PIN_N_HORIZ.get())
-    meta["PIN_N_HORIZ"] = PIN_N_HORIZ.get()
-    meta["PIN_N_VERT"] = "%d"%(\
-      (int(PIN_N.get())-(int(PIN_N_HORIZ.get())*2))/2)
-    print("Number of Pins Vertically: " + meta["PIN_N_VERT"])
-  else:
-    meta["rowy"] = None
-    meta["PIN_N_HORIZ"] = None
-    meta["PIN_N_VERT"] = None
-  #Generate the Pad description
-  meta["pads"]=MakePads(pins,meta)
-  print(template_pcb%meta)
-  name = meta["modname"]
-  if(locking.get()) and package.get() == 'SIP':
-    name = name+"_LOCK"
-  name = name+".emp"
-  ans = tkinter.messagebox.askokcancel("File Wite",\
-        "Do you want to wite "+name+" for the Module?")
-  if(ans):
-    fl = open(name,"w")
-    fl.write(template_pcb%meta)
-    fl.close()
-    tkinter.messagebox.showinfo("Module Generator",\
-      "Module "+meta["modname"]+" Written Successfully!!")
-    print(" Module "+name+" written successfully")
-  return 1
-############################################################################
-def draw():
-  '''Draw Pictures depending on Package and configuration'''
-  canvas.delete("all")
-  if package.get() == 'SIP':
-    canvas.create_rectangle(40,40,160,80,width=3)
-    #First Pad
-    x = 55
-    y = 55
-    if locking.get() == False:
-      xy = x,y,x+10,y+10
-      if firstpinsquare.get():
-        canvas.create_rectangle(xy,width=5)
-      else:
-        canvas.create_oval(xy,width=5)
-      canvas.create_text(x+5,30,text="1",fill="red")
-      #Further pads
-      for i in range(0,4):
-        x = x + 20
-        xy = x,y,x+10,y+10
-        canvas.create_oval(xy,width=5)
-        canvas.create_text(x+5,30,text="%d"%(i+2),fill="red")
-      #Pitch
-      canvas.create_line(60,60,60,100,width=2,fill='red')
-      canvas.create_line(80,60,80,100,width=2,fill='red')
-      canvas.create_line(40,90,60,90,width=2,arrow=LAST,fill='blue')
-      canvas.create_line(80,90,100,90,width=2,arrow=FIRST,fill='blue')
-      canvas.create_text(70,110,text="Pitch",font=("Arial",10,"bold"),\
-                         fill="blue")
-    else: #LOcked SIP type
-      l=1
-      for i in range(0,5):
-        l = 1 if l==0 else 0
-        if l == 0:
-          xy = x,y+5,x+10,y+15
-        else:
-          xy = x,y-5,x+10,y+5
-        x = x + 20
-        if i==0 and firstpinsquare.get():
-          canvas.create_rectangle(xy,width=5)
-        else:
-          canvas.create_oval(xy,width=5)
-        canvas.create_text(x-15,30,text="%d"%(i+1),fill="red")
-      #Pitch
-      canvas.create_line(60,65,60,100,width=2,fill='red')
-      canvas.create_line(80,55,80,100,width=2,fill='red')
-      canvas.create_line(40,90,60,90,width=2,arrow=LAST,fill='blue')
-      canvas.create_line(80,90,100,90,width=2,arrow=FIRST,fill='blue')
-      canvas.create_text(70,110,text="Pitch",font=("Arial",10,"bold"),\
-                         fill="blue")
-      #Lock
-      canvas.create_line(20,65,60,65,width=2,fill='red')
-      canvas.create_line(20,55,80,55,width=2,fill='red')
-      canvas.create_line(30,35,30,55,width=2,arrow=LAST,fill='blue')
-      canvas.create_line(30,90,30,65,width=2,arrow=LAST,fill='blue')
-      canvas.create_text(30,30,text="Lock",font=("Arial",10,"bold"),\
-                         fill="blue")
-  elif package.get() == 'DIP':
-    canvas.create_rectangle(60,30,160,100,width=3)
-    xy = 40,40,50,50
-    canvas.create_oval(xy,width=3)
-    xy = 100,20,120,40
-    canvas.create_arc(xy,start=180,extent=180,width=3)
-    #First Set
-    x = 70
-    y = 40
-    for i in range(0,3):
-      xy = x,y,x+30,y+10
-      y = y + 20
-      canvas.create_oval(xy,width=5)
-      canvas.create_text(x-50,y-20,text="%d"%(i+1),fill="red")
-    #Second Set
-    x = 120
-    y = 40
-    for i in range(0,3):
-      xy = x,y,x+30,y+10
-      y = y + 20
-      canvas.create_oval(xy,width=5)
-      canvas.create_text(x+50,y-20,text="%d"%(6-i),fill="red")
-    #Pitch
-    canvas.create_line(30,65,90,65,width=2,fill='red')
-    canvas.create_line(30,85,90,85,width=2,fill='red')
-    canvas.create_line(30,50,30,65,width=2,arrow=LAST,fill='blue')
-    canvas.create_line(30,85,30,100,width=2,arrow=FIRST,fill='blue')
-    canvas.create_text(40,75,text="Pitch",font=("Arial",10,"bold"),\
-                       fill="blue")
-    #Row X
-    canvas.create_line(85,20,85,45,width=2,fill='red')
-    canvas.create_line(135,20,135,45,width=2,fill='red')
-    canvas.create_line(85,20,135,20,width=2,arrow=BOTH,fill='blue')
-    canvas.create_text(110,10,text="Row Spacing X",font=("Arial",10,"bold"),\
-                       fill="blue")
-
-  elif package.get() == 'CONN-Dual':
-    canvas.create_rectangle(60,30,110,100,width=3)
-    xy = 40,40,50,50
-    canvas.create_oval(xy,width=3)
-    #First Set
-    x = 70
-    y = 40
-    k = 1
-    for i in range(0,3):
-      xy = x,y,x+10,y+10
-      y = y + 20
-      if i==0 and firstpinsquare.get():
-        canvas.create_rectangle(xy,width=5)
-      else:
-        canvas.create_oval(xy,width=5)
-      canvas.create_text(x-50,y-20,text="%d"%(k),fill="red")
-      k = k + 2
-    #Second Set
-    x = 90
-    y = 40
-    k = 2
-    for i in range(0,3):
-      xy = x,y,x+10,y+10
-      y = y + 20
-      canvas.create_oval(xy,width=5)
-      canvas.create_text(x+30,y-20,text="%d"%(k),fill="red")
-      k = k + 2
-    #Pitch
-    canvas.create_line(30,65,75,65,width=2,fill='red')
-    canvas.create_line(30,85,75,85,width=2,fill='red')
-    canvas.create_line(30,50,30,65,width=2,arrow=LAST,fill='blue')
-    canvas.create_line(30,85,30,100,width=2,arrow=FIRST,fill='blue')
-    canvas.create_text(40,75,text="Pitch",font=("Arial",10,"bold"),\
-                       fill="blue")
-    #Row X
-    canvas.create_line(75,20,75,45,width=2,fill='red')
-    canvas.create_line(95,20,95,45,width=2,fill='red')
-    canvas.create_line(40,20,75,20,width=2,arrow=LAST,fill='blue')
-    canvas.create_line(95,20,130,20,width=2,arrow=FIRST,fill='blue')
-    canvas.create_text(85,10,text="Row Spacing X",font=("Arial",10,"bold"),\
-                       fill="blue")
-  elif package.get() == 'QUAD':
-    x = 50
-    y = 40
-    dx = 120
-    dy = 120
-    canvas.create_polygon(\
-      x,y+20,x+20,y,x+dx,y,x+dx,y+dy,x,y+dy,fill="white",width=2,outline="black")
-    xy = x-20,y+40,x-10,y+30
-    canvas.create_oval(xy,width=2)
-    #Left
-    ox = x + 10
-    oy = y + 35
-    for i in range(1,5):
-      xy = ox,oy,ox+20,oy+5
-      canvas.create_rectangle(xy,fill="black")
-      canvas.create_text(ox-50,oy+5,text="%d"%(i),fill="red")
-      oy = oy + 15
-    #Bottom
-    ox = x + 35
-    oy = y + + dy - 10
-    for i in range(5,9):
-      xy = ox,oy,ox+5,oy-20
-      canvas.create_rectangle(xy,fill="black")
-      canvas.create_text(ox+5,oy+15,text="%d"%(i),fill="red")
-      ox = ox + 15
-    #Right
-    ox = x + dx - 10
-    oy = y + dy - 35
-    for i in range(9,13):
-      xy = ox,oy,ox-20,oy-5
-      canvas.create_rectangle(xy,fill="black")
-      canvas.create_text(ox+30,oy-5,text="%d"%(i),fill="red")
-      oy = oy - 15
-    #Top
-    ox = x + dx - 35
-    oy = y + 30
-    for i in range(13,17):
-      xy = ox,oy,ox-5,oy-20
-      canvas.create_rectangle(xy,fill="black")
-      canvas.create_text(ox-5,oy-50,text="%d"%(i),fill="red")
-      ox = ox - 15
-    #Pitch
-    canvas.create_line(x+20,y+52,x+50,y+52,fill='red')
-    canvas.create_line(x+20,y+68,x+50,y+68,fill='red')
-    canvas.create_line(x+50,y+40,x+50,y+52,arrow=LAST,fill='blue')
-    canvas.create_line(x+50,y+68,x+50,y+80,arrow=FIRST,fill='blue')
-    canvas.create_text(x+60,y+62,text="Pitch",fill="blue")
-    #Row X
-    canvas.create_line(x+20,y+dy-36,x+20,y+dy+30,fill='red')
-    canvas.create_line(x+dx-20,y+dy-36,x+dx-20,y+dy+30,fill='red')
-    canvas.create_line(x+20,y+dy+30,x+dx-20,y+dy+30,arrow=BOTH,fill='blue')
-    canvas.create_text(x+60,y+dy+20,text="Row Spacing X",fill="blue")
-    #Row Y
-    canvas.create_line(x-30,y+20,x+35,y+20,fill='red')
-    canvas.create_line(x-30,y+dy-20,x+35,y+dy-20,fill='red')
-    canvas.create_line(x-25,y+20,x-25,y+dy-20,arrow=BOTH,fill='blue')
-    canvas.create_text(x-25,y+dy-10,text="Row",fill="blue")
-    canvas.create_text(x-25,y+dy,text="Spacing",fill="blue")
-    canvas.create_text(x-25,y+dy+10,text="Y",fill="blue")
-    #Pin Horiz
-    ox = x - 35
-    oy = y + 25
-    canvas.create_line(ox,oy,ox-20,oy,fill='red')
-    canvas.create_line(ox,oy,ox,oy+70,fill='red')
-    canvas.create_line(ox,oy+70,ox-20,oy+70,fill='red')
-    canvas.create_line(ox+10,oy-35,ox,oy,arrow=LAST,fill='blue')
-    canvas.create_text(ox+20,oy-55,text="No. of Pins",fill="blue")
-    canvas.create_text(ox+20,oy-45,text="Horizontally",fill="blue")
-    
-  #Pad Generic
-  if package.get() in ['SIP','DIP','CONN-Dual']:     
-    xy = 100+6,140+6,140-6,180-6
-    canvas.create_oval(xy,width=12)
-    canvas.create_line(60,140,120,140,width=2,fill='red')
-    canvas.create_line(60,180,120,180,width=2,fill='red')
-    canvas.create_line(80,140,80,180,width=2,arrow=BOTH,fill='blue')
-    canvas.create_text(50,160,text="Pad Y",font=("Arial",10,"bold"),\
-                       fill="blue")
-    canvas.create_line(100,120,100,160,width=2,fill='red')
-    canvas.create_line(140,120,140,160,width=2,fill='red')
-    canvas.create_line(100,130,140,130,width=2,arrow=BOTH,fill='blue')
-    canvas.create_text(120,115,text="Pad X",font=("Arial",10,"bold"),\
-                       fill="blue")
-    canvas.create_line(110,150,130,170,width=2,arrow=BOTH,fill='red')
-    canvas.create_line(130,170,150,190,width=2,fill='red')
-    canvas.create_line(150,190,190,190,width=2,fill='red')
-    canvas.create_text(170,175,text="Drill Dia",font=("Arial",10,"bold"),\
-                       fill="blue")
-  canvas.update()
-############################################################################  
-def package_cmb_update(event):
-  """To Update Options when the Screen is Activated"""
-  units.set("mils")
-  description.set("")
-  keywords.set("")
-  if package.get() == 'SIP':
-     rowx_di()
-     rowy_di()
-     PIN_N_HORIZ_di()
-     modname.set('CONN')
-     refdes.set('J')
-     PIN_N.set('8')
-     pitch.set('100')
-     padx.set('70')
-     pady.set('70')
-     paddrill.set('35')
-     padshape.set('C')
-     firstpinsquare.set(True)
-     locking.set(False)
-     padtype.set('STD')     
-  elif package.get() == 'DIP':
-     rowx_en()     
-     rowy_di()
-     PIN_N_HORIZ_di()
-     modname.set('DIP')
-     refdes.set('U')
-     PIN_N.set('8')
-     pitch.set('100')
-     padx.set('150')
-     pady.set('60')
-     paddrill.set('39.37')
-     rowx.set(value="300")
-     padshape.set('O')
-     firstpinsquare.set(False)
-     locking.set(False)
-     padtype.set('STD')     
-  elif package.get() == 'CONN-Dual':
-     rowx_en()
-     rowy_di()
-     PIN_N_HORIZ_di()
-     modname.set('CONN2X')
-     refdes.set('J')
-     PIN_N.set('16')
-     pitch.set('100')
-     padx.set('70')
-     pady.set('70')
-     paddrill.set('35')
-     rowx.set(value="100")
-     padshape.set('C')
-     firstpinsquare.set(False)
-     locking.set(False)
-     padtype.set('STD')
-  elif package.get() == 'QUAD':
-     rowx_en()
-     rowy_en()     
-     PIN_N_HORIZ_en()
-     modname.set('QUAD')
-     refdes.set('U')
-     PIN_N.set('32')
-     PIN_N_HORIZ.set('4')
-     pitch.set('19.74')
-     padx.set('120')
-     pady.set('12')
-     paddrill.set('0')
-     rowx.set(value="100")
-     rowy.set(value="100")
-     padshape.set('R')
-     firstpinsquare.set(False)
-     locking.set(False)
-     padtype.set('SMD')
-     #Default Settings only For test
-     if _debug_message==1:
-       modname.set('quad')
-       PIN_N.set('32')
-       rowx.set(value="600")
-       rowy.set(value="600")
-       padx.set('150')
-       pady.set('20')
-       pitch.set('50')
-       PIN_N_HORIZ.set('4')
-  draw()
-############################################################################  
-def autoname():
-  """ To Automatically Generate the Name,Description,RefDes,
-      and Keywords for the Component
-  """
-  if len(modname.get())!=0:
-##    try:
-      Validate()
-      if er != "ok":    
-         print("Error In " + er)
-         return
-      # Check for Berg Connector Single Row
-      f = re.match("^(.)*(CONN)",modname.get().upper())
-      g = re.match(\
-          "^(.)*((?:DIP)|(?:SOIC)|(?:SSOP)|(?:TSSOP)|(?:MSOP))"\
-          ,modname.get().upper())
-      h = re.match("^(.)*(CONN2X)",modname.get().upper())
-      
-      #Get the Parameters and Format them
-      if units.get()=="mm":
-        pich = "%2.2f"%(float(pitch.get()))
-        x = ("%2.2f"%(float(padx.get())))
-        y = ("%2.2f"%(float(pady.get())))
-        dril = ("%2.2f"%(float(paddrill.get())))
-        rox = "%2.2f"%(float(rowx.get()))
-      else:
-        pich = "%d"%(float(pitch.get()))
-        x = ("%d"%(float(padx.get())))
-        y = ("%d"%(float(pady.get())))
-        dril = ("%d"%(float(paddrill.get())))
-        rox = "%d"%(float(rowx.get()))
-
-      #Templates for Automatic Nameing
-      template_desc_pcb ="""%(name)s %(pin)sPin%(rowx1)s%(fix)s %(pitch)s Pitch \
-%(pad)s Pad %(drill)s %(shape)s %(type)s"""
-      template_keyw_pcb ="""%(name)s%(pin)s_%(fix)s %(name)s%(pin)s_%(fix)s_\
-%(pitch)s %(name)s%(pin)s%(rowx1)s_%(fix)s_%(pitch)s_%(pad)s\
-_%(drill)s%(shape)s%(type)s"""
-      desc = {}
-      keys = {}
-
-      #Common Generation Stub
-      desc["pin"] = PIN_N.get()
-      keys["pin"] = PIN_N.get()
-
-      if padtype.get()=="STD":
-        desc["fix"]="Through Hole"
-        keys["fix"]="TH"
-      else:
-        desc["fix"]="SMD"
-        keys["fix"]="SMD"
-        
-      desc["pitch"] = pich
-      keys["pitch"] = pich
-
-      if x != y:
-        desc["pad"] = x+"X"+y        
-        keys["pad"] = x+"X"+y
-      else:
-        desc["pad"] = x        
-        keys["pad"] = x
-          
-      if padshape.get() =='O':
-         desc["shape"] = "Oblong"
-         keys["shape"] = "O"           
-      elif padshape.get() =='R':
-         desc["shape"] = "Rectangular"
-         keys["shape"] = "R"
-      else:
-         desc["shape"] = "Circular"
-         keys["shape"] = "C"
-          
-      if padtype.get()=="STD":
-        desc["drill"] = dril+ " Drill"
-        keys["drill"] = dril + "_"
-      else:
-        desc["drill"] = ""
-        keys["drill"] = ""
-          
-      #Validate As per packages
-      if f!=None and package.get()=="SIP":
-        refdes.set("J")#Set the Ref
-        
-        desc["name"] = f.group(2)
-        keys["name"] = f.group(2)
-        
-        desc["rowx1"] = " "
-        keys["rowx1"] = ""
-
-        if locking.get():  
-          desc["type"] = "Locking"
-          keys["type"] = "L"
-        else:
-          desc["type"] = "Normal"
-          keys["type"] = "N"
-
-        dec = template_desc_pcb % desc
-        key = template_keyw_pcb % keys
-                
-        description.set(dec)
-        keywords.set(key)
-        modname.set(key.split(" ")[2])
-        
-      elif g!=None and package.get()=='DIP':
-        refdes.set("U")#Set the Ref
-        
-        desc["name"] = g.group(2)
-        keys["name"] = g.group(2)
-        
-        desc["rowx1"] = " " + rox + " Spacing "
-        keys["rowx1"] = "_" + rox
-
-        desc["type"] = ""
-        keys["type"] = ""
-          
-        dec = template_desc_pcb % desc
-        key = template_keyw_pcb % keys
-        
-        description.set(dec)
-        keywords.set(key)
-        modname.set(key.split(" ")[2])
-
-      elif h!=None and package.get()=='CONN-Dual':
-        refdes.set("J")#Set the Ref
-        
-        desc["name"] = h.group(2)[:4]
-        keys["name"] = h.group(2)[:4]
-
-        desc["pin"] = "%d"%(int(PIN_N.get())/2)
-        keys["pin"] = "%d"%(int(PIN_N.get())/2)
-        
-        desc["rowx1"] = " Dual Row " + rox + " Spacing "
-        keys["rowx1"] = "_" + rox
-
-        desc["type"] = ""
-        keys["type"] = ""
-          
-        dec = template_desc_pcb % desc
-        key = template_keyw_pcb % keys
-        
-        description.set(dec)
-        keywords.set(key)
-        modname.set(key.split(" ")[2])
-##    except:
-##      pass
-############################################################################
-def Draw_MainPane(fr):
-  """To Generate the Content for the Main Input Frame"""
-  global modname,refdes,package,pitch,padx,pady,\
-         paddrill,padshape,firstpinsquare,locking,padtype,PIN_N,\
-         description,keywords,rowx,rowx_e,rowx_en,rowx_di,\
-         rowy,rowy_e,rowy_en,rowy_di,units,\
-         PIN_N_HORIZ,PIN_N_HORIZ_e,PIN_N_HORIZ_en,PIN_N_HORIZ_di
-
-  Label(fr,text="Package:")\
-          .grid(column=0,row=0,padx=2,pady=2,sticky=N+E)
-  package=StringVar()
-  pack=tkinter.ttk.Combobox(fr,width=10,state="readonly",\
-          values=['SIP','DIP','CONN-Dual','QUAD'],textvariable=package)
-  pack.current(0)
-  pack.bind("<<ComboboxSelected>>",package_cmb_update)
-  pack.grid(column=1,row=0,columnspan=2,padx=2,pady=2,sticky=N+W+E)
-  
-  Label(fr,text="Module Name:")\
-          .grid(column=0,row=1,padx=2,pady=2,sticky=N+E)
-  modname=StringVar(value="Mod_Name")
-  Entry(fr,textvar=modname,width=20)\
-          .grid(column=1,row=1,columnspan=2,padx=2,pady=2,sticky=N+W+E)
-
-  Label(fr,text="Reference Designator:")\
-          .grid(column=0,row=2,padx=2,pady=2,sticky=N+E)
-  refdes=StringVar(value="Ref_Des")
-  Entry(fr,textvar=refdes,width=20)\
-          .grid(column=1,row=2,columnspan=2,padx=2,pady=2,sticky=N+W+E)
-
-  Label(fr,text="Number of Pins:")\
-          .grid(column=0,row=3,padx=2,pady=2,sticky=N+E)
-  PIN_N=StringVar(value="8")
-  Entry(fr,textvar=PIN_N,width=20)\
-          .grid(column=1,row=3,columnspan=2,padx=2,pady=2,sticky=N+W+E)
-  
-  Label(fr,text="Number of Pins Horizonally:")\
-          .grid(column=0,row=4,padx=2,pady=2,sticky=N+E)
-  PIN_N_HORIZ=StringVar(value="0")
-  PIN_N_HORIZ_e = Entry(fr,textvar=PIN_N_HORIZ,width=20)
-  PIN_N_HORIZ_en = lambda: \
-    PIN_N_HORIZ_e.grid(column=1,row=4,columnspan=2,\
-              padx=2,pady=2,sticky=N+W+E)
-  PIN_N_HORIZ_di = lambda: \
-    PIN_N_HORIZ_e.grid_forget()
-  PIN_N_HORIZ_en()
-  PIN_N_HORIZ_di()
-
-  units_lb = tkinter.ttk.Labelframe(fr,text="Units",padding=2)
-  units =StringVar(value="mils")
-  Radiobutton(units_lb,text="Mils",variable=units,value="mils"\
-              ,command=autouintadjust).grid(column=0,row=0,sticky=N+W+E)
-  Radiobutton(units_lb,text="MM",variable=units,value="mm"\
-              ,command=autouintadjust).grid(column=1,row=0,sticky=N+W+E)
-  units_lb.grid(column=0,row=5,columnspan=3,padx=2,pady=2,sticky=N+W+E)
-  
-  Label(fr,text="Pitch:")\
-          .grid(column=0,row=6,padx=2,pady=2,sticky=N+E)
-  pitch=StringVar(value="100")
-  Entry(fr,textvar=pitch,width=20)\
-          .grid(column=1,row=6,columnspan=2,padx=2,pady=2,sticky=N+W+E)
-  
-  Label(fr,text="Pad Dimension X:")\
-          .grid(column=0,row=7,padx=2,pady=2,sticky=N+E)
-  padx=StringVar(value="70")
-  Entry(fr,textvar=padx,width=20)\
-          .grid(column=1,row=7,columnspan=2,padx=2,pady=2,sticky=N+W+E)
-  
-  Label(fr,text="Pad Dimension Y:")\
-          .grid(column=0,row=8,padx=2,pady=2,sticky=N+E)
-  pady=StringVar(value="70")
-  Entry(fr,textvar=pady,width=20)\
-          .grid(column=1,row=8,columnspan=2,padx=2,pady=2,sticky=N+W+E)
-  
-  Label(fr,text="Pad Drill Diameter:")\
-          .grid(column=0,row=9,padx=2,pady=2,sticky=N+E)
-  paddrill=StringVar(value="35")
-  Entry(fr,textvar=paddrill,width=20)\
-          .grid(column=1,row=9,columnspan=2,padx=2,pady=2,sticky=N+W+E)
-
-  Label(fr,text="Pin Row Spacing X:")\
-          .grid(column=0,row=10,padx=2,pady=2,sticky=N+E)
-  rowx=StringVar(value="0")
-  rowx_e = Entry(fr,textvar=rowx,width=20)
-  rowx_en = lambda: \
-    rowx_e.grid(column=1,row=10,columnspan=2,padx=2,pady=2,sticky=N+W+E)
-  rowx_di = lambda: \
-    rowx_e.grid_forget()
-  rowx_en()
-  rowx_di()
-
-  Label(fr,text="Pin Row Spacing Y:")\
-          .grid(column=0,row=11,padx=2,pady=2,sticky=N+E)
-  rowy=StringVar(value="0")
-  rowy_e = Entry(fr,textvar=rowy,width=20)
-  rowy_en = lambda: \
-    rowy_e.grid(column=1,row=11,columnspan=2,padx=2,pady=2,sticky=N+W+E)
-  rowy_di = lambda: \
-    rowy_e.grid_forget()
-  rowy_en()
-  rowy_di()
-  
-  padshp_lb=tkinter.ttk.Labelframe(fr,text="Pad Shape",padding=2)
-  padshape=StringVar(value="C")
-  Radiobutton(padshp_lb,text="Circle",variable=padshape,value="C")\
-          .grid(column=0,row=0,sticky=N+W+S)
-  Radiobutton(padshp_lb,text="Rectangle/Square",variable=padshape,value="R")\
-          .grid(column=1,row=0,sticky=N+W+S)
-  Radiobutton(padshp_lb,text="Oblong",variable=padshape,value="O")\
-          .grid(column=3,row=0,sticky=N+W+S)
-  padshp_lb.grid(column=0,row=12,columnspan=3,padx=2,pady=2,sticky=N+W+E)
-
-  firstpinsquare = BooleanVar()
-  Checkbutton(fr,text="First Pin Square",variable=firstpinsquare,\
-           onvalue=True,command=draw)\
-           .grid(column=0,row=13,padx=2,pady=2,sticky=N+W+S)
-  
-  locking = BooleanVar()
-  Checkbutton(fr,text="Self Locking Formation",\
-     variable=locking,onvalue=True,command=draw)\
-     .grid(column=1,row=13,padx=2,pady=2,columnspan=2,sticky=N+W+S)
-
-  padtyp_lb=tkinter.ttk.Labelframe(fr,text="Pad Type",padding=2)
-  padtype=StringVar(value="STD")
-  Radiobutton(padtyp_lb,text="Through Hole",variable=padtype,value="STD")\
-          .grid(column=0,row=0,sticky=N+W+S)
-  Radiobutton(padtyp_lb,text="SMD",variable=padtype,value="SMD")\
-          .grid(column=1,row=0,sticky=N+W+S)  
-  padtyp_lb.grid(column=0,row=14,columnspan=3,padx=2,pady=2,sticky=N+W+E)
-  
-  Label(fr,text="Description:")\
-          .grid(column=0,row=15,padx=2,pady=2,sticky=N+E)
-  description=StringVar(value="Description")
-  Entry(fr,textvar=description,width=40)\
-          .grid(column=1,row=15,columnspan=2,padx=2,pady=2,sticky=N+W+E)
-  
-  Label(fr,text="Keywords:")\
-          .grid(column=0,row=16,padx=2,pady=2,sticky=N+E)
-  keywords=StringVar(value="Key1 Key_2")
-  Entry(fr,textvar=keywords,width=20)\
-          .grid(column=1,row=16,columnspan=2,padx=2,pady=2,sticky=N+W+E)  
-############################################################################
-def Draw_ConvertPane(fr):
-  """To Generate the Content for the Converter Frame"""
-  Label(fr,text="mm to Mil Converter",justify="center")\
-          .grid(column=0,row=0,columnspan=3,padx=2,pady=2,sticky=N+E+W)
-  Label(fr,text="mm")\
-          .grid(column=0,row=2,padx=2,pady=2,sticky=N+E)
-  mm=StringVar(value="0")
-  Entry(fr,textvar=mm,width=10)\
-          .grid(column=1,row=2,padx=2,pady=2,sticky=N+W+E)
-  Label(fr,text="Mils")\
-          .grid(column=0,row=3,padx=2,pady=2,sticky=N+E)
-  mil=StringVar(value="0")
-  Entry(fr,textvar=mil,width=10,state="readonly")\
-          .grid(column=1,row=3,padx=2,pady=2,sticky=N+W+E)
-  def handler(mm,mil):
+    sweep = len(ExpandSweep(params))>1
+  except ModGenError as e:
+    log.error(" Error In %s"%e)
+    exit(-1)
+  if len(specs) or len(libfiles) or sweep or\
+     LibFormat(output) == "kicad_mod":
+    #Generate a Library of Modules
+    if output == "-":
+      print(" Error: A Library needs the -o <lib.emp> library file")
+      Help_modgen()
+      exit(-1)
+    if len(libfiles) and LibFormat(output) == "kicad_mod" or\
+       [i for i in libfiles if not i.endswith(".emp")]:
+      print(" Error: Only .emp libraries can be merged into a .emp")
+      exit(-1)
+    tasks = []
+    parts = []
     try:
-      m = float(mm.get())*(1000/25.4)
-      mil.set("%f"%m)
-    except:
-      mm.set("0")
-      
-  Button(fr,text="Convert",command=lambda:handler(mm,mil))\
-          .grid(column=3,row=2,padx=2,pady=2,sticky=N+W+E+S)
-
-  Label(fr,text="Mil to mm Converter",justify="center")\
-          .grid(column=0,row=4,columnspan=3,padx=2,pady=2,sticky=N+E+W)
-  Label(fr,text="Mils")\
-          .grid(column=0,row=6,padx=2,pady=2,sticky=N+E)
-  mil1=StringVar(value="0")
-  Entry(fr,textvar=mil1,width=10)\
-          .grid(column=1,row=6,padx=2,pady=2,sticky=N+W+E)
-  Label(fr,text="mm")\
-          .grid(column=0,row=7,padx=2,pady=2,sticky=N+E)
-  mm1=StringVar(value="0")
-  Entry(fr,textvar=mm1,width=10,state="readonly")\
-          .grid(column=1,row=7,padx=2,pady=2,sticky=N+W+E)
-  def handler1(mm,mil):
+      for spec in specs:
+        tasks.extend(SpecTasks(spec,parts))
+      if len(params):
+        tasks.extend(SweepTasks(params,units))
+    except ModGenError as e:
+      log.error(" Error In %s"%e)
+      exit(-1)
+    failed = BuildLib(tasks,opts["-o"],int(opts.get("-j","1")),libfiles,\
+                      clearance,parts,opts.get("-l"))
+    exit(-1 if len(failed) else 0)
+  if len(args)!=0:
+    #Generate without the GUI
     try:
-      m = float(mil.get())*(25.4/1000)
-      mm.set("%f"%m)
-    except:
-      mil.set("0")
-      
-  Button(fr,text="Convert",command=lambda:handler1(mm1,mil1))\
-          .grid(column=3,row=6,padx=2,pady=2,sticky=N+W+E+S)
-############################################################################
-def Draw_PicturePane(fr):
-  """To Generate the Content for the Picture Frame"""
-  global canvas
-  canvas = Canvas(fr,width=200,height=200,background="white")
-  canvas.pack(fill=BOTH)
-############################################################################
-def Draw_CommandPane(fr):
-  """To Generate the Content for the Command & Buttons Frame"""
-  status = StringVar(value="""Designed by: A.D.H.A.R Labs Research,Bharat(India)
-Abhijit Bose( info@adharlabs.in )
-http://m8051.blogspot.com
-License:CC BY-NC-SA 3.0""")
-  Label(fr,text="",textvariable=status)\
-        .grid(column=0,row=0,rowspan=2,padx=40,pady=2,sticky=N+E+W+S)
-
-  Button(fr,text="Auto Generate Names",command=autoname )\
-          .grid(column=1,row=0,padx=20,pady=2)
-
-  gentogether = BooleanVar()
-  ck = Checkbutton(fr,text="Generate Module & Lib",variable=gentogether,\
-                   onvalue=True)
-  ck.grid(column=1,row=1,padx=2,pady=2,sticky=N+W+S)
-  gentogether.set(True)
-  
-  Button(fr,text="Generate Lib",width=10,command=packed)\
-                        .grid(column=2,row=0,padx=2,pady=2)
-  
-  Button(fr,text=" Exit Prog ",width=10,command=lambda:root.destroy())\
-                        .grid(column=2,row=1,padx=2,pady=2)
-
-  
-############################################################################
-# Main FUNCTION>
-############################################################################
-if __name__ == "__main__" :
-  #{
-  global meta       
-         
-  meta = {}
-  print(__doc__)
-  ## Create Main Window
-  root = Tk()
-  root.title("Kicad Module Generator v"+__version__+\
-             " by A.D.H.A.R Labs Research,Bharat(India) ")  
-  root.bind("<Escape>",lambda e:root.destroy())
-  root["padx"]=10
-  root["pady"]=10
-  #  { MAIN CONTENT BEGIN
-  content = Frame(root,width=300,height=200,borderwidth=2,relief="groove")
-  #    { DATAFRAME 1 BEGIN
-  note = tkinter.ttk.Notebook(content,padding=2)
-  data_frm1 = Frame(note,width=200,height=200,borderwidth=3,\
-                    relief="ridge",padx=2,pady=2)
-  Draw_MainPane(data_frm1)
-  #data_frm1.grid(column=0,row=0,rowspan=2,padx=5,pady=5)
-  note.add(data_frm1,text="Module Generator",padding=5)
-  note.grid(column=0,row=0,rowspan=2,padx=5,pady=5)
-  #    } DATA FRAME 1 END
-  #    { DATA FRAME 2 BEGIN
-  data_frm2 = Frame(content,width=200,height=200,borderwidth=3,\
-                    relief="ridge",padx=2,pady=2)
-  Draw_PicturePane(data_frm2)
-  data_frm2.grid(column=1,row=0,padx=5,pady=5,sticky=N+W+E+S)
-  #    } DATA FRAME 2 END
-  #    { DATA FRAME 3 BEGIN
-  data_frm3 = Frame(content,width=200,height=200,borderwidth=3,\
-                    relief="ridge",padx=2,pady=2)
-  Draw_ConvertPane(data_frm3)  
-  data_frm3.grid(column=1,row=1,padx=5,pady=5,sticky=N+W+E+S)
-  #    } DATA FRAME 3 END
-  #    { DATA FRAME 4 BEGIN
-  data_frm4 = Frame(content,padx=2,pady=2)
-  Draw_CommandPane(data_frm4)
-  data_frm4.grid(column=0,row=2,columnspan=2,padx=5,pady=5,sticky=N+W+E+S)
-  #    } DATA FRAME 4 END
-  content.grid(column=0,row=0,sticky=N+S+E+W)
-  # Update all Data
-  package_cmb_update(None)
-  #  }
-  ## Main Loop Start
-  root.mainloop()
+      meta = ModuleMeta(params,units)
+      CheckMeta(meta)
+      if output.endswith(".kicad_mod"):
+        text = FormatModule(meta,None,"kicad_mod")
+      else:
+        text = MakeModule(meta)
+      CheckPads(meta,clearance)
+    except ModGenError as e:
+      log.error(" Error In %s"%e)
+      exit(-1)
+    log.debug(text)
+    name = opts.get("-o",ModuleFileName(meta))
+    if name == "-":
+      sys.stdout.write(text)
+    else:
+      ReplaceFile(name,lambda f: f.write(text))
+      log.info(" Module "+name+" written successfully")
+    exit(0)
+  log.debug(__doc__)
+  # The GUI is only loaded when it is launched
+  import modgengui
+  modgengui.main()
   #}
 ############################################################################
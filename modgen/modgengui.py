@@ -0,0 +1,865 @@
+#!/usr/bin/python
+############################################################################
+############################################################################
+"""
+##  modgengui - Tkinter GUI of the Module Generator Program for Kicad PCBnew
+##
+##  Designed by
+##         A.D.H.A.R Labs Research,Bharat(India)
+##            Abhijit Bose( info@adharlabs.in )
+##                http://ahdarlabs.in
+##
+## License:
+## Creative Commons Attribution-NonCommercial-ShareAlike 3.0 Unported
+## CC BY-NC-SA 3.0 http://creativecommons.org/licenses/by-nc-sa/3.0/
+## http://creativecommons.org/licenses/by-nc-sa/3.0/legalcode
+"""
+##
+## The generation itself is in modgen.py which does not need tkinter,
+## this module is only imported when the GUI is launched.
+##
+############################################################################
+############################################################################
+#IMPORTS>
+############################################################################
+import re,sys,logging,tkinter.ttk,tkinter.messagebox
+from tkinter import *
+from modgen import __version__,_debug_message,log,mmtomil,miltomm,package_defaults,\
+     ModuleMeta,ModParams,MakeModule,ModuleFileName,AutoName,\
+     PadClearance,ClearanceText
+############################################################################
+#GUI STATE> Parameters of the Module being edited
+############################################################################
+meta = {}
+############################################################################
+#GUI FUNCTIONS>
+############################################################################
+def Validate():
+  """To Validate the GUI Inputs"""
+  global er
+  er = 1
+  # Check Pitch
+  try:
+    k = float(pitch.get())*1.0
+    er = "ok"
+    if (k<=0 or k>=400) and units.get()=="mils":
+      tkinter.messagebox.showerror("Error","Invalid Pitch Value")        
+      er = "pitch"
+      pitch.set("100")
+      return 1
+    elif (k<=0 or k>=10) and units.get()=="mm":
+      tkinter.messagebox.showerror("Error","Invalid Pitch Value")        
+      er = "pitch"
+      pitch.set("2.54")
+      return 1
+  except:    
+    tkinter.messagebox.showerror("Error","Invalid Pitch Value")        
+    er = "pitch"
+    if units.get()=="mm":
+      pitch.set("2.54")
+    else:
+      pitch.set("100")
+    return 1
+  # Check Padx
+  try:
+    k = float(padx.get())*1.0
+    er = "ok"
+    if (k<=0):
+      tkinter.messagebox.showerror("Error","Invalid Pad X Value")        
+      er = "padx"
+      if units.get()=="mils":
+        padx.set("70")
+      else:
+        padx.set("1.778")
+      return 1
+  except:    
+    tkinter.messagebox.showerror("Error","Invalid Pad X Value")        
+    er = "padx"
+    if units.get()=="mils":
+      padx.set("70")
+    else:
+      padx.set("1.778")
+    return 1
+  # Check Pady
+  try:
+    k = float(pady.get())*1.0
+    er = "ok"
+    if(k<=0):
+      tkinter.messagebox.showerror("Error","Invalid Pad Y Value")        
+      er = "pady"
+      if units.get()=="mils":
+        pady.set("70")
+      else:
+        pady.set("1.778")
+      return 1
+  except:    
+    tkinter.messagebox.showerror("Error","Invalid Pad Y Value")        
+    er = "pady"
+    if units.get()=="mils":
+      pady.set("70")
+    else:
+      pady.set("1.778")
+    return 1
+  # Check Pad Drill
+  try:
+    k = float(paddrill.get())*1.0
+    er = "ok"
+    if(k<=10 or k>250) and padtype.get()=='STD'and units.get()=="mils":
+      tkinter.messagebox.showerror("Error","Invalid Pad Drill Value")        
+      er = "paddrill"
+      paddrill.set("35")
+      return 1
+    elif(k<=0.254 or k>6.1) and padtype.get()=='STD'and units.get()=="mm":
+      tkinter.messagebox.showerror("Error","Invalid Pad Drill Value")        
+      er = "paddrill"
+      paddrill.set(".889")
+      return 1
+    #elif padtype.get()=='SMD':#Allow Even Drils if needed
+    #  paddrill.set("0")
+  except:    
+    tkinter.messagebox.showerror("Error","Invalid Pad Drill Value")        
+    er = "paddrill"
+    if units.get() == "mils":
+      paddrill.set("35")
+    else:
+      paddrill.set(".889")
+    return 1
+  # Check Pin N
+  try:
+    k = int(PIN_N.get())*1
+    er = "ok"
+    if(k<=1):
+      tkinter.messagebox.showerror("Error","Invalid Number of Pins")        
+      er = "PIN_N"
+      PIN_N.set("8")
+      return 1
+    if (k%2)!=0 and (package.get() in ['DIP','CONN-Dual']):
+      tkinter.messagebox.showerror("Error","Invalid Number of Pins")        
+      er = "PIN_N"
+      PIN_N.set("8")
+      return 1
+  except:    
+    tkinter.messagebox.showerror("Error","Invalid Number of Pins")        
+    er = "PIN_N"
+    PIN_N.set("8")
+    return 1
+  # Check Row X
+  try:
+    k = float(rowx.get())*1
+    er = "ok"
+    if (k<=0) and (package.get() in ['DIP','CONN-Dual']):
+      tkinter.messagebox.showerror("Error","Invalid Row X Spacing")        
+      er = "RowX"
+      if units.get() == "mils":
+        rowx.set("10")
+      else:
+        rowx.set("0.254")
+      return 1
+  except:    
+    tkinter.messagebox.showerror("Error","Invalid Row X Spacing")        
+    er = "RowX"
+    return 1
+  # Check Row Y
+  try:
+    k = float(rowy.get())*1
+    er = "ok"
+    if (k<=0) and (package.get() in ['QUAD']):
+      tkinter.messagebox.showerror("Error","Invalid Row Y Spacing")        
+      er = "RowY"
+      if units.get() == "mils":
+        rowy.set("10")
+      else:
+        rowy.set("0.254")
+      return 1
+  except:    
+    tkinter.messagebox.showerror("Error","Invalid Row Y Spacing")        
+    er = "RowY"
+    return 1
+  # Check PIN_N_HORIZ
+  try:
+    k = int(PIN_N_HORIZ.get())*1
+    er = "ok"
+    if (k<=0) and (package.get() in ['QUAD']):
+      tkinter.messagebox.showerror("Error","Invalid Number of Pins Horizontally")        
+      er = "PIN_N_HORIZ"
+      PIN_N_HORIZ.set("%d"%(int(PIN_N.get())/4))
+      return 1
+  except:    
+    tkinter.messagebox.showerror("Error","Invalid Number of Pins Horizontally")        
+    er = "PIN_N_HORIZ"
+    return 1
+  #Check The Description
+  if(len(description.get())==0):
+    description.set(modname.get())
+  #Check The Keywords
+  if(len(keywords.get())==0):
+    keywords.set(modname.get())  
+  #Check the Oblong Selection PadY>Padx
+  if(float(padx.get())==float(pady.get())) and padshape.get()=='O':
+    tkinter.messagebox.showerror("Error","Incorrect Pad Dimensions for Oblong pads")
+    er = "Oblong Pad Shape"
+    return 1
+  #Check the Circle Selection PadY=Padx
+  if(float(padx.get())!=float(pady.get())) and padshape.get()=='C':
+    tkinter.messagebox.showerror("Error",\
+      "Incorrect Pad Dimensions for Circular pads")
+    er = "Circular Pad Shape"
+    return 1
+  #At the End Return
+  return 1
+############################################################################
+def autouintadjust():
+  ''' Automatically adjust the units as per selection '''
+  try:
+    if units.get() == "mm":#Preivious was Mils    
+      pitch.set(miltomm(pitch.get()))
+      padx.set(miltomm(padx.get()))
+      pady.set(miltomm(pady.get()))
+      paddrill.set(miltomm(paddrill.get()))
+      rowx.set(miltomm(rowx.get()))
+      rowy.set(miltomm(rowy.get()))
+    if units.get() == "mils":#Preivious was mm
+      pitch.set(mmtomil(pitch.get()))
+      padx.set(mmtomil(padx.get()))
+      pady.set(mmtomil(pady.get()))
+      paddrill.set(mmtomil(paddrill.get()))
+      rowx.set(mmtomil(rowx.get()))
+      rowy.set(mmtomil(rowy.get()))
+  except:
+    log.error('Error in Unit Conversion')
+    tkinter.messagebox.showerror("Error","Error in Unit Conversion")
+############################################################################
+def packed():
+  """To Pack the GUI inputs to the XML form"""
+  #Convert to Mils as all processing is in mils
+  if units.get() == "mm":
+    units.set("mils")
+    autouintadjust()
+  #Run Validation Check
+  Validate()  
+  if er != "ok":    
+    log.error("Error In " + er)
+    return 0
+  log.debug("Module Name: " + modname.get())
+  meta["modname"] = modname.get()
+  log.debug("Reference Designator: " + refdes.get())
+  meta["refname"] = refdes.get()
+  log.debug("Package: " + package.get())
+  meta["package"] = package.get()
+  log.debug("Pitch: " + pitch.get())
+  meta["pitch"] = pitch.get()
+  log.debug("Pad x Dimension: " + padx.get())
+  meta["padx"] = padx.get()
+  log.debug("Pad y Dimension: " + pady.get())
+  meta["pady"] = pady.get()
+  log.debug("Pad Drill Diameter: " + paddrill.get())
+  meta["paddrill"] = paddrill.get()
+  log.debug("Pad Shape: "+ padshape.get())
+  meta["padshape"] = padshape.get()
+  log.debug("First Pad Square: " + ("True" if firstpinsquare.get() else "False"))
+  meta["firstpadsquare"] = 1 if firstpinsquare.get() else None
+  log.debug("Self Locking Pattern: " + ("True" if locking.get() else "False"))
+  meta["locking"] = "5" if locking.get() else None
+  log.debug("Pad Type: " + padtype.get())
+  meta["padtype"] = padtype.get()
+  log.debug("Number of Pins: " + PIN_N.get())
+  meta["PIN_N"] = PIN_N.get()
+  log.debug("Description for Module: " + description.get())
+  meta["description"] = description.get()
+  log.debug("Keywords for Module: " + keywords.get())
+  meta["keywords"] = keywords.get()
+  if meta["package"] in ['DIP','CONN-Dual','QUAD']:
+    log.debug("Pin Row Spacing X:" + rowx.get())
+    meta["rowx"] = rowx.get()
+  if meta["package"] =='QUAD':
+    log.debug("Pin Row Spacing Y:" + rowy.get())
+    meta["rowy"] = rowy.get()
+    log.debug("Number of Pins Horizontally: " + PIN_N_HORIZ.get())
+    meta["PIN_N_HORIZ"] = PIN_N_HORIZ.get()
+  meta.update(ModuleMeta(meta))
+  if meta["PIN_N_HORIZ"] != None:
+    log.debug("Number of Pins Vertically: %d"%ModParams(meta).nv)
+  #Generate the Pad description
+  text = MakeModule(meta)
+  log.debug(text)
+  #Warn about Overlapping Pads
+  found = PadClearance(meta["padlist"])
+  if found:
+    log.warning(" Warning In %s: %s"%(meta["modname"],ClearanceText(found)))
+    tkinter.messagebox.showwarning("Module Generator",ClearanceText(found))
+  name = ModuleFileName(meta)
+  ans = tkinter.messagebox.askokcancel("File Wite",\
+        "Do you want to wite "+name+" for the Module?")
+  if(ans):
+    fl = open(name,"w")
+    fl.write(text)
+    fl.close()
+    tkinter.messagebox.showinfo("Module Generator",\
+      "Module "+meta["modname"]+" Written Successfully!!")
+    log.info(" Module "+name+" written successfully")
+  return 1
+############################################################################
+def draw():
+  '''Draw Pictures depending on Package and configuration'''
+  canvas.delete("all")
+  if package.get() == 'SIP':
+    canvas.create_rectangle(40,40,160,80,width=3)
+    #First Pad
+    x = 55
+    y = 55
+    if locking.get() == False:
+      xy = x,y,x+10,y+10
+      if firstpinsquare.get():
+        canvas.create_rectangle(xy,width=5)
+      else:
+        canvas.create_oval(xy,width=5)
+      canvas.create_text(x+5,30,text="1",fill="red")
+      #Further pads
+      for i in range(0,4):
+        x = x + 20
+        xy = x,y,x+10,y+10
+        canvas.create_oval(xy,width=5)
+        canvas.create_text(x+5,30,text="%d"%(i+2),fill="red")
+      #Pitch
+      canvas.create_line(60,60,60,100,width=2,fill='red')
+      canvas.create_line(80,60,80,100,width=2,fill='red')
+      canvas.create_line(40,90,60,90,width=2,arrow=LAST,fill='blue')
+      canvas.create_line(80,90,100,90,width=2,arrow=FIRST,fill='blue')
+      canvas.create_text(70,110,text="Pitch",font=("Arial",10,"bold"),\
+                         fill="blue")
+    else: #LOcked SIP type
+      l=1
+      for i in range(0,5):
+        l = 1 if l==0 else 0
+        if l == 0:
+          xy = x,y+5,x+10,y+15
+        else:
+          xy = x,y-5,x+10,y+5
+        x = x + 20
+        if i==0 and firstpinsquare.get():
+          canvas.create_rectangle(xy,width=5)
+        else:
+          canvas.create_oval(xy,width=5)
+        canvas.create_text(x-15,30,text="%d"%(i+1),fill="red")
+      #Pitch
+      canvas.create_line(60,65,60,100,width=2,fill='red')
+      canvas.create_line(80,55,80,100,width=2,fill='red')
+      canvas.create_line(40,90,60,90,width=2,arrow=LAST,fill='blue')
+      canvas.create_line(80,90,100,90,width=2,arrow=FIRST,fill='blue')
+      canvas.create_text(70,110,text="Pitch",font=("Arial",10,"bold"),\
+                         fill="blue")
+      #Lock
+      canvas.create_line(20,65,60,65,width=2,fill='red')
+      canvas.create_line(20,55,80,55,width=2,fill='red')
+      canvas.create_line(30,35,30,55,width=2,arrow=LAST,fill='blue')
+      canvas.create_line(30,90,30,65,width=2,arrow=LAST,fill='blue')
+      canvas.create_text(30,30,text="Lock",font=("Arial",10,"bold"),\
+                         fill="blue")
+  elif package.get() == 'DIP':
+    canvas.create_rectangle(60,30,160,100,width=3)
+    xy = 40,40,50,50
+    canvas.create_oval(xy,width=3)
+    xy = 100,20,120,40
+    canvas.create_arc(xy,start=180,extent=180,width=3)
+    #First Set
+    x = 70
+    y = 40
+    for i in range(0,3):
+      xy = x,y,x+30,y+10
+      y = y + 20
+      canvas.create_oval(xy,width=5)
+      canvas.create_text(x-50,y-20,text="%d"%(i+1),fill="red")
+    #Second Set
+    x = 120
+    y = 40
+    for i in range(0,3):
+      xy = x,y,x+30,y+10
+      y = y + 20
+      canvas.create_oval(xy,width=5)
+      canvas.create_text(x+50,y-20,text="%d"%(6-i),fill="red")
+    #Pitch
+    canvas.create_line(30,65,90,65,width=2,fill='red')
+    canvas.create_line(30,85,90,85,width=2,fill='red')
+    canvas.create_line(30,50,30,65,width=2,arrow=LAST,fill='blue')
+    canvas.create_line(30,85,30,100,width=2,arrow=FIRST,fill='blue')
+    canvas.create_text(40,75,text="Pitch",font=("Arial",10,"bold"),\
+                       fill="blue")
+    #Row X
+    canvas.create_line(85,20,85,45,width=2,fill='red')
+    canvas.create_line(135,20,135,45,width=2,fill='red')
+    canvas.create_line(85,20,135,20,width=2,arrow=BOTH,fill='blue')
+    canvas.create_text(110,10,text="Row Spacing X",font=("Arial",10,"bold"),\
+                       fill="blue")
+
+  elif package.get() == 'CONN-Dual':
+    canvas.create_rectangle(60,30,110,100,width=3)
+    xy = 40,40,50,50
+    canvas.create_oval(xy,width=3)
+    #First Set
+    x = 70
+    y = 40
+    k = 1
+    for i in range(0,3):
+      xy = x,y,x+10,y+10
+      y = y + 20
+      if i==0 and firstpinsquare.get():
+        canvas.create_rectangle(xy,width=5)
+      else:
+        canvas.create_oval(xy,width=5)
+      canvas.create_text(x-50,y-20,text="%d"%(k),fill="red")
+      k = k + 2
+    #Second Set
+    x = 90
+    y = 40
+    k = 2
+    for i in range(0,3):
+      xy = x,y,x+10,y+10
+      y = y + 20
+      canvas.create_oval(xy,width=5)
+      canvas.create_text(x+30,y-20,text="%d"%(k),fill="red")
+      k = k + 2
+    #Pitch
+    canvas.create_line(30,65,75,65,width=2,fill='red')
+    canvas.create_line(30,85,75,85,width=2,fill='red')
+    canvas.create_line(30,50,30,65,width=2,arrow=LAST,fill='blue')
+    canvas.create_line(30,85,30,100,width=2,arrow=FIRST,fill='blue')
+    canvas.create_text(40,75,text="Pitch",font=("Arial",10,"bold"),\
+                       fill="blue")
+    #Row X
+    canvas.create_line(75,20,75,45,width=2,fill='red')
+    canvas.create_line(95,20,95,45,width=2,fill='red')
+    canvas.create_line(40,20,75,20,width=2,arrow=LAST,fill='blue')
+    canvas.create_line(95,20,130,20,width=2,arrow=FIRST,fill='blue')
+    canvas.create_text(85,10,text="Row Spacing X",font=("Arial",10,"bold"),\
+                       fill="blue")
+  elif package.get() == 'QUAD':
+    x = 50
+    y = 40
+    dx = 120
+    dy = 120
+    canvas.create_polygon(\
+      x,y+20,x+20,y,x+dx,y,x+dx,y+dy,x,y+dy,fill="white",width=2,outline="black")
+    xy = x-20,y+40,x-10,y+30
+    canvas.create_oval(xy,width=2)
+    #Left
+    ox = x + 10
+    oy = y + 35
+    for i in range(1,5):
+      xy = ox,oy,ox+20,oy+5
+      canvas.create_rectangle(xy,fill="black")
+      canvas.create_text(ox-50,oy+5,text="%d"%(i),fill="red")
+      oy = oy + 15
+    #Bottom
+    ox = x + 35
+    oy = y + + dy - 10
+    for i in range(5,9):
+      xy = ox,oy,ox+5,oy-20
+      canvas.create_rectangle(xy,fill="black")
+      canvas.create_text(ox+5,oy+15,text="%d"%(i),fill="red")
+      ox = ox + 15
+    #Right
+    ox = x + dx - 10
+    oy = y + dy - 35
+    for i in range(9,13):
+      xy = ox,oy,ox-20,oy-5
+      canvas.create_rectangle(xy,fill="black")
+      canvas.create_text(ox+30,oy-5,text="%d"%(i),fill="red")
+      oy = oy - 15
+    #Top
+    ox = x + dx - 35
+    oy = y + 30
+    for i in range(13,17):
+      xy = ox,oy,ox-5,oy-20
+      canvas.create_rectangle(xy,fill="black")
+      canvas.create_text(ox-5,oy-50,text="%d"%(i),fill="red")
+      ox = ox - 15
+    #Pitch
+    canvas.create_line(x+20,y+52,x+50,y+52,fill='red')
+    canvas.create_line(x+20,y+68,x+50,y+68,fill='red')
+    canvas.create_line(x+50,y+40,x+50,y+52,arrow=LAST,fill='blue')
+    canvas.create_line(x+50,y+68,x+50,y+80,arrow=FIRST,fill='blue')
+    canvas.create_text(x+60,y+62,text="Pitch",fill="blue")
+    #Row X
+    canvas.create_line(x+20,y+dy-36,x+20,y+dy+30,fill='red')
+    canvas.create_line(x+dx-20,y+dy-36,x+dx-20,y+dy+30,fill='red')
+    canvas.create_line(x+20,y+dy+30,x+dx-20,y+dy+30,arrow=BOTH,fill='blue')
+    canvas.create_text(x+60,y+dy+20,text="Row Spacing X",fill="blue")
+    #Row Y
+    canvas.create_line(x-30,y+20,x+35,y+20,fill='red')
+    canvas.create_line(x-30,y+dy-20,x+35,y+dy-20,fill='red')
+    canvas.create_line(x-25,y+20,x-25,y+dy-20,arrow=BOTH,fill='blue')
+    canvas.create_text(x-25,y+dy-10,text="Row",fill="blue")
+    canvas.create_text(x-25,y+dy,text="Spacing",fill="blue")
+    canvas.create_text(x-25,y+dy+10,text="Y",fill="blue")
+    #Pin Horiz
+    ox = x - 35
+    oy = y + 25
+    canvas.create_line(ox,oy,ox-20,oy,fill='red')
+    canvas.create_line(ox,oy,ox,oy+70,fill='red')
+    canvas.create_line(ox,oy+70,ox-20,oy+70,fill='red')
+    canvas.create_line(ox+10,oy-35,ox,oy,arrow=LAST,fill='blue')
+    canvas.create_text(ox+20,oy-55,text="No. of Pins",fill="blue")
+    canvas.create_text(ox+20,oy-45,text="Horizontally",fill="blue")
+    
+  #Pad Generic
+  if package.get() in ['SIP','DIP','CONN-Dual']:     
+    xy = 100+6,140+6,140-6,180-6
+    canvas.create_oval(xy,width=12)
+    canvas.create_line(60,140,120,140,width=2,fill='red')
+    canvas.create_line(60,180,120,180,width=2,fill='red')
+    canvas.create_line(80,140,80,180,width=2,arrow=BOTH,fill='blue')
+    canvas.create_text(50,160,text="Pad Y",font=("Arial",10,"bold"),\
+                       fill="blue")
+    canvas.create_line(100,120,100,160,width=2,fill='red')
+    canvas.create_line(140,120,140,160,width=2,fill='red')
+    canvas.create_line(100,130,140,130,width=2,arrow=BOTH,fill='blue')
+    canvas.create_text(120,115,text="Pad X",font=("Arial",10,"bold"),\
+                       fill="blue")
+    canvas.create_line(110,150,130,170,width=2,arrow=BOTH,fill='red')
+    canvas.create_line(130,170,150,190,width=2,fill='red')
+    canvas.create_line(150,190,190,190,width=2,fill='red')
+    canvas.create_text(170,175,text="Drill Dia",font=("Arial",10,"bold"),\
+                       fill="blue")
+  canvas.update()
+############################################################################  
+def package_cmb_update(event):
+  """To Update Options when the Screen is Activated"""
+  units.set("mils")
+  description.set("")
+  keywords.set("")
+  if package.get() == 'SIP':
+     rowx_di()
+     rowy_di()
+     PIN_N_HORIZ_di()
+  elif package.get() in ['DIP','CONN-Dual']:
+     rowx_en()
+     rowy_di()
+     PIN_N_HORIZ_di()
+  elif package.get() == 'QUAD':
+     rowx_en()
+     rowy_en()
+     PIN_N_HORIZ_en()
+  d = package_defaults[package.get()]
+  modname.set(d["modname"])
+  refdes.set(d["refname"])
+  PIN_N.set(d["PIN_N"])
+  pitch.set(d["pitch"])
+  padx.set(d["padx"])
+  pady.set(d["pady"])
+  paddrill.set(d["paddrill"])
+  if "rowx" in d:
+     rowx.set(value=d["rowx"])
+  if "rowy" in d:
+     rowy.set(value=d["rowy"])
+  if "PIN_N_HORIZ" in d:
+     PIN_N_HORIZ.set(d["PIN_N_HORIZ"])
+  padshape.set(d["padshape"])
+  firstpinsquare.set(d["firstpadsquare"]==1)
+  locking.set(d["locking"]!=None)
+  padtype.set(d["padtype"])
+  if package.get() == 'QUAD':
+     #Default Settings only For test
+     if _debug_message==1:
+       modname.set('quad')
+       PIN_N.set('32')
+       rowx.set(value="600")
+       rowy.set(value="600")
+       padx.set('150')
+       pady.set('20')
+       pitch.set('50')
+       PIN_N_HORIZ.set('4')
+  draw()
+############################################################################  
+def autoname():
+  """ To Automatically Generate the Name,Description,RefDes,
+      and Keywords for the Component
+  """
+  if len(modname.get())!=0:
+      Validate()
+      if er != "ok":    
+         log.error("Error In " + er)
+         return
+      d = AutoName({"modname":modname.get(),"package":package.get(),\
+                    "PIN_N":PIN_N.get(),"pitch":pitch.get(),\
+                    "padx":padx.get(),"pady":pady.get(),\
+                    "paddrill":paddrill.get(),"rowx":rowx.get(),\
+                    "padshape":padshape.get(),"padtype":padtype.get(),\
+                    "locking":locking.get()},units.get())
+      if d:
+        refdes.set(d["refname"])#Set the Ref
+        description.set(d["description"])
+        keywords.set(d["keywords"])
+        modname.set(d["modname"])
+############################################################################
+def Draw_MainPane(fr):
+  """To Generate the Content for the Main Input Frame"""
+  global modname,refdes,package,pitch,padx,pady,\
+         paddrill,padshape,firstpinsquare,locking,padtype,PIN_N,\
+         description,keywords,rowx,rowx_e,rowx_en,rowx_di,\
+         rowy,rowy_e,rowy_en,rowy_di,units,\
+         PIN_N_HORIZ,PIN_N_HORIZ_e,PIN_N_HORIZ_en,PIN_N_HORIZ_di
+
+  Label(fr,text="Package:")\
+          .grid(column=0,row=0,padx=2,pady=2,sticky=N+E)
+  package=StringVar()
+  pack=tkinter.ttk.Combobox(fr,width=10,state="readonly",\
+          values=['SIP','DIP','CONN-Dual','QUAD'],textvariable=package)
+  pack.current(0)
+  pack.bind("<<ComboboxSelected>>",package_cmb_update)
+  pack.grid(column=1,row=0,columnspan=2,padx=2,pady=2,sticky=N+W+E)
+  
+  Label(fr,text="Module Name:")\
+          .grid(column=0,row=1,padx=2,pady=2,sticky=N+E)
+  modname=StringVar(value="Mod_Name")
+  Entry(fr,textvar=modname,width=20)\
+          .grid(column=1,row=1,columnspan=2,padx=2,pady=2,sticky=N+W+E)
+
+  Label(fr,text="Reference Designator:")\
+          .grid(column=0,row=2,padx=2,pady=2,sticky=N+E)
+  refdes=StringVar(value="Ref_Des")
+  Entry(fr,textvar=refdes,width=20)\
+          .grid(column=1,row=2,columnspan=2,padx=2,pady=2,sticky=N+W+E)
+
+  Label(fr,text="Number of Pins:")\
+          .grid(column=0,row=3,padx=2,pady=2,sticky=N+E)
+  PIN_N=StringVar(value="8")
+  Entry(fr,textvar=PIN_N,width=20)\
+          .grid(column=1,row=3,columnspan=2,padx=2,pady=2,sticky=N+W+E)
+  
+  Label(fr,text="Number of Pins Horizonally:")\
+          .grid(column=0,row=4,padx=2,pady=2,sticky=N+E)
+  PIN_N_HORIZ=StringVar(value="0")
+  PIN_N_HORIZ_e = Entry(fr,textvar=PIN_N_HORIZ,width=20)
+  PIN_N_HORIZ_en = lambda: \
+    PIN_N_HORIZ_e.grid(column=1,row=4,columnspan=2,\
+              padx=2,pady=2,sticky=N+W+E)
+  PIN_N_HORIZ_di = lambda: \
+    PIN_N_HORIZ_e.grid_forget()
+  PIN_N_HORIZ_en()
+  PIN_N_HORIZ_di()
+
+  units_lb = tkinter.ttk.Labelframe(fr,text="Units",padding=2)
+  units =StringVar(value="mils")
+  Radiobutton(units_lb,text="Mils",variable=units,value="mils"\
+              ,command=autouintadjust).grid(column=0,row=0,sticky=N+W+E)
+  Radiobutton(units_lb,text="MM",variable=units,value="mm"\
+              ,command=autouintadjust).grid(column=1,row=0,sticky=N+W+E)
+  units_lb.grid(column=0,row=5,columnspan=3,padx=2,pady=2,sticky=N+W+E)
+  
+  Label(fr,text="Pitch:")\
+          .grid(column=0,row=6,padx=2,pady=2,sticky=N+E)
+  pitch=StringVar(value="100")
+  Entry(fr,textvar=pitch,width=20)\
+          .grid(column=1,row=6,columnspan=2,padx=2,pady=2,sticky=N+W+E)
+  
+  Label(fr,text="Pad Dimension X:")\
+          .grid(column=0,row=7,padx=2,pady=2,sticky=N+E)
+  padx=StringVar(value="70")
+  Entry(fr,textvar=padx,width=20)\
+          .grid(column=1,row=7,columnspan=2,padx=2,pady=2,sticky=N+W+E)
+  
+  Label(fr,text="Pad Dimension Y:")\
+          .grid(column=0,row=8,padx=2,pady=2,sticky=N+E)
+  pady=StringVar(value="70")
+  Entry(fr,textvar=pady,width=20)\
+          .grid(column=1,row=8,columnspan=2,padx=2,pady=2,sticky=N+W+E)
+  
+  Label(fr,text="Pad Drill Diameter:")\
+          .grid(column=0,row=9,padx=2,pady=2,sticky=N+E)
+  paddrill=StringVar(value="35")
+  Entry(fr,textvar=paddrill,width=20)\
+          .grid(column=1,row=9,columnspan=2,padx=2,pady=2,sticky=N+W+E)
+
+  Label(fr,text="Pin Row Spacing X:")\
+          .grid(column=0,row=10,padx=2,pady=2,sticky=N+E)
+  rowx=StringVar(value="0")
+  rowx_e = Entry(fr,textvar=rowx,width=20)
+  rowx_en = lambda: \
+    rowx_e.grid(column=1,row=10,columnspan=2,padx=2,pady=2,sticky=N+W+E)
+  rowx_di = lambda: \
+    rowx_e.grid_forget()
+  rowx_en()
+  rowx_di()
+
+  Label(fr,text="Pin Row Spacing Y:")\
+          .grid(column=0,row=11,padx=2,pady=2,sticky=N+E)
+  rowy=StringVar(value="0")
+  rowy_e = Entry(fr,textvar=rowy,width=20)
+  rowy_en = lambda: \
+    rowy_e.grid(column=1,row=11,columnspan=2,padx=2,pady=2,sticky=N+W+E)
+  rowy_di = lambda: \
+    rowy_e.grid_forget()
+  rowy_en()
+  rowy_di()
+  
+  padshp_lb=tkinter.ttk.Labelframe(fr,text="Pad Shape",padding=2)
+  padshape=StringVar(value="C")
+  Radiobutton(padshp_lb,text="Circle",variable=padshape,value="C")\
+          .grid(column=0,row=0,sticky=N+W+S)
+  Radiobutton(padshp_lb,text="Rectangle/Square",variable=padshape,value="R")\
+          .grid(column=1,row=0,sticky=N+W+S)
+  Radiobutton(padshp_lb,text="Oblong",variable=padshape,value="O")\
+          .grid(column=3,row=0,sticky=N+W+S)
+  padshp_lb.grid(column=0,row=12,columnspan=3,padx=2,pady=2,sticky=N+W+E)
+
+  firstpinsquare = BooleanVar()
+  Checkbutton(fr,text="First Pin Square",variable=firstpinsquare,\
+           onvalue=True,command=draw)\
+           .grid(column=0,row=13,padx=2,pady=2,sticky=N+W+S)
+  
+  locking = BooleanVar()
+  Checkbutton(fr,text="Self Locking Formation",\
+     variable=locking,onvalue=True,command=draw)\
+     .grid(column=1,row=13,padx=2,pady=2,columnspan=2,sticky=N+W+S)
+
+  padtyp_lb=tkinter.ttk.Labelframe(fr,text="Pad Type",padding=2)
+  padtype=StringVar(value="STD")
+  Radiobutton(padtyp_lb,text="Through Hole",variable=padtype,value="STD")\
+          .grid(column=0,row=0,sticky=N+W+S)
+  Radiobutton(padtyp_lb,text="SMD",variable=padtype,value="SMD")\
+          .grid(column=1,row=0,sticky=N+W+S)  
+  padtyp_lb.grid(column=0,row=14,columnspan=3,padx=2,pady=2,sticky=N+W+E)
+  
+  Label(fr,text="Description:")\
+          .grid(column=0,row=15,padx=2,pady=2,sticky=N+E)
+  description=StringVar(value="Description")
+  Entry(fr,textvar=description,width=40)\
+          .grid(column=1,row=15,columnspan=2,padx=2,pady=2,sticky=N+W+E)
+  
+  Label(fr,text="Keywords:")\
+          .grid(column=0,row=16,padx=2,pady=2,sticky=N+E)
+  keywords=StringVar(value="Key1 Key_2")
+  Entry(fr,textvar=keywords,width=20)\
+          .grid(column=1,row=16,columnspan=2,padx=2,pady=2,sticky=N+W+E)  
+############################################################################
+def Draw_ConvertPane(fr):
+  """To Generate the Content for the Converter Frame"""
+  Label(fr,text="mm to Mil Converter",justify="center")\
+          .grid(column=0,row=0,columnspan=3,padx=2,pady=2,sticky=N+E+W)
+  Label(fr,text="mm")\
+          .grid(column=0,row=2,padx=2,pady=2,sticky=N+E)
+  mm=StringVar(value="0")
+  Entry(fr,textvar=mm,width=10)\
+          .grid(column=1,row=2,padx=2,pady=2,sticky=N+W+E)
+  Label(fr,text="Mils")\
+          .grid(column=0,row=3,padx=2,pady=2,sticky=N+E)
+  mil=StringVar(value="0")
+  Entry(fr,textvar=mil,width=10,state="readonly")\
+          .grid(column=1,row=3,padx=2,pady=2,sticky=N+W+E)
+  def handler(mm,mil):
+    try:
+      m = float(mm.get())*(1000/25.4)
+      mil.set("%f"%m)
+    except:
+      mm.set("0")
+      
+  Button(fr,text="Convert",command=lambda:handler(mm,mil))\
+          .grid(column=3,row=2,padx=2,pady=2,sticky=N+W+E+S)
+
+  Label(fr,text="Mil to mm Converter",justify="center")\
+          .grid(column=0,row=4,columnspan=3,padx=2,pady=2,sticky=N+E+W)
+  Label(fr,text="Mils")\
+          .grid(column=0,row=6,padx=2,pady=2,sticky=N+E)
+  mil1=StringVar(value="0")
+  Entry(fr,textvar=mil1,width=10)\
+          .grid(column=1,row=6,padx=2,pady=2,sticky=N+W+E)
+  Label(fr,text="mm")\
+          .grid(column=0,row=7,padx=2,pady=2,sticky=N+E)
+  mm1=StringVar(value="0")
+  Entry(fr,textvar=mm1,width=10,state="readonly")\
+          .grid(column=1,row=7,padx=2,pady=2,sticky=N+W+E)
+  def handler1(mm,mil):
+    try:
+      m = float(mil.get())*(25.4/1000)
+      mm.set("%f"%m)
+    except:
+      mil.set("0")
+      
+  Button(fr,text="Convert",command=lambda:handler1(mm1,mil1))\
+          .grid(column=3,row=6,padx=2,pady=2,sticky=N+W+E+S)
+############################################################################
+def Draw_PicturePane(fr):
+  """To Generate the Content for the Picture Frame"""
+  global canvas
+  canvas = Canvas(fr,width=200,height=200,background="white")
+  canvas.pack(fill=BOTH)
+############################################################################
+def Draw_CommandPane(fr):
+  """To Generate the Content for the Command & Buttons Frame"""
+  status = StringVar(value="""Designed by: A.D.H.A.R Labs Research,Bharat(India)
+Abhijit Bose( info@adharlabs.in )
+http://m8051.blogspot.com
+License:CC BY-NC-SA 3.0""")
+  Label(fr,text="",textvariable=status)\
+        .grid(column=0,row=0,rowspan=2,padx=40,pady=2,sticky=N+E+W+S)
+
+  Button(fr,text="Auto Generate Names",command=autoname )\
+          .grid(column=1,row=0,padx=20,pady=2)
+
+  gentogether = BooleanVar()
+  ck = Checkbutton(fr,text="Generate Module & Lib",variable=gentogether,\
+                   onvalue=True)
+  ck.grid(column=1,row=1,padx=2,pady=2,sticky=N+W+S)
+  gentogether.set(True)
+  
+  Button(fr,text="Generate Lib",width=10,command=packed)\
+                        .grid(column=2,row=0,padx=2,pady=2)
+  
+  Button(fr,text=" Exit Prog ",width=10,command=lambda:fr.winfo_toplevel().destroy())\
+                        .grid(column=2,row=1,padx=2,pady=2)
+
+  
+############################################################################
+# Main FUNCTION>
+############################################################################
+############################################################################
+def main():
+  """Create the Main Window and run the GUI"""
+  ## Create Main Window
+  root = Tk()
+  root.title("Kicad Module Generator v"+__version__+\
+             " by A.D.H.A.R Labs Research,Bharat(India) ")  
+  root.bind("<Escape>",lambda e:root.destroy())
+  root["padx"]=10
+  root["pady"]=10
+  #  { MAIN CONTENT BEGIN
+  content = Frame(root,width=300,height=200,borderwidth=2,relief="groove")
+  #    { DATAFRAME 1 BEGIN
+  note = tkinter.ttk.Notebook(content,padding=2)
+  data_frm1 = Frame(note,width=200,height=200,borderwidth=3,\
+                    relief="ridge",padx=2,pady=2)
+  Draw_MainPane(data_frm1)
+  #data_frm1.grid(column=0,row=0,rowspan=2,padx=5,pady=5)
+  note.add(data_frm1,text="Module Generator",padding=5)
+  note.grid(column=0,row=0,rowspan=2,padx=5,pady=5)
+  #    } DATA FRAME 1 END
+  #    { DATA FRAME 2 BEGIN
+  data_frm2 = Frame(content,width=200,height=200,borderwidth=3,\
+                    relief="ridge",padx=2,pady=2)
+  Draw_PicturePane(data_frm2)
+  data_frm2.grid(column=1,row=0,padx=5,pady=5,sticky=N+W+E+S)
+  #    } DATA FRAME 2 END
+  #    { DATA FRAME 3 BEGIN
+  data_frm3 = Frame(content,width=200,height=200,borderwidth=3,\
+                    relief="ridge",padx=2,pady=2)
+  Draw_ConvertPane(data_frm3)  
+  data_frm3.grid(column=1,row=1,padx=5,pady=5,sticky=N+W+E+S)
+  #    } DATA FRAME 3 END
+  #    { DATA FRAME 4 BEGIN
+  data_frm4 = Frame(content,padx=2,pady=2)
+  Draw_CommandPane(data_frm4)
+  data_frm4.grid(column=0,row=2,columnspan=2,padx=5,pady=5,sticky=N+W+E+S)
+  #    } DATA FRAME 4 END
+  content.grid(column=0,row=0,sticky=N+S+E+W)
+  # Update all Data
+  package_cmb_update(None)
+  #  }
+  ## Main Loop Start
+  root.mainloop()
+############################################################################
+if __name__ == "__main__" :
+  #{
+  logging.basicConfig(format="%(message)s",stream=sys.stdout,\
+                      level=logging.DEBUG if "-v" in sys.argv else logging.INFO)
+  main()
+  #}
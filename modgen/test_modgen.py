@@ -0,0 +1,172 @@
+############################################################################
+"""Tests of the headless modgen generator"""
+############################################################################
+import os,re,subprocess,sys,tempfile,textwrap,unittest
+import modgen
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),\
+                               "..","pincheck"))
+import pincheck
+############################################################################
+class HeadlessImportTest(unittest.TestCase):
+  """Importing the generator leaves tkinter unloaded"""
+  def test_no_tkinter(self):
+    code = "import sys,modgen; sys.exit('tkinter' in sys.modules)"
+    here = os.path.dirname(os.path.abspath(modgen.__file__))
+    self.assertEqual(subprocess.call([sys.executable,"-c",code],cwd=here),0)
+############################################################################
+class PackageDefaultsTest(unittest.TestCase):
+  """The default module of every package generates and passes the
+  pad clearance check"""
+  def check(self, units):
+    for package in sorted(modgen.package_defaults):
+      meta = modgen.ModuleMeta({"package":package},units)
+      modgen.CheckMeta(meta)
+      text = modgen.MakeModule(meta)
+      self.assertIn("$MODULE %s"%meta["modname"],text,package)
+      self.assertEqual(modgen.PadClearance(meta["padlist"]),[],package)
+      modgen.GenerateModule({"package":package},units)
+
+  def test_mils(self):
+    self.check("mils")
+
+  def test_mm(self):
+    self.check("mm")
+############################################################################
+class InvalidParamsTest(unittest.TestCase):
+  """Invalid numbers are reported as ModGenError with the parameter"""
+  def test_locking(self):
+    with self.assertRaisesRegex(modgen.ModGenError,"locking"):
+      modgen.GenerateModule({"package":"SIP","locking":"x"})
+
+  def test_range(self):
+    with self.assertRaisesRegex(modgen.ModGenError,"pitch"):
+      modgen.SweepTasks({"package":"SIP","pitch":"1.27:2.54"})
+    with self.assertRaisesRegex(modgen.ModGenError,"PIN_N"):
+      modgen.ExpandSweep({"package":"SIP","PIN_N":"2:8:0"})
+############################################################################
+class SweepFamilyTest(unittest.TestCase):
+  """The documented families generate without failed variants"""
+  def setUp(self):
+    self.tmp = tempfile.TemporaryDirectory()
+
+  def tearDown(self):
+    self.tmp.cleanup()
+
+  def build(self, tasks):
+    destfile = os.path.join(self.tmp.name,"family.emp")
+    self.assertEqual(modgen.BuildLib(tasks,destfile),[])
+    return [name for name, text in modgen.ReadLibrary(destfile)]
+
+  def test_sweep(self):
+    params = {"package":"SIP","modname":"CONN","PIN_N":"2:6",\
+              "pitch":"2.54,2.0","padx":"1.7","pady":"1.7",\
+              "paddrill":"1","locking":"0,1"}
+    names = self.build(modgen.SweepTasks(params,"mm"))
+    self.assertEqual(len(names),5*2*2)
+    self.assertEqual(len(set(names)),len(names))
+
+  def test_readme_sweeps(self):
+    readme = os.path.join(os.path.dirname(os.path.abspath(modgen.__file__)),\
+                          "readme.md")
+    with open(readme,encoding="utf-8") as f:
+      specs = [i for i in re.findall(r"^    <library>\n.*?</library>\n",\
+                                     f.read(),re.M|re.S) if "<sweep" in i]
+    self.assertTrue(specs)
+    tasks = []
+    for i, spec in enumerate(specs):
+      specfile = os.path.join(self.tmp.name,"spec%d.xml"%i)
+      with open(specfile,"w") as f:
+        f.write(textwrap.dedent(spec))
+      tasks.extend(modgen.SpecTasks(specfile))
+    self.build(tasks)
+############################################################################
+class PadTableTest(unittest.TestCase):
+  """The placement transforms give back the layout they started from"""
+  def setUp(self):
+    meta = modgen.ModuleMeta({"package":"QUAD"})
+    self.table = modgen.PadLayout(tuple(modgen.PinGen(int(meta["PIN_N"]))),\
+                                  modgen.ModParams(meta))
+
+  def same(self, a, b):
+    self.assertEqual(a.rows(),b.rows())
+    self.assertEqual(a.lines,b.lines)
+    self.assertEqual(a.ref,b.ref)
+    self.assertEqual((a.layermask,a.bottom),(b.layermask,b.bottom))
+
+  def test_rotate(self):
+    t = self.table.rotate(90)
+    self.assertEqual(list(t.sx),list(self.table.sy))
+    self.assertEqual(list(t.xs),list(self.table.ys))
+    for angle in (90,90,90):
+      t = t.rotate(angle)
+    self.same(t,self.table)
+    self.same(self.table.rotate(180).rotate(180),self.table)
+
+  def test_mirror(self):
+    t = self.table.mirror()
+    self.assertTrue(t.bottom)
+    self.assertEqual(t.layermask,"00440001")
+    self.assertEqual(list(t.xs),[-x for x in self.table.xs])
+    self.same(t.mirror(),self.table)
+############################################################################
+class MirrorSilkTest(unittest.TestCase):
+  """The silk and texts of a mirrored module go to the bottom side"""
+  params = {"package":"SIP","PIN_N":"4","mirror":"1"}
+
+  def test_emp(self):
+    text = modgen.GenerateModule(self.params)
+    self.assertTrue(re.search(r"^DS .* 20$",text,re.M))
+    self.assertFalse(re.search(r"^D[SC] .* 21$",text,re.M))
+    self.assertTrue(re.search(r'^T0 .* M V 20 "',text,re.M))
+
+  def test_kicad_mod(self):
+    meta = modgen.ModuleMeta(self.params)
+    text = modgen.FormatModule(meta,fmt="kicad_mod")
+    self.assertIn('(footprint "%s"'%meta["modname"],text)
+    self.assertEqual(text.count("(pad "),4)
+    self.assertIn('"B.SilkS"',text)
+    self.assertNotIn('"F.SilkS"',text)
+    self.assertEqual(text.count("("),text.count(")"))
+############################################################################
+class PartTest(unittest.TestCase):
+  """The symbol pins of a part match the pads of its footprint"""
+  spec = """<library>
+<part compname="MCU" refname="U" package="QUAD" PIN_N_HORIZ="2">
+VDD,W
+GND,W
+PA0,B
+PA1,B
+RST,I
+CLK,I
+TX,O
+RX,I
+</part>
+</library>
+"""
+  def check(self, destname, symname):
+    with tempfile.TemporaryDirectory() as tmp:
+      specfile = os.path.join(tmp,"parts.xml")
+      with open(specfile,"w") as f:
+        f.write(self.spec)
+      parts = []
+      tasks = modgen.SpecTasks(specfile,parts)
+      destfile = os.path.join(tmp,destname)
+      symlib = os.path.join(tmp,symname)
+      self.assertEqual(modgen.BuildLib(tasks,destfile,parts=parts,\
+                                       symlib=symlib),[])
+      symbols = pincheck.SymbolPins(symlib)
+      footprints = pincheck.FootprintPads(destfile)
+      self.assertEqual(sorted(symbols),["MCU"])
+      self.assertEqual(len(symbols["MCU"]),8)
+      self.assertEqual(len(footprints),1)
+      self.assertEqual(pincheck.CheckPair("MCU",list(footprints)[0],\
+                                          symbols,footprints),[])
+
+  def test_lib(self):
+    self.check("parts.emp","parts.lib")
+
+  def test_kicad_sym(self):
+    self.check("parts.pretty","parts.kicad_sym")
+############################################################################
+if __name__ == "__main__" :
+  unittest.main()
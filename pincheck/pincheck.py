@@ -0,0 +1,293 @@
+#!/usr/bin/python
+############################################################################
+############################################################################
+"""
+##  pincheck - Symbol to Footprint Pin Checker for Kicad V0.1
+##
+##  Designed by
+##         A.D.H.A.R Labs Research,Bharat(India)
+##            Abhijit Bose( info@adharlabs.in )
+##                http://adharlabs.in
+##
+## License:
+## Creative Commons Attribution-NonCommercial-ShareAlike 3.0 Unported
+## CC BY-NC-SA 3.0 http://creativecommons.org/licenses/by-nc-sa/3.0/
+## http://creativecommons.org/licenses/by-nc-sa/3.0/legalcode
+"""
+##
+## Version History:
+## version 0.1 - Initial Release
+##          -- Pin numbers of .lib and .kicad_sym symbols checked against
+##             the pads of .emp, .kicad_mod and .pretty footprints
+##
+############################################################################
+############################################################################
+#IMPORTS>
+import sys,os,re,getopt,logging,csv
+############################################################################
+#EXPORT>
+__all__=['Help_pincheck','SymbolPins','FootprintPads','ReadAssignments',\
+         'CheckPair','CheckLibraries']
+__author__ = "Abhijit Bose(info@adharlabs.in)"
+__author_email__="info@adharlabs.in"
+__version__ = "0.1"
+############################################################################
+#LOGGING> Messages of the Checker
+#  INFO gives one line per mismatched pair, DEBUG adds the matched ones
+log = logging.getLogger("pincheck")
+#Pin and Pad numbers listed for each mismatch
+_list_limit = 10
+############################################################################
+#FORMAT> Lines of the library files that carry the names and numbers
+lib_def = re.compile(r"^DEF\s+(\S+)")
+lib_alias = re.compile(r"^ALIAS\s+(.*)")
+lib_pin = re.compile(r"^X\s+\S+\s+(\S+)")
+sym_symbol = re.compile(r'^\s+\(symbol "((?:[^"\\]|\\.)*)"')
+sym_unit = re.compile(r"^\d+_\d+$")
+sym_extends = re.compile(r'\(extends "((?:[^"\\]|\\.)*)"\)')
+sym_number = re.compile(r'\(number "((?:[^"\\]|\\.)*)"')
+emp_module = re.compile(r"^\$MODULE\s+(.*\S)")
+emp_pad = re.compile(r'^Sh "((?:[^"\\]|\\.)*)"')
+kicad_footprint = re.compile(r'^\((?:footprint|module) ("(?:[^"\\]|\\.)*"|\S+)')
+kicad_pad = re.compile(r'\(pad ("(?:[^"\\]|\\.)*"|\S+)')
+############################################################################
+#INDEX FUNCTIONS>
+def Unquote(text):
+  """Text of a quoted s-expression string"""
+  if text.startswith('"'):
+    return re.sub(r'\\(.)',r'\1',text[1:-1])
+  return text
+
+def IsUnit(name, top):
+  """The symbol is a unit of the top level symbol, named <top>_<unit>_<style>
+  whatever its indent"""
+  return top != None and name.startswith(top+"_") and\
+         sym_unit.match(name[len(top)+1:]) != None
+
+def SymbolPins(path, index=None):
+  """Index the pin numbers of every symbol of a .lib or .kicad_sym
+  library in one pass over its lines, as a dict of symbol name to
+  the set of its pin numbers. Aliases and derived symbols share the
+  pins of their parent"""
+  if index is None:
+    index = {}
+  names = []
+  pins = None
+  extends = []
+  found = 0
+  top = None
+  kicad_sym = path.endswith(".kicad_sym")
+  with open(path,encoding="utf-8",errors="replace") as f:
+    for line in f:
+      if kicad_sym:
+        m = "(symbol " in line and sym_symbol.match(line)
+        name = m and Unquote('"%s"'%m.group(1))
+        if m and not IsUnit(name,top):#Units are <top>_<unit>_<style>
+          top = name
+          pins = set()
+          index[top] = pins
+          found += 1
+          m = sym_extends.search(line)
+          if m:
+            extends.append((pins,Unquote('"%s"'%m.group(1))))
+          continue
+        if pins is not None and "(number" in line:
+          m = sym_number.search(line)
+          if m:
+            pins.add(Unquote('"%s"'%m.group(1)))
+        elif pins is not None and "(extends" in line:
+          m = sym_extends.search(line)
+          if m:
+            extends.append((pins,Unquote('"%s"'%m.group(1))))
+        continue
+      if line.startswith("X "):
+        m = lib_pin.match(line)
+        if m and pins is not None:
+          pins.add(m.group(1))
+      elif line.startswith("DEF "):
+        m = lib_def.match(line)
+        pins = set()
+        names = [m.group(1).lstrip("~")] if m else []
+      elif line.startswith("ALIAS "):
+        names.extend(lib_alias.match(line).group(1).split())
+      elif line.startswith("ENDDEF"):
+        for name in names:
+          index[name] = pins
+        found += len(names)
+        names = []
+        pins = None
+  for pins, parent in extends:
+    pins.update(index.get(parent,()))
+  if not found:
+    log.warning("No symbol in %s"%path)
+  return index
+
+def FootprintPads(path, index=None):
+  """Index the pad names of every footprint of an .emp library, a
+  .kicad_mod file or a .pretty directory in one pass over its lines,
+  as a dict of footprint name to the set of its pad names. Pads without
+  a name are mechanical and left out"""
+  if index is None:
+    index = {}
+  if os.path.isdir(path):
+    for name in sorted(os.listdir(path)):
+      if name.endswith(".kicad_mod"):
+        FootprintPads(os.path.join(path,name),index)
+    return index
+  pads = None
+  kicad_mod = path.endswith(".kicad_mod")
+  with open(path,encoding="utf-8",errors="replace") as f:
+    for line in f:
+      if kicad_mod:
+        if pads is None:
+          m = kicad_footprint.match(line)
+          if m:
+            pads = set()
+            index[Unquote(m.group(1))] = pads
+        elif "(pad " in line:
+          for m in kicad_pad.finditer(line):
+            pads.add(Unquote(m.group(1)))
+      elif line.startswith("Sh "):
+        m = emp_pad.match(line)
+        if m and pads is not None:
+          pads.add(Unquote('"%s"'%m.group(1)))
+      elif line.startswith("$MODULE"):
+        m = emp_module.match(line)
+        pads = set()
+        index[m.group(1)] = pads
+      elif line.startswith("$EndMODULE"):
+        pads = None
+  if kicad_mod and pads is None:
+    log.warning("No footprint in %s"%path)
+  #Mechanical pads carry no name
+  for pads in index.values():
+    pads.discard("")
+  return index
+
+def ReadAssignments(path):
+  """Read the symbol,footprint pairs of an assignment table, a CSV file
+  with the symbol in the first and the footprint in the second column.
+  A library prefix 'lib:' is dropped, empty rows and '#' comments are
+  skipped"""
+  pairs = []
+  with open(path,encoding="utf-8",newline="") as f:
+    for row in csv.reader(f):
+      row = [i.strip() for i in row]
+      if not row or not row[0] or row[0].startswith("#"):
+        continue
+      if len(row) < 2 or not row[1]:
+        log.warning("No footprint for %s in %s"%(row[0],path))
+        continue
+      pairs.append((row[0].split(":")[-1],row[1].split(":")[-1]))
+  return pairs
+############################################################################
+#CHECK FUNCTIONS>
+def PinList(numbers):
+  """Sorted and shortened list of pin numbers for the messages"""
+  key = lambda i: (0,int(i),"") if i.isdigit() else (1,0,i)
+  numbers = sorted(numbers,key=key)
+  text = " ".join(numbers[:_list_limit])
+  if len(numbers) > _list_limit:
+    text += " ... (%d)"%len(numbers)
+  return text
+
+def CheckPair(symbol, footprint, symbols, footprints):
+  """Compare the pins of the symbol with the pads of the footprint,
+  returns the list of the problems, empty when they match"""
+  problems = []
+  if symbol not in symbols:
+    problems.append("symbol not found")
+  if footprint not in footprints:
+    problems.append("footprint not found")
+  if problems:
+    return problems
+  pins = symbols[symbol]
+  pads = footprints[footprint]
+  if len(pins) != len(pads):
+    problems.append("%d pins for %d pads"%(len(pins),len(pads)))
+  if pins - pads:
+    problems.append("pins without pad: %s"%PinList(pins - pads))
+  if pads - pins:
+    problems.append("pads without pin: %s"%PinList(pads - pins))
+  return problems
+
+def CheckLibraries(symfiles, footfiles, pairs=None):
+  """Index the symbol and footprint libraries and check the
+  (symbol, footprint) pairs, by default every symbol against the
+  footprint of the same name. Returns the list of the mismatched
+  pairs as (symbol, footprint, problems)"""
+  symbols = {}
+  for path in symfiles:
+    SymbolPins(path,symbols)
+  footprints = {}
+  for path in footfiles:
+    FootprintPads(path,footprints)
+  log.info("Indexed %d symbols and %d footprints"%(len(symbols),\
+                                                   len(footprints)))
+  if pairs is None:
+    pairs = [(i,i) for i in sorted(symbols) if i in footprints]
+  failed = []
+  for symbol, footprint in pairs:
+    problems = CheckPair(symbol,footprint,symbols,footprints)
+    if problems:
+      log.info("%s/%s> %s"%(symbol,footprint,"; ".join(problems)))
+      failed.append((symbol,footprint,problems))
+    else:
+      log.debug("%s/%s> ok"%(symbol,footprint))
+  log.warning("%d pairs checked, %d mismatched"%(len(pairs),len(failed)))
+  return failed
+############################################################################
+#OTHER FUNCTIONS>
+def Help_pincheck():
+  """Usage of the Checker"""
+  print("""
+ Usage: %(prog)s [-q|-v] [-a <assign.csv>] <library> [<library> ...]
+   Checks the pin numbers of the symbols against the pad names of their
+   footprints and lists the pins without a pad and the pads without a
+   pin. The libraries are told apart by their extension:
+     symbols    - .lib .kicad_sym
+     footprints - .emp .kicad_mod and .pretty directories
+   -a   - Assignment table, a CSV file with one symbol,footprint pair per
+          row, by default the symbols are checked against the footprints
+          of the same name
+   -q   - Only print the summary
+   -v   - Also print the matching pairs
+   Exits with an error when any pair does not match.
+"""%{"prog":os.path.basename(sys.argv[0])})
+  sys.exit(-1)
+############################################################################
+############################################################################
+if __name__ == "__main__" :
+  try:
+    opts, args = getopt.getopt(sys.argv[1:],"a:qvh")
+    opts = dict(opts)
+  except getopt.GetoptError:
+    Help_pincheck()
+  if not args or "-h" in opts:
+    Help_pincheck()
+  level = logging.INFO
+  if "-q" in opts:
+    level = logging.WARNING
+  elif "-v" in opts:
+    level = logging.DEBUG
+  logging.basicConfig(format="%(message)s",level=level,stream=sys.stdout)
+  log.debug(__doc__)
+  symfiles = [i for i in args if i.endswith((".lib",".kicad_sym"))]
+  footfiles = [i for i in args if i.rstrip("/\\").endswith(\
+               (".emp",".kicad_mod",".pretty"))]
+  for path in args:
+    if path not in symfiles+footfiles:
+      log.error("Error: Unknown library %s"%path)
+      sys.exit(-1)
+    if not os.path.exists(path):
+      log.error("Error: File %s does not exist"%path)
+      sys.exit(-1)
+  if not symfiles or not footfiles:
+    log.error("Error: Both symbol and footprint libraries are needed")
+    sys.exit(-1)
+  pairs = None
+  if "-a" in opts:
+    pairs = ReadAssignments(opts["-a"])
+  failed = CheckLibraries(symfiles,footfiles,pairs)
+  sys.exit(-1 if failed else 0)
+############################################################################